@@ -23,9 +23,8 @@ async def start_agent(config_path: str = None):
         
         print("AI Cold Calling Agent is running. Press Ctrl+C to stop.")
         
-        # Keep running
-        while agent.is_running:
-            await asyncio.sleep(1)
+        # Sleep until a shutdown signal arrives or the agent is stopped
+        await agent.wait_for_shutdown()
             
     except ImportError as e:
         print(f"Missing dependencies: {e}")
@@ -138,6 +137,11 @@ Examples:
         sys.exit(1)
     
     if args.command == 'start':
+        try:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            pass
         asyncio.run(start_agent(args.config))
     elif args.command == 'validate':
         validate_config(args.config)
@@ -6,17 +6,26 @@ CREATE TABLE conversations (
     call_id VARCHAR(255) UNIQUE NOT NULL,
     customer_phone VARCHAR(20),
     customer_name VARCHAR(255),
-    start_time TIMESTAMP NOT NULL,
+    start_time TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'UTC'),
     end_time TIMESTAMP,
     duration_seconds INTEGER,
     status VARCHAR(50) NOT NULL, -- 'active', 'completed', 'failed', 'abandoned'
     outcome VARCHAR(100), -- 'appointment', 'callback', 'not_interested', 'invalid_number'
     emotion_score FLOAT,
     sentiment_score FLOAT,
+    turn_seq INTEGER NOT NULL DEFAULT 0, -- Last issued turn_number, incremented atomically
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Recorded audio files, referenced by conversation turns
+CREATE TABLE audio_assets (
+    id SERIAL PRIMARY KEY,
+    path VARCHAR(500) NOT NULL,
+    sha256 BYTEA UNIQUE NOT NULL, -- SHA-256 of the file content (32 bytes)
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Conversation turns to store individual exchanges
 CREATE TABLE conversation_turns (
     id SERIAL PRIMARY KEY,
@@ -24,12 +33,13 @@ CREATE TABLE conversation_turns (
     turn_number INTEGER NOT NULL,
     speaker VARCHAR(20) NOT NULL, -- 'agent' or 'customer'
     text_content TEXT NOT NULL,
-    audio_file_path VARCHAR(500),
+    audio_asset_id INTEGER REFERENCES audio_assets(id),
     emotion VARCHAR(50),
     confidence_score FLOAT,
-    timestamp TIMESTAMP NOT NULL,
+    timestamp TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'UTC'),
     response_time_ms INTEGER,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_conversation_turns_conversation_turn UNIQUE (conversation_id, turn_number)
 );
 
 -- FAQ and knowledge base
@@ -43,6 +53,10 @@ CREATE TABLE faq_entries (
     success_rate FLOAT DEFAULT 0.0,
     language VARCHAR(10) DEFAULT 'de',
     is_active BOOLEAN DEFAULT TRUE,
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('german', coalesce(question, '')), 'A') ||
+        setweight(to_tsvector('german', coalesce(answer, '')), 'B')
+    ) STORED, -- Weighted full-text index over question and answer
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -122,10 +136,14 @@ CREATE INDEX idx_conversations_status ON conversations(status);
 CREATE INDEX idx_conversations_start_time ON conversations(start_time);
 CREATE INDEX idx_conversation_turns_conversation_id ON conversation_turns(conversation_id);
 CREATE INDEX idx_conversation_turns_speaker ON conversation_turns(speaker);
+CREATE INDEX idx_conversation_turns_audio_asset_id ON conversation_turns(audio_asset_id);
 CREATE INDEX idx_faq_entries_category ON faq_entries(category);
 CREATE INDEX idx_faq_entries_keywords ON faq_entries USING GIN(keywords);
+CREATE INDEX idx_faq_entries_search_vector ON faq_entries USING GIN(search_vector);
 CREATE INDEX idx_conversation_scripts_type ON conversation_scripts(script_type);
+CREATE INDEX idx_conversation_scripts_variables ON conversation_scripts USING GIN(variables);
 CREATE INDEX idx_training_data_conversation_id ON training_data(conversation_id);
+CREATE INDEX idx_training_data_usage_score ON training_data(is_used_for_training, COALESCE(feedback_score, 0) DESC, id DESC);
 CREATE INDEX idx_call_metrics_conversation_id ON call_metrics(conversation_id);
 CREATE INDEX idx_call_metrics_metric_type ON call_metrics(metric_type);
 CREATE INDEX idx_customers_phone_number ON customers(phone_number);
@@ -31,6 +31,7 @@ class ConfigManager:
         
         self.config_path = Path(config_path)
         self.config = {}
+        self._validation_errors: Optional[Dict[str, List[str]]] = None
         self._load_config()
     
     def _load_config(self):
@@ -109,6 +110,7 @@ class ConfigManager:
             "DATABASE_USER": ("database", "username"),
             "DATABASE_PASSWORD": ("database", "password"),
             "DATABASE_NAME": ("database", "database"),
+            "DB_POOL_PRE_PING": ("database", "pool_pre_ping"),
             
             # STT - General
             "STT_ENGINE": ("speech_recognition", "engine"),
@@ -117,6 +119,8 @@ class ConfigManager:
             # STT - Whisper
             "STT_WHISPER_MODEL_SIZE": ("speech_recognition", "model_size"),
             "STT_WHISPER_DEVICE": ("speech_recognition", "device"),
+            "STT_WHISPER_PRECISION": ("speech_recognition", "precision"),
+            "STT_ONNX_MODEL_PATH": ("speech_recognition", "onnx_model_path"),
             
             # STT - Deepgram
             "DEEPGRAM_API_KEY": ("speech_recognition", "api_key"),
@@ -129,6 +133,8 @@ class ConfigManager:
             # STT - Google
             "GOOGLE_APPLICATION_CREDENTIALS": ("speech_recognition", "credentials_path"),
             "STT_GOOGLE_MODEL": ("speech_recognition", "model"),
+            "STT_GOOGLE_GCS_BUCKET": ("speech_recognition", "gcs_bucket"),
+            "STT_GOOGLE_ENDPOINT": ("speech_recognition", "api_endpoint"),
             
             # TTS - General
             "TTS_ENGINE": ("text_to_speech", "engine"),
@@ -138,6 +144,7 @@ class ConfigManager:
             "TTS_COQUI_MODEL": ("text_to_speech", "model_name"),
             "TTS_COQUI_VOCODER": ("text_to_speech", "vocoder"),
             "TTS_COQUI_DEVICE": ("text_to_speech", "device"),
+            "TTS_COQUI_PRECISION": ("text_to_speech", "precision"),
             "TTS_COQUI_SPEAKER": ("text_to_speech", "speaker"),
             
             # TTS - Mimic3
@@ -178,6 +185,10 @@ class ConfigManager:
                     except ValueError:
                         continue
                 
+                # Convert boolean values
+                if key == "pool_pre_ping":
+                    value = value.strip().lower() in ("1", "true", "yes", "on")
+                
                 # Convert float values
                 if key in ["stability", "similarity_boost", "speaking_rate", "pitch"]:
                     try:
@@ -217,7 +228,8 @@ class ConfigManager:
         database = db_config.get("database", "cold_calling_agent")
         
         if db_type == "postgresql":
-            return f"postgresql://{username}:{password}@{host}:{port}/{database}"
+            driver = db_config.get("driver", "psycopg")
+            return f"postgresql+{driver}://{username}:{password}@{host}:{port}/{database}"
         elif db_type == "mysql":
             return f"mysql+pymysql://{username}:{password}@{host}:{port}/{database}"
         else:
@@ -232,6 +244,7 @@ class ConfigManager:
         if section not in self.config:
             self.config[section] = {}
         self.config[section][key] = value
+        self._validation_errors = None
     
     def save_config(self, path: Optional[str] = None):
         """Save configuration to file"""
@@ -254,9 +267,14 @@ class ConfigManager:
         """
         Validate configuration
         
+        The result is cached until the configuration is changed with set().
+        
         Returns:
             Dictionary with validation errors by section
         """
+        if self._validation_errors is not None:
+            return {section: list(messages) for section, messages in self._validation_errors.items()}
+        
         errors = {}
         
         # Validate database config
@@ -278,8 +296,8 @@ class ConfigManager:
         stt_errors = []
         stt_config = self.config.get("speech_recognition", {})
         
-        if stt_config.get("engine") not in ["whisper"]:
-            stt_errors.append("Invalid STT engine. Must be 'whisper'")
+        if stt_config.get("engine") not in ["whisper", "faster-whisper", "onnx-whisper"]:
+            stt_errors.append("Invalid STT engine. Must be 'whisper', 'faster-whisper' or 'onnx-whisper'")
         
         if stt_config.get("model_size") not in ["tiny", "base", "small", "medium", "large"]:
             stt_errors.append("Invalid Whisper model size")
@@ -297,7 +315,8 @@ class ConfigManager:
         if tts_errors:
             errors["text_to_speech"] = tts_errors
         
-        return errors
+        self._validation_errors = errors
+        return {section: list(messages) for section, messages in errors.items()}
     
     def is_valid(self) -> bool:
         """Check if configuration is valid"""
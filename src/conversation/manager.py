@@ -7,7 +7,7 @@ import random
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from .state_machine import ConversationStateMachine, ConversationState
-from ..database.operations import ConversationRepository, FAQRepository, ScriptRepository
+from ..database.operations import ConversationRepository, ConversationTurnBuffer, FAQRepository, ScriptRepository
 
 logger = logging.getLogger(__name__)
 
@@ -15,9 +15,11 @@ logger = logging.getLogger(__name__)
 class ResponseGenerator:
     """Generates appropriate responses based on conversation context"""
     
-    def __init__(self, faq_repo: FAQRepository, script_repo: ScriptRepository):
+    def __init__(self, faq_repo: FAQRepository, script_repo: ScriptRepository,
+                 turn_buffer: Optional[ConversationTurnBuffer] = None):
         self.faq_repo = faq_repo
         self.script_repo = script_repo
+        self.turn_buffer = turn_buffer
     
     def generate_response(self, context: Dict[str, Any], customer_input: str, 
                          emotion: Optional[str] = None) -> str:
@@ -52,8 +54,11 @@ class ResponseGenerator:
             faq_entries = self.faq_repo.search_faq(customer_input, limit=1)
             if faq_entries:
                 faq = faq_entries[0]
-                # Increment usage count
-                self.faq_repo.increment_faq_usage(faq.id)
+                # Increment usage count, batched with the turn writes when buffered
+                if self.turn_buffer is not None and self.turn_buffer.faq_repo is not None:
+                    self.turn_buffer.record_faq_usage(faq.id)
+                else:
+                    self.faq_repo.increment_faq_usage(faq.id)
                 return faq.answer
         except Exception as e:
             logger.error(f"Error searching FAQ: {e}")
@@ -201,11 +206,13 @@ class ConversationManager:
     """Manages the complete conversation flow"""
     
     def __init__(self, conversation_repo: ConversationRepository, 
-                 faq_repo: FAQRepository, script_repo: ScriptRepository):
+                 faq_repo: FAQRepository, script_repo: ScriptRepository,
+                 turn_buffer: Optional[ConversationTurnBuffer] = None):
         self.conversation_repo = conversation_repo
         self.faq_repo = faq_repo
         self.script_repo = script_repo
-        self.response_generator = ResponseGenerator(faq_repo, script_repo)
+        self.turn_buffer = turn_buffer
+        self.response_generator = ResponseGenerator(faq_repo, script_repo, turn_buffer)
         self.active_conversations: Dict[str, ConversationStateMachine] = {}
     
     def start_conversation(self, call_id: str, customer_phone: str, 
@@ -252,7 +259,7 @@ class ConversationManager:
                 response_text = f"Guten Tag{', ' + customer_name if customer_name else ''}! Mein Name ist Sarah von Digital Solutions."
             
             # Add agent turn to conversation
-            self.conversation_repo.add_conversation_turn(
+            self._record_turn(
                 conversation_id=conversation.id,
                 speaker="agent",
                 text_content=response_text
@@ -297,7 +304,7 @@ class ConversationManager:
                 raise ValueError(f"No conversation record found for call_id: {call_id}")
             
             # Add customer turn to conversation
-            customer_turn = self.conversation_repo.add_conversation_turn(
+            self._record_turn(
                 conversation_id=conversation.id,
                 speaker="customer",
                 text_content=customer_input,
@@ -324,7 +331,7 @@ class ConversationManager:
             )
             
             # Add agent response to conversation
-            agent_turn = self.conversation_repo.add_conversation_turn(
+            self._record_turn(
                 conversation_id=conversation.id,
                 speaker="agent",
                 text_content=response_text
@@ -369,6 +376,15 @@ class ConversationManager:
             # Get conversation from database
             conversation = self.conversation_repo.get_conversation(call_id)
             if conversation:
+                # Make buffered turns visible before the conversation is closed;
+                # a failed flush keeps them queued and must not keep the call open
+                if self.turn_buffer:
+                    try:
+                        self.turn_buffer.flush()
+                    except Exception as e:
+                        logger.error(f"Error flushing turns of conversation {call_id}: {e}")
+                    self.turn_buffer.forget_conversation(conversation.id)
+                
                 self.conversation_repo.end_conversation(
                     conversation_id=conversation.id,
                     outcome=outcome,
@@ -406,6 +422,24 @@ class ConversationManager:
             "script_type": state_machine.get_current_script_type()
         }
     
+    def _record_turn(self, conversation_id: int, speaker: str, text_content: str,
+                     emotion: Optional[str] = None, confidence_score: Optional[float] = None,
+                     audio_file_path: Optional[str] = None):
+        """Persist a turn, through the write buffer when one is configured"""
+        if self.turn_buffer:
+            self.turn_buffer.add_turn(conversation_id, speaker, text_content,
+                                      emotion=emotion, confidence_score=confidence_score,
+                                      audio_file_path=audio_file_path)
+        else:
+            self.conversation_repo.add_conversation_turn(
+                conversation_id=conversation_id,
+                speaker=speaker,
+                text_content=text_content,
+                emotion=emotion,
+                confidence_score=confidence_score,
+                audio_file_path=audio_file_path
+            )
+    
     def _replace_script_variables(self, content: str, variables: Dict[str, Any], 
                                 context: Dict[str, Any]) -> str:
         """Helper method to replace script variables"""
@@ -446,6 +480,7 @@ class ConversationManager:
 
 def create_conversation_manager(conversation_repo: ConversationRepository,
                               faq_repo: FAQRepository,
-                              script_repo: ScriptRepository) -> ConversationManager:
+                              script_repo: ScriptRepository,
+                              turn_buffer: Optional[ConversationTurnBuffer] = None) -> ConversationManager:
     """Factory function to create conversation manager"""
-    return ConversationManager(conversation_repo, faq_repo, script_repo)
\ No newline at end of file
+    return ConversationManager(conversation_repo, faq_repo, script_repo, turn_buffer)
\ No newline at end of file
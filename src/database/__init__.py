@@ -2,19 +2,19 @@
 Database module for the AI Cold Calling Agent
 """
 from .models import (
-    Base, Conversation, ConversationTurn, FAQEntry, 
+    Base, Conversation, ConversationTurn, AudioAsset, FAQEntry, 
     ConversationScript, TrainingData, CallMetric, 
     Customer, SystemSetting
 )
 from .operations import (
-    DatabaseManager, ConversationRepository, FAQRepository,
+    DatabaseManager, ConversationRepository, ConversationTurnBuffer, FAQRepository,
     ScriptRepository, TrainingRepository, CustomerRepository
 )
 
 __all__ = [
-    'Base', 'Conversation', 'ConversationTurn', 'FAQEntry',
+    'Base', 'Conversation', 'ConversationTurn', 'AudioAsset', 'FAQEntry',
     'ConversationScript', 'TrainingData', 'CallMetric',
     'Customer', 'SystemSetting', 'DatabaseManager',
-    'ConversationRepository', 'FAQRepository', 'ScriptRepository',
+    'ConversationRepository', 'ConversationTurnBuffer', 'FAQRepository', 'ScriptRepository',
     'TrainingRepository', 'CustomerRepository'
 ]
\ No newline at end of file
@@ -5,15 +5,22 @@ from datetime import datetime
 from typing import List, Optional, Dict, Any
 from sqlalchemy import (
     Column, Integer, String, Text, Float, Boolean, 
-    DateTime, Time, ForeignKey, ARRAY, JSON
+    DateTime, Time, ForeignKey, ARRAY, Index, LargeBinary, Computed,
+    UniqueConstraint
 )
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, Session
+from sqlalchemy.orm import relationship, deferred, Session
 from sqlalchemy.sql import func
 
 Base = declarative_base()
 
 
+def utc_now():
+    """Database-side current time as naive UTC, matching how timestamps are stored"""
+    return func.timezone('UTC', func.now())
+
+
 class Conversation(Base):
     """Model for storing conversation data"""
     __tablename__ = 'conversations'
@@ -22,13 +29,14 @@ class Conversation(Base):
     call_id = Column(String(255), unique=True, nullable=False)
     customer_phone = Column(String(20))
     customer_name = Column(String(255))
-    start_time = Column(DateTime, nullable=False)
+    start_time = Column(DateTime, nullable=False, server_default=utc_now())
     end_time = Column(DateTime)
     duration_seconds = Column(Integer)
     status = Column(String(50), nullable=False)  # active, completed, failed, abandoned
     outcome = Column(String(100))  # appointment, callback, not_interested, invalid_number
     emotion_score = Column(Float)
     sentiment_score = Column(Float)
+    turn_seq = Column(Integer, nullable=False, default=0, server_default='0')  # last issued turn_number
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
@@ -47,15 +55,30 @@ class ConversationTurn(Base):
     turn_number = Column(Integer, nullable=False)
     speaker = Column(String(20), nullable=False)  # agent or customer
     text_content = Column(Text, nullable=False)
-    audio_file_path = Column(String(500))
+    audio_asset_id = Column(Integer, ForeignKey('audio_assets.id'), nullable=True, index=True)
     emotion = Column(String(50))
     confidence_score = Column(Float)
-    timestamp = Column(DateTime, nullable=False)
+    timestamp = Column(DateTime, nullable=False, server_default=utc_now())
     response_time_ms = Column(Integer)
     created_at = Column(DateTime, default=func.now())
     
     # Relationships
     conversation = relationship("Conversation", back_populates="turns")
+    audio_asset = relationship("AudioAsset")
+    
+    __table_args__ = (
+        UniqueConstraint('conversation_id', 'turn_number', name='uq_conversation_turns_conversation_turn'),
+    )
+
+
+class AudioAsset(Base):
+    """Model for recorded audio files, content-addressed by SHA-256"""
+    __tablename__ = 'audio_assets'
+    
+    id = Column(Integer, primary_key=True)
+    path = Column(String(500), nullable=False)
+    sha256 = Column(LargeBinary(32), unique=True, nullable=False)
+    created_at = Column(DateTime, default=func.now())
 
 
 class FAQEntry(Base):
@@ -71,8 +94,17 @@ class FAQEntry(Base):
     success_rate = Column(Float, default=0.0)
     language = Column(String(10), default='de')
     is_active = Column(Boolean, default=True)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('german', coalesce(question, '')), 'A') || "
+        "setweight(to_tsvector('german', coalesce(answer, '')), 'B')",
+        persisted=True
+    )))
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index('idx_faq_entries_search_vector', 'search_vector', postgresql_using='gin'),
+    )
 
 
 class ConversationScript(Base):
@@ -83,13 +115,17 @@ class ConversationScript(Base):
     name = Column(String(255), nullable=False)
     script_type = Column(String(50), nullable=False)  # opening, objection_handling, closing
     content = Column(Text, nullable=False)
-    variables = Column(JSON)
+    variables = Column(JSONB)
     success_rate = Column(Float, default=0.0)
     usage_count = Column(Integer, default=0)
     language = Column(String(10), default='de')
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index('idx_conversation_scripts_variables', 'variables', postgresql_using='gin'),
+    )
 
 
 class TrainingData(Base):
@@ -109,6 +145,11 @@ class TrainingData(Base):
     
     # Relationships
     conversation = relationship("Conversation", back_populates="training_data")
+    
+    __table_args__ = (
+        Index('idx_training_data_usage_score', 'is_used_for_training',
+              func.coalesce(feedback_score, 0).desc(), id.desc()),
+    )
 
 
 class CallMetric(Base):
@@ -1,23 +1,211 @@
 """
 Database connection and operations for the AI Cold Calling Agent
+
+Connection pool pre-ping is off by default. Behind PgBouncer in transaction
+pooling mode the pre-ping SELECT opens a transaction that pins a server
+connection, so rely on pool_recycle there instead. Enable pre-ping
+(database.pool_pre_ping or DB_POOL_PRE_PING) for direct PostgreSQL
+deployments where idle connections may be dropped by the network.
+
+PostgreSQL is reached through psycopg 3, which prepares statements that have
+run prepare_threshold times on a connection and disables JIT for these short
+OLTP queries. Behind PgBouncer in transaction pooling mode set
+database.prepare_threshold to null, since prepared statements are per server
+connection, and allow the "options" startup parameter in PgBouncer.
+
+Repositories are synchronous. Async callers go through DatabaseManager.run(),
+which executes a repository call on a thread pool sized to the connection
+pool so a database round trip never blocks the event loop.
 """
 import os
+import asyncio
+import contextvars
+import functools
+import hashlib
 import logging
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, FrozenSet, Tuple
 from contextlib import contextmanager
-from sqlalchemy import create_engine, text, func
-from sqlalchemy.orm import sessionmaker, Session
+from contextvars import ContextVar
+from sqlalchemy import create_engine, event, text, func, insert, update, select, bindparam, tuple_, literal_column, Integer
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import sessionmaker, Session, selectinload, raiseload
 from sqlalchemy.pool import QueuePool
-from .models import Base, Conversation, ConversationTurn, FAQEntry, ConversationScript, TrainingData, CallMetric, Customer, SystemSetting
+from .models import utc_now, Base, Conversation, ConversationTurn, AudioAsset, FAQEntry, ConversationScript, TrainingData, CallMetric, Customer, SystemSetting
 
 logger = logging.getLogger(__name__)
 
+# PostgreSQL text search configurations by FAQ language code
+TEXT_SEARCH_CONFIGS = {
+    'de': 'german',
+    'en': 'english',
+}
+
+# Hot write statements; RETURNING hands back the populated entity in the same round trip
+_INSERT_CONVERSATION = insert(Conversation).returning(Conversation)
+_INSERT_CONVERSATION_TURN = insert(ConversationTurn).returning(ConversationTurn)
+_INSERT_TRAINING_DATA = insert(TrainingData).returning(TrainingData)
+
+# Maximum number of IDs bound into a single UPDATE ... WHERE id IN (...)
+MARK_USED_CHUNK_SIZE = 1000
+
+# Hot read statements, built once so their cache key is computed from a stable structure
+_TURNS_BY_CONVERSATION = (
+    select(
+        ConversationTurn.turn_number,
+        ConversationTurn.speaker,
+        ConversationTurn.text_content,
+        ConversationTurn.emotion,
+        ConversationTurn.confidence_score,
+        ConversationTurn.timestamp,
+        ConversationTurn.response_time_ms,
+        ConversationTurn.audio_asset_id
+    )
+    .where(ConversationTurn.conversation_id == bindparam('conversation_id'))
+    .order_by(ConversationTurn.turn_number)
+)
+
+_TURNS_BY_CONVERSATIONS = (
+    select(
+        ConversationTurn.conversation_id,
+        ConversationTurn.turn_number,
+        ConversationTurn.speaker,
+        ConversationTurn.text_content,
+        ConversationTurn.emotion,
+        ConversationTurn.confidence_score,
+        ConversationTurn.timestamp,
+        ConversationTurn.response_time_ms,
+        ConversationTurn.audio_asset_id
+    )
+    .where(ConversationTurn.conversation_id.in_(bindparam('conversation_ids', expanding=True)))
+    .order_by(ConversationTurn.conversation_id, ConversationTurn.turn_number)
+)
+
+_DO_NOT_CALL_PHONES = select(Customer.phone_number).where(Customer.do_not_call == True)
+
+_ACTIVE_SCRIPTS_BY_LANGUAGE = (
+    select(
+        ConversationScript.id,
+        ConversationScript.name,
+        ConversationScript.script_type,
+        ConversationScript.content,
+        ConversationScript.variables,
+        ConversationScript.success_rate
+    )
+    .where(ConversationScript.language == bindparam('language'))
+    .where(ConversationScript.is_active == True)
+    .order_by(ConversationScript.script_type, ConversationScript.success_rate.desc())
+)
+
+_FAQ_BY_CATEGORY = (
+    select(
+        FAQEntry.id,
+        FAQEntry.question,
+        FAQEntry.answer,
+        FAQEntry.category,
+        FAQEntry.keywords
+    )
+    .where(FAQEntry.category == bindparam('category'))
+    .where(FAQEntry.language == bindparam('language'))
+    .where(FAQEntry.is_active == True)
+    .order_by(FAQEntry.usage_count.desc())
+)
+
+# Core UPDATE so a list of parameter sets runs as one executemany
+_faq_table = FAQEntry.__table__
+_ADD_FAQ_USAGE = (
+    update(_faq_table)
+    .where(_faq_table.c.id == bindparam('faq_id'))
+    .values(usage_count=_faq_table.c.usage_count + bindparam('uses'))
+)
+
+# Unscored training rows sort last; the key matches idx_training_data_usage_score
+_TRAINING_DATA_SCORE = func.coalesce(TrainingData.feedback_score, literal_column("0"))
+_TRAINING_DATA_SORT_KEY = tuple_(_TRAINING_DATA_SCORE, TrainingData.id)
+
+_TRAINING_DATA_BY_USAGE = (
+    select(TrainingData)
+    .where(TrainingData.is_used_for_training == bindparam('used_for_training'))
+    .order_by(_TRAINING_DATA_SCORE.desc(), TrainingData.id.desc())
+    .limit(bindparam('limit'))
+)
+
+_TRAINING_DATA_BY_USAGE_AFTER = _TRAINING_DATA_BY_USAGE.where(
+    _TRAINING_DATA_SORT_KEY < tuple_(bindparam('after_score'), bindparam('after_id'))
+)
+
+
+_MISSING = object()
+
+# Statements executed inside the active count_queries() block, if any
+_query_log: ContextVar[Optional[List[str]]] = ContextVar("query_log", default=None)
+
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    """Tune each SQLite connection: WAL journal, 64 MB page cache"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    """before_cursor_execute hook that feeds count_queries()"""
+    statements = _query_log.get()
+    if statements is not None:
+        statements.append(statement)
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after a fixed TTL"""
+    
+    def __init__(self, maxsize: int = 512, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=_MISSING):
+        """Return the cached value for key, or default if absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entry if full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            self._entries.clear()
+
 
 class DatabaseManager:
     """Manages database connections and operations"""
     
-    def __init__(self, database_url: str, echo: bool = False, pool_size: int = 5):
+    def __init__(self, database_url: str, echo: bool = False, pool_size: int = 10,
+                 pre_ping: bool = False, pool_recycle: int = 60, pool_timeout: int = 30,
+                 max_overflow: int = 5, debug: bool = False,
+                 prepare_threshold: Optional[int] = 5, query_cache_size: int = 2048):
         """
         Initialize database manager
         
@@ -25,17 +213,62 @@ class DatabaseManager:
             database_url: Database connection URL
             echo: Whether to echo SQL statements
             pool_size: Connection pool size
+            pre_ping: Whether to test connections on checkout
+            pool_recycle: Seconds after which pooled connections are replaced
+            pool_timeout: Seconds to wait for a free pooled connection
+            max_overflow: Connections allowed beyond pool_size
+            debug: Whether to enable development checks such as raising on lazy loads
+            prepare_threshold: Executions before psycopg prepares a statement
+                server-side; None disables prepared statements
+            query_cache_size: Number of compiled statements SQLAlchemy caches
         """
         self.database_url = database_url
-        self.engine = create_engine(
-            database_url,
-            echo=echo,
-            poolclass=QueuePool,
-            pool_size=pool_size,
-            max_overflow=10,
-            pool_pre_ping=True
+        self.debug = debug
+        is_sqlite = database_url.startswith("sqlite")
+        if is_sqlite:
+            # Keep SQLAlchemy's default SQLite pooling: every session gets a
+            # connection of its own, so transactions never interleave on one
+            self.engine = create_engine(
+                database_url,
+                echo=echo,
+                query_cache_size=query_cache_size
+            )
+            event.listen(self.engine, "connect", _configure_sqlite)
+        else:
+            connect_args = {}
+            if database_url.startswith("postgresql+psycopg://"):
+                connect_args = {
+                    "prepare_threshold": prepare_threshold,
+                    "options": "-c jit=off"
+                }
+            
+            self.engine = create_engine(
+                database_url,
+                echo=echo,
+                poolclass=QueuePool,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_pre_ping=pre_ping,
+                pool_recycle=pool_recycle,
+                pool_timeout=pool_timeout,
+                pool_use_lifo=True,
+                query_cache_size=query_cache_size,
+                connect_args=connect_args
+            )
+        # Objects are returned after get_session() commits and closes; keep their
+        # loaded state instead of expiring it and forcing a reload on access
+        self.SessionLocal = sessionmaker(
+            autocommit=False, autoflush=False, expire_on_commit=False, bind=self.engine
+        )
+        
+        if debug:
+            event.listen(self.engine, "before_cursor_execute", _record_statement)
+        
+        # One worker per pooled connection, so offloaded calls never queue on the pool;
+        # SQLite allows a single writer, so more workers would only contend for its lock
+        self._executor = ThreadPoolExecutor(
+            max_workers=1 if is_sqlite else pool_size + max_overflow, thread_name_prefix="db"
         )
-        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         
     def create_tables(self):
         """Create all database tables"""
@@ -60,6 +293,57 @@ class DatabaseManager:
         finally:
             session.close()
     
+    @contextmanager
+    def count_queries(self, warn_above: Optional[int] = None):
+        """
+        Collect the SQL statements executed in this context (debug mode only)
+        
+        Statements run through run() are counted too, since it carries the
+        caller's context into the worker thread.
+        
+        Args:
+            warn_above: Log a warning when more statements than this were executed
+        
+        Yields:
+            List that receives each statement as it is sent to the database
+        
+        Raises:
+            RuntimeError: If the manager was not created with debug=True
+        """
+        if not self.debug:
+            # Without the cursor hook the list would stay empty and any count check pass
+            raise RuntimeError("count_queries requires DatabaseManager(debug=True)")
+        
+        statements: List[str] = []
+        token = _query_log.set(statements)
+        try:
+            yield statements
+        finally:
+            _query_log.reset(token)
+            if warn_above is not None and len(statements) > warn_above:
+                logger.warning(
+                    f"{len(statements)} queries executed, expected at most {warn_above}: "
+                    f"{statements}"
+                )
+    
+    @contextmanager
+    def get_readonly_session(self):
+        """
+        Get a session for pure reads, bound to an autocommit connection
+        
+        Nothing is committed on exit, so a read costs no COMMIT round-trip.
+        """
+        with self.engine.connect() as connection:
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+            session = self.SessionLocal(bind=connection)
+            try:
+                yield session
+            except Exception as e:
+                logger.error(f"Database read error: {e}")
+                raise
+            finally:
+                session.close()
+    
     def test_connection(self) -> bool:
         """Test database connection"""
         try:
@@ -70,6 +354,30 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"Database connection test failed: {e}")
             return False
+    
+    async def run(self, func, *args, **kwargs):
+        """
+        Run a synchronous repository call without blocking the event loop
+        
+        Args:
+            func: Callable that uses this manager's sessions
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+            
+        Returns:
+            The return value of func
+        """
+        loop = asyncio.get_running_loop()
+        # run_in_executor does not propagate context variables such as the count_queries log
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(context.run, func, *args, **kwargs)
+        )
+    
+    def close(self):
+        """Wait for offloaded calls to finish and close pooled connections"""
+        self._executor.shutdown(wait=True)
+        self.engine.dispose()
 
 
 class ConversationRepository:
@@ -82,17 +390,12 @@ class ConversationRepository:
                           customer_name: Optional[str] = None) -> Conversation:
         """Create a new conversation record"""
         with self.db_manager.get_session() as session:
-            conversation = Conversation(
-                call_id=call_id,
-                customer_phone=customer_phone,
-                customer_name=customer_name,
-                start_time=datetime.utcnow(),
-                status='active'
-            )
-            session.add(conversation)
-            session.commit()
-            session.refresh(conversation)
-            return conversation
+            return session.execute(_INSERT_CONVERSATION, {
+                "call_id": call_id,
+                "customer_phone": customer_phone,
+                "customer_name": customer_name,
+                "status": 'active'
+            }).scalar_one()
     
     def add_conversation_turn(self, conversation_id: int, speaker: str, 
                             text_content: str, emotion: Optional[str] = None,
@@ -100,127 +403,435 @@ class ConversationRepository:
                             audio_file_path: Optional[str] = None) -> ConversationTurn:
         """Add a turn to an existing conversation"""
         with self.db_manager.get_session() as session:
-            # Get the next turn number
-            max_turn = session.query(func.max(ConversationTurn.turn_number))\
-                            .filter(ConversationTurn.conversation_id == conversation_id)\
-                            .scalar() or 0
+            # Atomically claim the next turn number from the conversation's counter
+            turn_number = session.execute(
+                update(Conversation)
+                .where(Conversation.id == conversation_id)
+                .values(turn_seq=Conversation.turn_seq + 1)
+                .returning(Conversation.turn_seq)
+            ).scalar_one()
             
-            turn = ConversationTurn(
-                conversation_id=conversation_id,
-                turn_number=max_turn + 1,
-                speaker=speaker,
-                text_content=text_content,
-                emotion=emotion,
-                confidence_score=confidence_score,
-                audio_file_path=audio_file_path,
-                timestamp=datetime.utcnow()
-            )
-            session.add(turn)
-            session.commit()
-            session.refresh(turn)
-            return turn
+            audio_asset_id = None
+            if audio_file_path:
+                audio_asset_id = self._get_or_create_audio_asset_id(session, audio_file_path)
+            
+            return session.execute(_INSERT_CONVERSATION_TURN, {
+                "conversation_id": conversation_id,
+                "turn_number": turn_number,
+                "speaker": speaker,
+                "text_content": text_content,
+                "emotion": emotion,
+                "confidence_score": confidence_score,
+                "audio_asset_id": audio_asset_id
+            }).scalar_one()
+    
+    def _get_or_create_audio_asset_id(self, session: Session, audio_file_path: str) -> Optional[int]:
+        """
+        Look up or register an audio file by the SHA-256 of its content
+        
+        Returns:
+            The audio asset id, or None if the file cannot be read
+        """
+        digest = hashlib.sha256()
+        try:
+            with open(audio_file_path, 'rb') as audio_file:
+                for block in iter(lambda: audio_file.read(1 << 16), b''):
+                    digest.update(block)
+        except OSError as e:
+            logger.warning(f"Could not read audio file {audio_file_path}, turn stored without audio: {e}")
+            return None
+        sha256 = digest.digest()
+        
+        # Concurrent writers may register the same audio; let the unique index settle it
+        session.execute(
+            pg_insert(AudioAsset)
+            .values(path=audio_file_path, sha256=sha256)
+            .on_conflict_do_nothing(index_elements=[AudioAsset.sha256])
+        )
+        return session.execute(
+            select(AudioAsset.id).where(AudioAsset.sha256 == sha256)
+        ).scalar_one()
+    
+    def get_turn_seq(self, conversation_id: int) -> int:
+        """Return the last turn number issued for a conversation (0 if none)"""
+        with self.db_manager.get_readonly_session() as session:
+            turn_seq = session.execute(
+                select(Conversation.turn_seq).where(Conversation.id == conversation_id)
+            ).scalar_one_or_none()
+        return turn_seq or 0
+    
+    def flush_turns(self, rows: List[Dict[str, Any]]):
+        """
+        Bulk insert pre-numbered conversation turns in a single statement
+        
+        Args:
+            rows: Turn column values, each including conversation_id and turn_number;
+                an audio_file_path entry is resolved to its audio asset
+        """
+        if not rows:
+            return
+        
+        with self.db_manager.get_session() as session:
+            params = []
+            for row in rows:
+                row = dict(row)
+                audio_file_path = row.pop("audio_file_path", None)
+                row["audio_asset_id"] = (
+                    self._get_or_create_audio_asset_id(session, audio_file_path)
+                    if audio_file_path else None
+                )
+                params.append(row)
+            session.execute(ConversationTurn.__table__.insert(), params)
+            
+            # Keep each conversation's counter in step with the numbers issued client-side
+            last_turns: Dict[int, int] = {}
+            for row in rows:
+                conversation_id = row["conversation_id"]
+                last_turns[conversation_id] = max(last_turns.get(conversation_id, 0), row["turn_number"])
+            
+            for conversation_id, turn_number in last_turns.items():
+                session.execute(
+                    update(Conversation)
+                    .where(Conversation.id == conversation_id)
+                    .where(Conversation.turn_seq < turn_number)
+                    .values(turn_seq=turn_number)
+                )
     
     def end_conversation(self, conversation_id: int, outcome: str, 
                         emotion_score: Optional[float] = None,
                         sentiment_score: Optional[float] = None):
         """End a conversation and update its status"""
         with self.db_manager.get_session() as session:
-            conversation = session.query(Conversation).filter(
-                Conversation.id == conversation_id
-            ).first()
+            # Timestamps are stored as naive UTC, so compute "now" in UTC on the server
+            now_utc = utc_now()
+            session.execute(
+                update(Conversation)
+                .where(Conversation.id == conversation_id)
+                .values(
+                    end_time=now_utc,
+                    status='completed',
+                    outcome=outcome,
+                    emotion_score=emotion_score,
+                    sentiment_score=sentiment_score,
+                    duration_seconds=func.extract('epoch', now_utc - Conversation.start_time).cast(Integer)
+                )
+            )
+    
+    def get_conversation(self, call_id: str, with_turns: bool = False) -> Optional[Conversation]:
+        """
+        Get conversation by call ID
+        
+        Args:
+            call_id: Call identifier
+            with_turns: Whether to eagerly load the conversation turns
+        """
+        statement = select(Conversation).where(Conversation.call_id == call_id)
+        if with_turns:
+            statement = statement.options(selectinload(Conversation.turns))
+        if self.db_manager.debug:
+            # Surface accidental lazy loads (N+1 queries) during development
+            statement = statement.options(raiseload("*"))
+        
+        with self.db_manager.get_readonly_session() as session:
+            return session.execute(statement).scalar_one_or_none()
+    
+    def get_conversation_turns(self, conversation_id: int) -> List[RowMapping]:
+        """Get all turns for a conversation as read-only mappings, in turn order"""
+        with self.db_manager.get_readonly_session() as session:
+            return session.execute(
+                _TURNS_BY_CONVERSATION, {"conversation_id": conversation_id}
+            ).mappings().all()
+    
+    def get_conversation_turns_bulk(self, conversation_ids: List[int]) -> Dict[int, List[RowMapping]]:
+        """
+        Get the turns of several conversations in one query
+        
+        Args:
+            conversation_ids: Conversations to fetch
             
-            if conversation:
-                conversation.end_time = datetime.utcnow()
-                conversation.status = 'completed'
-                conversation.outcome = outcome
-                conversation.emotion_score = emotion_score
-                conversation.sentiment_score = sentiment_score
-                
-                if conversation.start_time:
-                    duration = conversation.end_time - conversation.start_time
-                    conversation.duration_seconds = int(duration.total_seconds())
-                
-                session.commit()
-    
-    def get_conversation(self, call_id: str) -> Optional[Conversation]:
-        """Get conversation by call ID"""
-        with self.db_manager.get_session() as session:
-            return session.query(Conversation).filter(
-                Conversation.call_id == call_id
-            ).first()
+        Returns:
+            Turn mappings in turn order, keyed by conversation ID
+        """
+        turns_by_conversation: Dict[int, List[RowMapping]] = {cid: [] for cid in conversation_ids}
+        if not conversation_ids:
+            return turns_by_conversation
+        
+        with self.db_manager.get_readonly_session() as session:
+            rows = session.execute(
+                _TURNS_BY_CONVERSATIONS, {"conversation_ids": list(conversation_ids)}
+            ).mappings()
+            for row in rows:
+                turns_by_conversation[row["conversation_id"]].append(row)
+        return turns_by_conversation
+
+
+class ConversationTurnBuffer:
+    """Accumulates conversation turns in memory and writes them in batches"""
     
-    def get_conversation_turns(self, conversation_id: int) -> List[ConversationTurn]:
-        """Get all turns for a conversation"""
-        with self.db_manager.get_session() as session:
-            return session.query(ConversationTurn)\
-                         .filter(ConversationTurn.conversation_id == conversation_id)\
-                         .order_by(ConversationTurn.turn_number)\
-                         .all()
+    def __init__(self, conversation_repo: ConversationRepository, max_batch_size: int = 50,
+                 flush_interval_ms: int = 200, faq_repo: Optional["FAQRepository"] = None,
+                 max_attempts: int = 25):
+        """
+        Initialize turn buffer
+        
+        Turn numbers are assigned here from a per-conversation counter seeded
+        from the conversation's turn_seq, so the buffer must be the only
+        writer for a conversation while it is buffering its turns.
+        
+        Args:
+            conversation_repo: Repository used to write batches
+            max_batch_size: Number of pending turns that triggers an immediate flush
+            flush_interval_ms: Interval of the background flusher
+            faq_repo: Repository receiving buffered FAQ usage counts (optional)
+            max_attempts: Failed flushes after which a turn is dropped
+        """
+        self.conversation_repo = conversation_repo
+        self.faq_repo = faq_repo
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_attempts = max(1, max_attempts)
+        self.dropped_turns = 0
+        # Each entry is [failed attempts, turn row]
+        self._pending: List[List[Any]] = []
+        self._faq_usage: Dict[int, int] = {}
+        self._turn_counters: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        # Held for a whole flush, so a flush returns only once earlier turns are written
+        self._flush_lock = threading.Lock()
+    
+    def add_turn(self, conversation_id: int, speaker: str, text_content: str,
+                 emotion: Optional[str] = None, confidence_score: Optional[float] = None,
+                 audio_file_path: Optional[str] = None,
+                 response_time_ms: Optional[int] = None) -> int:
+        """Queue a turn for writing and return its turn number"""
+        with self._lock:
+            seeded = conversation_id in self._turn_counters
+        if not seeded:
+            # Continue after turns already stored, e.g. before a restart
+            turn_seq = self.conversation_repo.get_turn_seq(conversation_id)
+            with self._lock:
+                self._turn_counters.setdefault(conversation_id, turn_seq)
+        
+        with self._lock:
+            turn_number = self._turn_counters[conversation_id] + 1
+            self._turn_counters[conversation_id] = turn_number
+            self._pending.append([0, {
+                "conversation_id": conversation_id,
+                "turn_number": turn_number,
+                "speaker": speaker,
+                "text_content": text_content,
+                "emotion": emotion,
+                "confidence_score": confidence_score,
+                "response_time_ms": response_time_ms,
+                "audio_file_path": audio_file_path
+            }])
+            should_flush = len(self._pending) >= self.max_batch_size
+        
+        if should_flush:
+            self.flush()
+        return turn_number
+    
+    def record_faq_usage(self, faq_id: int):
+        """Count one use of an FAQ entry, written with the next flush"""
+        if self.faq_repo is None:
+            raise RuntimeError("Turn buffer has no FAQ repository")
+        
+        with self._lock:
+            self._faq_usage[faq_id] = self._faq_usage.get(faq_id, 0) + 1
+    
+    def flush(self) -> int:
+        """
+        Write all pending turns and FAQ usage, returning the number of turns written
+        
+        A batch rejected for its data (constraint violation, bad value) is
+        retried row by row so only the offending turns are dropped. Other
+        failures put the batch back for the next flush, up to max_attempts.
+        """
+        with self._flush_lock:
+            with self._lock:
+                entries, self._pending = self._pending, []
+                usage, self._faq_usage = self._faq_usage, {}
+            
+            written = 0
+            if entries:
+                try:
+                    self.conversation_repo.flush_turns([row for _, row in entries])
+                    written = len(entries)
+                except (IntegrityError, DataError) as e:
+                    logger.warning(f"Turn batch rejected, writing turns one by one: {e}")
+                    written = self._flush_individually(entries, usage)
+                except Exception:
+                    self._requeue(entries, usage)
+                    raise
+            
+            if usage:
+                try:
+                    self.faq_repo.add_faq_usage(usage)
+                except Exception:
+                    with self._lock:
+                        self._merge_faq_usage(usage)
+                    raise
+            return written
+    
+    def _flush_individually(self, entries: List[List[Any]], usage: Dict[int, int]) -> int:
+        """Write turns one at a time, dropping the ones the database rejects"""
+        written = 0
+        for index, (_, row) in enumerate(entries):
+            try:
+                self.conversation_repo.flush_turns([row])
+                written += 1
+            except (IntegrityError, DataError) as e:
+                self._drop(row, e)
+            except Exception:
+                self._requeue(entries[index:], usage)
+                raise
+        return written
+    
+    def _requeue(self, entries: List[List[Any]], usage: Dict[int, int]):
+        """Put a failed batch back in front of newer turns, dropping exhausted ones"""
+        retained = []
+        for entry in entries:
+            entry[0] += 1
+            if entry[0] >= self.max_attempts:
+                self._drop(entry[1], RuntimeError(f"gave up after {entry[0]} attempts"))
+            else:
+                retained.append(entry)
+        
+        with self._lock:
+            self._pending[:0] = retained
+            self._merge_faq_usage(usage)
+    
+    def _drop(self, row: Dict[str, Any], error: Exception):
+        """Discard a turn that cannot be written, logging it in full"""
+        self.dropped_turns += 1
+        logger.error(
+            f"Dropping conversation turn {row['conversation_id']}/{row['turn_number']}: {error}; "
+            f"turn: {row}"
+        )
+    
+    def _merge_faq_usage(self, usage: Dict[int, int]):
+        """Return unwritten usage counts to the pending totals; caller holds the lock"""
+        for faq_id, uses in usage.items():
+            self._faq_usage[faq_id] = self._faq_usage.get(faq_id, 0) + uses
+    
+    def forget_conversation(self, conversation_id: int):
+        """Drop the turn counter of a finished conversation"""
+        with self._lock:
+            self._turn_counters.pop(conversation_id, None)
+    
+    async def run(self):
+        """Flush pending turns periodically on the database executor until cancelled"""
+        db_manager = self.conversation_repo.db_manager
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await db_manager.run(self.flush)
+            except Exception as e:
+                logger.error(f"Error flushing conversation turns: {e}")
 
 
 class FAQRepository:
     """Repository for FAQ and knowledge base operations"""
     
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, cache_ttl: float = 300.0):
         self.db_manager = db_manager
+        self._category_cache = TTLCache(maxsize=512, ttl=cache_ttl)
     
     def search_faq(self, query: str, language: str = 'de', limit: int = 5) -> List[FAQEntry]:
-        """Search FAQ entries by keywords"""
-        with self.db_manager.get_session() as session:
-            # Simple keyword matching - can be enhanced with full-text search
-            query_lower = query.lower()
+        """Search FAQ entries using PostgreSQL full-text search"""
+        with self.db_manager.get_readonly_session() as session:
+            ts_config = TEXT_SEARCH_CONFIGS.get(language, 'simple')
+            ts_query = func.plainto_tsquery(ts_config, query)
             
             return session.query(FAQEntry)\
                          .filter(FAQEntry.is_active == True)\
                          .filter(FAQEntry.language == language)\
-                         .filter(FAQEntry.keywords.op('&&')(func.array([query_lower])))\
-                         .order_by(FAQEntry.usage_count.desc())\
+                         .filter(FAQEntry.search_vector.op('@@')(ts_query))\
+                         .order_by(func.ts_rank(FAQEntry.search_vector, ts_query).desc(),
+                                   FAQEntry.usage_count.desc())\
                          .limit(limit)\
                          .all()
     
-    def get_faq_by_category(self, category: str, language: str = 'de') -> List[FAQEntry]:
-        """Get FAQ entries by category"""
-        with self.db_manager.get_session() as session:
-            return session.query(FAQEntry)\
-                         .filter(FAQEntry.category == category)\
-                         .filter(FAQEntry.language == language)\
-                         .filter(FAQEntry.is_active == True)\
-                         .order_by(FAQEntry.usage_count.desc())\
-                         .all()
+    def get_faq_by_category(self, category: str, language: str = 'de') -> List[RowMapping]:
+        """Get FAQ entries by category as read-only mappings, served from a TTL cache when possible"""
+        key = (category, language)
+        entries = self._category_cache.get(key)
+        if entries is not _MISSING:
+            return entries
+        
+        with self.db_manager.get_readonly_session() as session:
+            entries = session.execute(
+                _FAQ_BY_CATEGORY, {"category": category, "language": language}
+            ).mappings().all()
+        
+        self._category_cache.set(key, entries)
+        return entries
+    
+    def invalidate_cache(self):
+        """Drop cached FAQ lookups after FAQ content has been changed"""
+        self._category_cache.clear()
     
     def increment_faq_usage(self, faq_id: int):
         """Increment usage count for an FAQ entry"""
         with self.db_manager.get_session() as session:
-            faq = session.query(FAQEntry).filter(FAQEntry.id == faq_id).first()
-            if faq:
-                faq.usage_count += 1
-                session.commit()
+            session.execute(
+                update(FAQEntry)
+                .where(FAQEntry.id == faq_id)
+                .values(usage_count=FAQEntry.usage_count + 1)
+            )
+    
+    def add_faq_usage(self, usage: Dict[int, int]):
+        """
+        Add accumulated usage counts to several FAQ entries in one executemany
+        
+        Args:
+            usage: Number of new uses per FAQ entry ID
+        """
+        if not usage:
+            return
+        
+        with self.db_manager.get_session() as session:
+            session.execute(
+                _ADD_FAQ_USAGE,
+                [{"faq_id": faq_id, "uses": uses} for faq_id, uses in usage.items()]
+            )
 
 
 class ScriptRepository:
     """Repository for conversation script operations"""
     
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, cache_ttl: float = 300.0):
         self.db_manager = db_manager
+        self._script_cache = TTLCache(maxsize=512, ttl=cache_ttl)
     
     def get_script_by_type(self, script_type: str, language: str = 'de') -> Optional[ConversationScript]:
-        """Get a conversation script by type"""
-        with self.db_manager.get_session() as session:
-            return session.query(ConversationScript)\
-                         .filter(ConversationScript.script_type == script_type)\
-                         .filter(ConversationScript.language == language)\
-                         .filter(ConversationScript.is_active == True)\
-                         .order_by(ConversationScript.success_rate.desc())\
-                         .first()
+        """Get a conversation script by type, served from a TTL cache when possible"""
+        key = (script_type, language)
+        script = self._script_cache.get(key)
+        if script is not _MISSING:
+            return script
+        
+        with self.db_manager.get_readonly_session() as session:
+            script = session.query(ConversationScript)\
+                           .filter(ConversationScript.script_type == script_type)\
+                           .filter(ConversationScript.language == language)\
+                           .filter(ConversationScript.is_active == True)\
+                           .order_by(ConversationScript.success_rate.desc())\
+                           .first()
+        
+        self._script_cache.set(key, script)
+        return script
     
-    def get_all_scripts(self, language: str = 'de') -> List[ConversationScript]:
-        """Get all active conversation scripts"""
-        with self.db_manager.get_session() as session:
-            return session.query(ConversationScript)\
-                         .filter(ConversationScript.language == language)\
-                         .filter(ConversationScript.is_active == True)\
-                         .order_by(ConversationScript.script_type, ConversationScript.success_rate.desc())\
-                         .all()
+    def invalidate_cache(self):
+        """Drop cached script lookups after scripts have been changed"""
+        self._script_cache.clear()
+    
+    def get_all_scripts(self, language: str = 'de') -> List[RowMapping]:
+        """Get all active conversation scripts as read-only mappings"""
+        with self.db_manager.get_readonly_session() as session:
+            return session.execute(
+                _ACTIVE_SCRIPTS_BY_LANGUAGE, {"language": language}
+            ).mappings().all()
 
 
 class TrainingRepository:
@@ -235,35 +846,55 @@ class TrainingRepository:
                          emotion_context: Optional[str] = None) -> TrainingData:
         """Add training data from a conversation"""
         with self.db_manager.get_session() as session:
-            training_data = TrainingData(
-                conversation_id=conversation_id,
-                input_text=input_text,
-                expected_response=expected_response,
-                actual_response=actual_response,
-                feedback_score=feedback_score,
-                emotion_context=emotion_context
-            )
-            session.add(training_data)
-            session.commit()
-            session.refresh(training_data)
-            return training_data
+            return session.execute(_INSERT_TRAINING_DATA, {
+                "conversation_id": conversation_id,
+                "input_text": input_text,
+                "expected_response": expected_response,
+                "actual_response": actual_response,
+                "feedback_score": feedback_score,
+                "emotion_context": emotion_context
+            }).scalar_one()
     
-    def get_training_data(self, limit: int = 1000, used_for_training: bool = False) -> List[TrainingData]:
-        """Get training data for model improvement"""
-        with self.db_manager.get_session() as session:
-            return session.query(TrainingData)\
-                         .filter(TrainingData.is_used_for_training == used_for_training)\
-                         .order_by(TrainingData.feedback_score.desc())\
-                         .limit(limit)\
-                         .all()
+    def get_training_data(self, limit: int = 1000, used_for_training: bool = False,
+                          after: Optional[Tuple[int, int]] = None) -> List[TrainingData]:
+        """Get a page of training data ordered by feedback score
+        
+        Args:
+            limit: Maximum number of rows to return
+            used_for_training: Whether to fetch rows already used for training
+            after: Keyset cursor from training_data_cursor() of the last row of
+                the previous page; None starts from the highest score
+        """
+        params = {"used_for_training": used_for_training, "limit": limit}
+        statement = _TRAINING_DATA_BY_USAGE
+        if after is not None:
+            statement = _TRAINING_DATA_BY_USAGE_AFTER
+            params["after_score"], params["after_id"] = after
+        
+        with self.db_manager.get_readonly_session() as session:
+            return session.execute(statement, params).scalars().all()
+    
+    @staticmethod
+    def training_data_cursor(training_data: TrainingData) -> Tuple[int, int]:
+        """Build the keyset cursor that continues after the given row"""
+        return (training_data.feedback_score or 0, training_data.id)
     
     def mark_training_data_used(self, training_data_ids: List[int]):
-        """Mark training data as used"""
+        """Mark training data as used
+        
+        Args:
+            training_data_ids: IDs to mark, updated in chunks of
+                MARK_USED_CHUNK_SIZE within a single transaction
+        """
         with self.db_manager.get_session() as session:
-            session.query(TrainingData)\
-                   .filter(TrainingData.id.in_(training_data_ids))\
-                   .update({TrainingData.is_used_for_training: True})
-            session.commit()
+            for start in range(0, len(training_data_ids), MARK_USED_CHUNK_SIZE):
+                chunk = training_data_ids[start:start + MARK_USED_CHUNK_SIZE]
+                session.execute(
+                    update(TrainingData)
+                    .where(TrainingData.id.in_(chunk))
+                    .values(is_used_for_training=True)
+                    .execution_options(synchronize_session=False)
+                )
 
 
 class CustomerRepository:
@@ -271,29 +902,59 @@ class CustomerRepository:
     
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
+        # In-memory do-not-call list; None until refresh_do_not_call() has run
+        self._do_not_call_phones: Optional[FrozenSet[str]] = None
+    
+    def refresh_do_not_call(self) -> int:
+        """
+        Reload the do-not-call phone numbers from the database
+        
+        Returns:
+            Number of phone numbers on the list
+        """
+        with self.db_manager.get_readonly_session() as session:
+            phones = frozenset(session.execute(_DO_NOT_CALL_PHONES).scalars())
+        self._do_not_call_phones = phones
+        return len(phones)
+    
+    def is_do_not_call(self, phone_number: str) -> bool:
+        """Check the do-not-call list, from memory once it has been loaded"""
+        phones = self._do_not_call_phones
+        if phones is None:
+            customer = self.get_customer_by_phone(phone_number)
+            return bool(customer and customer.do_not_call)
+        return phone_number in phones
     
     def get_customer_by_phone(self, phone_number: str) -> Optional[Customer]:
         """Get customer by phone number"""
-        with self.db_manager.get_session() as session:
+        with self.db_manager.get_readonly_session() as session:
             return session.query(Customer)\
                          .filter(Customer.phone_number == phone_number)\
                          .first()
     
     def create_or_update_customer(self, phone_number: str, **kwargs) -> Customer:
-        """Create or update customer information"""
+        """Create or update customer information in a single upsert"""
+        columns = Customer.__table__.c
+        values = {key: value for key, value in kwargs.items() if key in columns}
+        
+        statement = pg_insert(Customer).values(phone_number=phone_number, **values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Customer.phone_number],
+            set_={
+                **{key: statement.excluded[key] for key in values},
+                "updated_at": func.now()
+            }
+        ).returning(Customer)
+        
         with self.db_manager.get_session() as session:
-            customer = session.query(Customer)\
-                             .filter(Customer.phone_number == phone_number)\
-                             .first()
-            
-            if customer:
-                for key, value in kwargs.items():
-                    if hasattr(customer, key):
-                        setattr(customer, key, value)
-            else:
-                customer = Customer(phone_number=phone_number, **kwargs)
-                session.add(customer)
-            
-            session.commit()
-            session.refresh(customer)
-            return customer
\ No newline at end of file
+            customer = session.execute(
+                statement, execution_options={"populate_existing": True}
+            ).scalar_one()
+        
+        # Keep the in-memory do-not-call list in step with this write
+        phones = self._do_not_call_phones
+        if phones is not None and customer.do_not_call != (phone_number in phones):
+            self._do_not_call_phones = (
+                phones | {phone_number} if customer.do_not_call else phones - {phone_number}
+            )
+        return customer
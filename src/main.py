@@ -1,21 +1,49 @@
 """
 Main application for the AI Cold Calling Agent
 """
+import atexit
+import contextlib
 import logging
 import asyncio
+import io
+import os
+import platform
+import queue
+import re
 import signal
+import subprocess
+import tempfile
+import time
 import uuid
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+import numpy as np
+import soundfile as sf
+
 from .config import create_config_manager
-from .database import DatabaseManager, ConversationRepository, FAQRepository, ScriptRepository, TrainingRepository, CustomerRepository
-from .speech import create_stt_engine, create_tts_engine
+from .database import DatabaseManager, ConversationRepository, ConversationTurnBuffer, FAQRepository, ScriptRepository, TrainingRepository, CustomerRepository
+from .speech import AudioProcessor, STTBatcher, create_stt_engine, create_tts_engine
 from .conversation import create_conversation_manager, create_emotion_recognition_system
 from .training import create_continuous_trainer
 from .telephony import create_asterisk_provider
 
+try:
+    import uvloop
+except ImportError:
+    # Optional; the default asyncio event loop is used without it
+    uvloop = None
+
+try:
+    import sounddevice as sd
+except (ImportError, OSError):
+    # Missing package or PortAudio library; playback falls back to system players
+    sd = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -23,6 +51,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# International (E.164) phone number format, checked after stripping separators
+_PHONE_RE = re.compile(r'^\+?[1-9]\d{1,14}$')
+_PHONE_STRIP = str.maketrans('', '', ' -')
+
+# Signals that request a graceful shutdown
+SHUTDOWN_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+# Seconds a database health probe result is reused by get_system_status
+DB_HEALTH_TTL = 5.0
+
+
+@dataclass
+class CallInfo:
+    """State kept for each active call"""
+    __slots__ = ("start_monotonic", "customer_phone", "customer_name", "conversation_id",
+                 "capture_buffer", "decode_buffer")
+    
+    start_monotonic: float
+    customer_phone: str
+    customer_name: Optional[str]
+    conversation_id: int
+    capture_buffer: Optional[np.ndarray]
+    decode_buffer: Optional[np.ndarray]
+
 
 class AICallingAgent:
     """Main AI Cold Calling Agent application"""
@@ -57,10 +109,28 @@ class AICallingAgent:
         self.script_repo = None
         self.training_repo = None
         self.customer_repo = None
+        self.turn_buffer = None
+        self._turn_flush_task = None
+        self._speech_init_task = None
+        self._warmup_task = None
+        self._training_queue = None
+        self._training_task = None
+        self._dnc_refresh_task = None
+        self._status_config = {}
+        self._db_healthy = False
+        self._db_health_checked_at = float("-inf")
+        
+        # Dedicated worker threads so model inference never runs on the event loop
+        self._stt_pool = None
+        self._tts_pool = None
+        self._stt_batcher = None
+        self._log_listener = None
         
         # Application state
         self.is_running = False
-        self.active_calls = {}
+        self._stopping = False
+        self._shutdown_requested = None
+        self.active_calls: Dict[str, CallInfo] = {}
         
         self._setup_logging()
     
@@ -69,46 +139,67 @@ class AICallingAgent:
         log_config = self.config_manager.get_section("logging")
         log_level = log_config.get("level", "INFO")
         log_file = log_config.get("file_path", "logs/aiagent.log")
+        max_bytes = log_config.get("max_file_size_mb", 100) * 1024 * 1024
+        backup_count = log_config.get("backup_count", 5)
         
         # Create logs directory
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
         
         # Configure file handler
-        file_handler = logging.FileHandler(log_file)
+        file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
         file_handler.setLevel(getattr(logging, log_level))
         
         formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            log_config.get("format", '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
         )
         file_handler.setFormatter(formatter)
         
-        # Add handler to root logger
+        # Log calls only enqueue records; a listener thread formats and writes them,
+        # so console and file I/O never block the event loop
         root_logger = logging.getLogger()
-        root_logger.addHandler(file_handler)
+        handlers = [*root_logger.handlers, file_handler]
+        for handler in root_logger.handlers[:]:
+            root_logger.removeHandler(handler)
+        
+        log_queue = queue.SimpleQueue()
+        root_logger.addHandler(QueueHandler(log_queue))
         root_logger.setLevel(getattr(logging, log_level))
         
+        self._log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self._log_listener.start()
+        # Drain the queue at exit even when start() failed and stop() never ran
+        atexit.register(self._stop_log_listener)
+        
         logger.info(f"Logging configured: level={log_level}, file={log_file}")
     
     async def initialize(self):
         """Initialize all components"""
         logger.info("Initializing AI Cold Calling Agent...")
         
+        # Configuration reported by get_system_status, resolved once
+        self._status_config = {
+            "database_type": self.config_manager.get("database", "type"),
+            "stt_engine": self.config_manager.get("speech_recognition", "engine"),
+            "tts_engine": self.config_manager.get("text_to_speech", "engine"),
+            "telephony_enabled": self.config_manager.get("asterisk", "enabled", False),
+            "asterisk_host": self.config_manager.get("asterisk", "host", "localhost")
+        }
+        
         try:
             # Initialize database
             await self._initialize_database()
             
-            # Initialize speech components
-            await self._initialize_speech_components()
-            
-            # Initialize telephony system
-            await self._initialize_telephony_system()
+            # Load speech models in the background; start_call waits for them
+            self._speech_init_task = asyncio.create_task(self._initialize_speech_components())
+            self._speech_init_task.add_done_callback(self._log_speech_init_failure)
             
-            # Initialize conversation system
-            await self._initialize_conversation_system()
-            
-            # Initialize training system
-            await self._initialize_training_system()
+            # Telephony, conversation and training only share the repositories set up above
+            await asyncio.gather(
+                self._initialize_telephony_system(),
+                self._initialize_conversation_system(),
+                self._initialize_training_system()
+            )
             
             logger.info("AI Cold Calling Agent initialized successfully")
             
@@ -123,46 +214,117 @@ class AICallingAgent:
         # Create database manager
         database_url = self.config_manager.get_database_url()
         echo = self.config_manager.get("database", "echo", False)
-        pool_size = self.config_manager.get("database", "pool_size", 5)
+        pool_size = self.config_manager.get("database", "pool_size", 10)
         
-        self.db_manager = DatabaseManager(database_url, echo, pool_size)
+        self.db_manager = DatabaseManager(
+            database_url, echo, pool_size,
+            pre_ping=self.config_manager.get("database", "pool_pre_ping", False),
+            pool_recycle=self.config_manager.get("database", "pool_recycle", 60),
+            pool_timeout=self.config_manager.get("database", "pool_timeout", 30),
+            max_overflow=self.config_manager.get("database", "max_overflow", 5),
+            debug=self.config_manager.get("application", "debug", False),
+            prepare_threshold=self.config_manager.get("database", "prepare_threshold", 5),
+            query_cache_size=self.config_manager.get("database", "query_cache_size", 2048)
+        )
         
         # Test connection
-        if not self.db_manager.test_connection():
+        if not await self.db_manager.run(self.db_manager.test_connection):
             raise RuntimeError("Database connection failed")
         
         # Create tables
-        self.db_manager.create_tables()
+        await self.db_manager.run(self.db_manager.create_tables)
         
         # Initialize repositories
         self.conversation_repo = ConversationRepository(self.db_manager)
-        self.faq_repo = FAQRepository(self.db_manager)
-        self.script_repo = ScriptRepository(self.db_manager)
+        lookup_cache_ttl = self.config_manager.get("database", "lookup_cache_ttl", 300)
+        self.faq_repo = FAQRepository(self.db_manager, cache_ttl=lookup_cache_ttl)
+        self.script_repo = ScriptRepository(self.db_manager, cache_ttl=lookup_cache_ttl)
         self.training_repo = TrainingRepository(self.db_manager)
         self.customer_repo = CustomerRepository(self.db_manager)
         
+        # Load the do-not-call list so call start checks it in memory
+        dnc_count = await self.db_manager.run(self.customer_repo.refresh_do_not_call)
+        logger.info(f"Loaded {dnc_count} do-not-call numbers")
+        
         logger.info("Database initialized successfully")
     
     async def _initialize_speech_components(self):
         """Initialize speech recognition and synthesis"""
         logger.info("Initializing speech components...")
         
-        # Initialize STT
+        loop = asyncio.get_running_loop()
+        
+        # Load both models at once; loading blocks, so keep it off the event loop
         stt_config = self.config_manager.get_section("speech_recognition")
-        self.stt_engine = create_stt_engine(stt_config)
+        tts_config = self.config_manager.get_section("text_to_speech")
+        self.stt_engine, self.tts_engine = await asyncio.gather(
+            loop.run_in_executor(None, create_stt_engine, stt_config),
+            loop.run_in_executor(None, create_tts_engine, tts_config)
+        )
+        
+        # Initialize STT
+        self._stt_pool = ThreadPoolExecutor(
+            max_workers=stt_config.get("workers", 2), thread_name_prefix="stt"
+        )
         
         if not self.stt_engine.is_available():
             logger.warning("STT engine not available")
         
+        # Concurrent calls share one engine call per batch instead of one each
+        self._stt_batcher = STTBatcher(
+            self.stt_engine,
+            self._stt_pool,
+            max_batch_size=stt_config.get("batch_size", 8),
+            max_wait_ms=stt_config.get("batch_max_wait_ms", 10)
+        )
+        self._stt_batcher.start()
+        
         # Initialize TTS
-        tts_config = self.config_manager.get_section("text_to_speech")
-        self.tts_engine = create_tts_engine(tts_config)
+        self._tts_pool = ThreadPoolExecutor(
+            max_workers=tts_config.get("workers", 2), thread_name_prefix="tts"
+        )
         
         if not self.tts_engine.is_available():
             logger.warning("TTS engine not available")
         
+        # Pay model warmup (kernel compilation, caches) before the first call, not during it
+        if stt_config.get("warmup", True) or tts_config.get("warmup", True):
+            self._warmup_task = asyncio.create_task(
+                self._warmup_models(stt_config.get("warmup", True), tts_config.get("warmup", True))
+            )
+        
         logger.info("Speech components initialized")
     
+    @staticmethod
+    def _log_speech_init_failure(task: asyncio.Task):
+        """Report a failed background speech initialization"""
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Failed to initialize speech components: {task.exception()}")
+    
+    async def _ensure_speech_components(self):
+        """Wait until the background speech initialization has finished"""
+        if self._speech_init_task is not None:
+            await asyncio.shield(self._speech_init_task)
+    
+    async def _warmup_models(self, warmup_stt: bool, warmup_tts: bool):
+        """Run one throwaway transcription and synthesis in the background"""
+        loop = asyncio.get_running_loop()
+        
+        if warmup_stt and self.stt_engine.is_available():
+            try:
+                silence = np.zeros(8000, dtype=np.float32)  # 0.5 s at 16 kHz
+                await loop.run_in_executor(self._stt_pool, self.stt_engine.transcribe_audio_data, silence, 16000)
+                logger.info("STT engine warmed up")
+            except Exception as e:
+                logger.warning(f"STT warmup failed: {e}")
+        
+        if warmup_tts and self.tts_engine.is_available():
+            try:
+                await loop.run_in_executor(self._tts_pool, self.tts_engine.synthesize_to_array, "Hallo.")
+                logger.info("TTS engine warmed up")
+            except Exception as e:
+                logger.warning(f"TTS warmup failed: {e}")
+    
     async def _initialize_telephony_system(self):
         """Initialize telephony system with Asterisk"""
         logger.info("Initializing telephony system...")
@@ -212,15 +374,28 @@ class AICallingAgent:
         """Initialize conversation management system"""
         logger.info("Initializing conversation system...")
         
-        # Initialize emotion recognition
+        # Initialize emotion recognition; its models load off the event loop
         emotion_config = self.config_manager.get_section("emotion_recognition")
-        self.emotion_system = create_emotion_recognition_system(emotion_config)
+        self.emotion_system = await asyncio.get_running_loop().run_in_executor(
+            None, create_emotion_recognition_system, emotion_config
+        )
+        
+        # Buffer turn writes so each utterance does not cost its own commit
+        conversation_config = self.config_manager.get_section("conversation")
+        if conversation_config.get("turn_write_buffer", True):
+            self.turn_buffer = ConversationTurnBuffer(
+                self.conversation_repo,
+                max_batch_size=conversation_config.get("turn_batch_size", 50),
+                flush_interval_ms=conversation_config.get("turn_flush_interval_ms", 200),
+                faq_repo=self.faq_repo
+            )
         
         # Initialize conversation manager
         self.conversation_manager = create_conversation_manager(
             self.conversation_repo,
             self.faq_repo,
-            self.script_repo
+            self.script_repo,
+            self.turn_buffer
         )
         
         logger.info("Conversation system initialized")
@@ -257,29 +432,34 @@ class AICallingAgent:
             logger.info(f"Starting call {call_id} to {customer_phone}")
             
             # Check if customer is on do-not-call list
-            customer = self.customer_repo.get_customer_by_phone(customer_phone)
-            if customer and customer.do_not_call:
+            if self.customer_repo.is_do_not_call(customer_phone):
                 raise ValueError("Customer is on do-not-call list")
             
+            # Speech models may still be loading from initialize()
+            await self._ensure_speech_components()
+            
             # Initialize actual phone call (placeholder for real telephony integration)
             call_success = await self._initiate_phone_call(customer_phone)
             if not call_success:
                 raise RuntimeError(f"Failed to establish phone connection to {customer_phone}")
             
             # Start conversation
-            conversation_result = self.conversation_manager.start_conversation(
+            conversation_result = await self.db_manager.run(
+                self.conversation_manager.start_conversation,
                 call_id=call_id,
                 customer_phone=customer_phone,
                 customer_name=customer_name
             )
             
             # Store call in active calls
-            self.active_calls[call_id] = {
-                "start_time": datetime.utcnow(),
-                "customer_phone": customer_phone,
-                "customer_name": customer_name,
-                "conversation_id": conversation_result["conversation_id"]
-            }
+            self.active_calls[call_id] = CallInfo(
+                time.monotonic(),
+                customer_phone,
+                customer_name,
+                conversation_result["conversation_id"],
+                None,
+                None
+            )
             
             # Generate and play opening message
             opening_text = conversation_result["response"]
@@ -303,16 +483,18 @@ class AICallingAgent:
         Returns:
             Processing results including agent response
         """
-        if call_id not in self.active_calls:
+        call_info = self.active_calls.get(call_id)
+        if call_info is None:
             raise ValueError(f"No active call found: {call_id}")
         
         try:
             # Convert audio to text
-            stt_result = await self._transcribe_audio(audio_data)
+            stt_result = await self._transcribe_audio(audio_data, call_info)
             customer_text = stt_result["text"]
             confidence = stt_result["confidence"]
             
-            logger.debug(f"Call {call_id} - Customer: {customer_text}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Call {call_id} - Customer: {customer_text}")
             
             # Analyze emotion
             emotion_result = None
@@ -323,7 +505,8 @@ class AICallingAgent:
                 emotion = "neutral"
             
             # Process through conversation manager
-            conversation_result = self.conversation_manager.process_customer_input(
+            conversation_result = await self.db_manager.run(
+                self.conversation_manager.process_customer_input,
                 call_id=call_id,
                 customer_input=customer_text,
                 emotion=emotion,
@@ -340,7 +523,8 @@ class AICallingAgent:
             if conversation_result["should_end"]:
                 await self._end_call(call_id, conversation_result["outcome"])
             
-            logger.debug(f"Call {call_id} - Agent: {agent_response}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Call {call_id} - Agent: {agent_response}")
             
             return {
                 "call_id": call_id,
@@ -357,33 +541,27 @@ class AICallingAgent:
             logger.error(f"Error processing audio input for call {call_id}: {e}")
             raise
     
-    async def _transcribe_audio(self, audio_data: bytes) -> Dict[str, Any]:
+    async def _transcribe_audio(self, audio_data: bytes, call_info: Optional[CallInfo] = None) -> Dict[str, Any]:
         """Transcribe audio to text"""
         if not self.stt_engine:
             return {"text": "", "confidence": 0.0}
         
         try:
-            import numpy as np
-            import tempfile
-            import os
+            # Turns of one call never overlap, so each call decodes into the same float buffer
+            buffer = None
+            if call_info is not None:
+                buffer = call_info.decode_buffer
+                if buffer is None or len(buffer) < len(audio_data) // 2:
+                    buffer = call_info.decode_buffer = np.empty(len(audio_data) // 2, dtype=np.float32)
             
-            # Convert bytes to audio file for Whisper processing
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_file.write(audio_data)
-                temp_file_path = temp_file.name
+            # Decode the PCM in memory and hand the samples straight to the engine
+            audio_array, sample_rate = AudioProcessor.decode_pcm_bytes(audio_data, out=buffer)
+            result = await self._stt_batcher.submit(audio_array, sample_rate)
+            return {
+                "text": result.get("text", ""),
+                "confidence": result.get("confidence", 0.0)
+            }
             
-            try:
-                # Use Whisper to transcribe the audio file
-                result = self.stt_engine.transcribe_file(temp_file_path)
-                return {
-                    "text": result.get("text", ""),
-                    "confidence": result.get("confidence", 0.0)
-                }
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
-                    
         except Exception as e:
             logger.error(f"Error transcribing audio: {e}")
             return {"text": "", "confidence": 0.0}
@@ -395,48 +573,69 @@ class AICallingAgent:
             return
         
         try:
-            import tempfile
-            import os
-            import subprocess
-            import platform
-            
-            # Generate speech to temporary file
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_file_path = temp_file.name
+            loop = asyncio.get_running_loop()
+            if sd is not None:
+                # Start playing the first sentence while the rest is still being synthesized
+                stream = None
+                try:
+                    async for pcm, sample_rate in self.tts_engine.synthesize_stream(text, self._tts_pool):
+                        if stream is None:
+                            stream = sd.OutputStream(samplerate=sample_rate, channels=1, dtype='float32')
+                            stream.start()
+                        await loop.run_in_executor(None, stream.write, pcm.reshape(-1, 1))
+                finally:
+                    if stream is not None:
+                        # stop() blocks until the queued audio has played out
+                        await loop.run_in_executor(None, stream.stop)
+                        stream.close()
+            else:
+                await loop.run_in_executor(self._tts_pool, self._play_with_system_player, text)
             
-            try:
-                # Synthesize speech to file
-                self.tts_engine.synthesize(text, temp_file_path)
-                
-                # Play the audio file using system audio player
-                system = platform.system().lower()
-                if system == "linux":
-                    # Use aplay on Linux (common on Ubuntu)
-                    subprocess.run(["aplay", temp_file_path], 
-                                 capture_output=True, check=False)
-                elif system == "darwin":
-                    # Use afplay on macOS
-                    subprocess.run(["afplay", temp_file_path], 
-                                 capture_output=True, check=False)
-                elif system == "windows":
-                    # Use Windows Media Player on Windows
-                    subprocess.run(["start", "/wait", temp_file_path], 
-                                 shell=True, capture_output=True, check=False)
-                else:
-                    logger.warning(f"Audio playback not supported on {system}")
-                
+            if logger.isEnabledFor(logging.DEBUG):
                 logger.debug(f"Spoke text: {text[:50]}...")
-                
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
             
         except Exception as e:
             logger.error(f"Error in text-to-speech: {e}")
             # Fallback: just log the text
             logger.info(f"Would speak: {text}")
     
+    def _play_with_system_player(self, text: str):
+        """Synthesize speech and play it with the platform audio player"""
+        system = platform.system().lower()
+        if system == "linux":
+            # aplay (common on Ubuntu) reads WAV from stdin, so build the file in memory
+            pcm, sample_rate = self.tts_engine.synthesize_to_array(text)
+            wav = io.BytesIO()
+            sf.write(wav, pcm, sample_rate, format="WAV", subtype="PCM_16")
+            subprocess.run(["aplay", "-q", "-"], input=wav.getvalue(),
+                         capture_output=True, check=False)
+            return
+        
+        # Other platform players only take a path, so go through a temporary file
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+            temp_file_path = temp_file.name
+        
+        try:
+            # Synthesize speech to file
+            self.tts_engine.synthesize(text, temp_file_path)
+            
+            # Play the audio file using system audio player
+            if system == "darwin":
+                # Use afplay on macOS
+                subprocess.run(["afplay", temp_file_path], 
+                             capture_output=True, check=False)
+            elif system == "windows":
+                # Use Windows Media Player on Windows
+                subprocess.run(["start", "/wait", temp_file_path], 
+                             shell=True, capture_output=True, check=False)
+            else:
+                logger.warning(f"Audio playback not supported on {system}")
+            
+        finally:
+            # Clean up temporary file
+            if os.path.exists(temp_file_path):
+                os.unlink(temp_file_path)
+    
     async def _initiate_phone_call(self, phone_number: str) -> bool:
         """
         Initiate an actual phone call using Asterisk
@@ -449,9 +648,7 @@ class AICallingAgent:
         """
         try:
             # Validate phone number format
-            import re
-            phone_pattern = r'^\+?[1-9]\d{1,14}$'  # International format
-            if not re.match(phone_pattern, phone_number.replace(' ', '').replace('-', '')):
+            if not _PHONE_RE.match(phone_number.translate(_PHONE_STRIP)):
                 logger.error(f"Invalid phone number format: {phone_number}")
                 return False
             
@@ -491,126 +688,131 @@ class AICallingAgent:
         Returns:
             Raw audio data as bytes
         """
-        if call_id not in self.active_calls:
+        call_info = self.active_calls.get(call_id)
+        if call_info is None:
             raise ValueError(f"No active call found: {call_id}")
         
+        if sd is None:
+            logger.warning("sounddevice not available - cannot capture real audio input")
+            return b''
+        
         try:
-            import pyaudio
-            import wave
-            import tempfile
-            
             # Audio configuration
-            chunk = 1024
-            sample_format = pyaudio.paInt16
-            channels = 1
             fs = 16000  # Sample rate for speech recognition
+            frames = int(fs * duration_seconds)
+            
+            # One capture buffer per call, reused for every turn; the result is copied out below
+            buffer = call_info.capture_buffer
+            if buffer is None or len(buffer) < frames:
+                buffer = call_info.capture_buffer = np.empty((frames, 1), dtype=np.int16)
+            filled = 0
             
-            p = pyaudio.PyAudio()
+            loop = asyncio.get_running_loop()
+            done = asyncio.Event()
+            
+            def on_audio(indata, frame_count, time_info, status):
+                # Runs on the PortAudio thread; copy straight into the capture buffer
+                nonlocal filled
+                count = min(frame_count, frames - filled)
+                buffer[filled:filled + count] = indata[:count]
+                filled += count
+                if filled >= frames:
+                    loop.call_soon_threadsafe(done.set)
+                    raise sd.CallbackStop
             
             logger.debug(f"Starting to listen for customer input on call {call_id}")
             
-            # Start recording
-            stream = p.open(format=sample_format,
-                          channels=channels,
-                          rate=fs,
-                          frames_per_buffer=chunk,
-                          input=True)
-            
-            frames = []
-            
-            # Record for specified duration
-            for i in range(0, int(fs / chunk * duration_seconds)):
-                data = stream.read(chunk)
-                frames.append(data)
-            
-            # Stop and close the stream
-            stream.stop_stream()
-            stream.close()
-            p.terminate()
-            
-            # Convert frames to bytes
-            with tempfile.NamedTemporaryFile(suffix=".wav") as temp_file:
-                wf = wave.open(temp_file.name, 'wb')
-                wf.setnchannels(channels)
-                wf.setsampwidth(p.get_sample_size(sample_format))
-                wf.setframerate(fs)
-                wf.writeframes(b''.join(frames))
-                wf.close()
-                
-                # Read the audio file as bytes
-                with open(temp_file.name, 'rb') as f:
-                    audio_data = f.read()
+            with sd.InputStream(samplerate=fs, channels=1, dtype='int16', callback=on_audio):
+                await done.wait()
+            
+            # Raw 16 kHz mono int16 PCM, decoded by _transcribe_audio without a header
+            audio_data = buffer[:filled].tobytes()
             
             logger.debug(f"Captured {len(audio_data)} bytes of audio from call {call_id}")
             return audio_data
             
-        except ImportError:
-            logger.warning("PyAudio not available - cannot capture real audio input")
-            # Return empty audio data
-            return b''
         except Exception as e:
             logger.error(f"Error capturing audio input for call {call_id}: {e}")
             return b''
     
     async def _end_call(self, call_id: str, outcome: str):
         """End a call and clean up"""
-        if call_id in self.active_calls:
-            call_info = self.active_calls[call_id]
-            
+        call_info = self.active_calls.get(call_id)
+        if call_info is None:
+            return
+        
+        try:
             # End conversation
-            self.conversation_manager.end_conversation(call_id, outcome)
+            await self.db_manager.run(self.conversation_manager.end_conversation, call_id, outcome)
             
-            # Generate training data if trainer is available
-            if self.trainer:
-                try:
-                    # Get conversation data
-                    conversation = self.conversation_repo.get_conversation(call_id)
-                    if conversation:
-                        # Get conversation turns
-                        conversation_turns = self.conversation_repo.get_conversation_turns(conversation.id)
-                        
-                        # Convert turns to format expected by trainer
-                        turn_data = []
-                        for turn in conversation_turns:
-                            turn_data.append({
-                                "speaker": turn.speaker,
-                                "text_content": turn.text_content,
-                                "emotion": turn.emotion,
-                                "confidence_score": turn.confidence_score,
-                                "timestamp": turn.timestamp,
-                                "response_time_ms": turn.response_time_ms
-                            })
-                        
-                        # Generate training data from the conversation
-                        self.trainer.data_generator.generate_training_data_from_conversation(
-                            conversation.id, turn_data, outcome
-                        )
-                        
-                        logger.debug(f"Generated training data for conversation {conversation.id}")
-                        
-                except Exception as e:
-                    logger.error(f"Error generating training data for call {call_id}: {e}")
-            
-            # Remove from active calls
-            del self.active_calls[call_id]
-            
-            logger.info(f"Call {call_id} ended with outcome: {outcome}")
+            # Hand training data generation to the background worker
+            if self._training_queue is not None:
+                self._training_queue.put_nowait((call_info.conversation_id, outcome))
+        finally:
+            # Remove from active calls, even if the conversation could not be closed
+            self.active_calls.pop(call_id, None)
+        
+        logger.info(f"Call {call_id} ended with outcome: {outcome}")
+    
+    async def _refresh_do_not_call_list(self):
+        """Periodically reload the do-not-call list to pick up changes made elsewhere"""
+        interval = self.config_manager.get("database", "dnc_refresh_seconds", 60)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.db_manager.run(self.customer_repo.refresh_do_not_call)
+            except Exception as e:
+                logger.error(f"Error refreshing do-not-call list: {e}")
+    
+    async def _training_worker(self):
+        """Generate training data for ended calls, batching everything queued meanwhile"""
+        while True:
+            batch = [await self._training_queue.get()]
+            while not self._training_queue.empty():
+                batch.append(self._training_queue.get_nowait())
+            
+            try:
+                await self.db_manager.run(self._generate_training_data, batch)
+            except Exception as e:
+                logger.error(f"Error generating training data for {len(batch)} conversations: {e}")
+            finally:
+                for _ in batch:
+                    self._training_queue.task_done()
+    
+    def _generate_training_data(self, batch):
+        """Fetch turns for a batch of (conversation_id, outcome) pairs and feed the trainer"""
+        turns_by_conversation = self.conversation_repo.get_conversation_turns_bulk(
+            [conversation_id for conversation_id, _ in batch]
+        )
+        
+        for conversation_id, outcome in batch:
+            try:
+                # Row mappings support the dict-style access the trainer uses
+                self.trainer.data_generator.generate_training_data_from_conversation(
+                    conversation_id, turns_by_conversation[conversation_id], outcome
+                )
+                logger.debug(f"Generated training data for conversation {conversation_id}")
+            except Exception as e:
+                logger.error(f"Error generating training data for conversation {conversation_id}: {e}")
     
     async def get_call_status(self, call_id: str) -> Optional[Dict[str, Any]]:
         """Get status of a call"""
-        if call_id not in self.active_calls:
+        call_info = self.active_calls.get(call_id)
+        if call_info is None:
             return None
         
-        call_info = self.active_calls[call_id]
-        conversation_state = self.conversation_manager.get_conversation_state(call_id)
+        conversation_state = await self.db_manager.run(
+            self.conversation_manager.get_conversation_state, call_id
+        )
+        duration = time.monotonic() - call_info.start_monotonic
         
         return {
             "call_id": call_id,
-            "start_time": call_info["start_time"],
-            "customer_phone": call_info["customer_phone"],
-            "customer_name": call_info["customer_name"],
+            "start_time": datetime.utcnow() - timedelta(seconds=duration),
+            "customer_phone": call_info.customer_phone,
+            "customer_name": call_info.customer_name,
             "conversation_state": conversation_state,
-            "duration": (datetime.utcnow() - call_info["start_time"]).total_seconds()
+            "duration": duration
         }
     
     async def run_training_cycle(self) -> Dict[str, Any]:
@@ -619,31 +821,33 @@ class AICallingAgent:
             return {"status": "disabled", "message": "Training is disabled"}
         
         try:
-            return self.trainer.execute_training_cycle()
+            return await self.db_manager.run(self.trainer.execute_training_cycle)
         except Exception as e:
             logger.error(f"Training cycle failed: {e}")
             return {"status": "failed", "error": str(e)}
     
     async def get_system_status(self) -> Dict[str, Any]:
         """Get overall system status"""
+        # Probe the database at most every DB_HEALTH_TTL seconds; frequent health
+        # checks otherwise cost a round trip each
+        if self.db_manager:
+            now = time.monotonic()
+            if now - self._db_health_checked_at > DB_HEALTH_TTL:
+                self._db_healthy = await self.db_manager.run(self.db_manager.test_connection)
+                self._db_health_checked_at = now
+        
         return {
             "running": self.is_running,
             "active_calls": len(self.active_calls),
             "components": {
-                "database": self.db_manager.test_connection() if self.db_manager else False,
+                "database": self._db_healthy if self.db_manager else False,
                 "stt": self.stt_engine.is_available() if self.stt_engine else False,
                 "tts": self.tts_engine.is_available() if self.tts_engine else False,
                 "emotion_recognition": self.emotion_system.is_available() if self.emotion_system else {},
                 "training": self.trainer is not None,
                 "telephony": self.telephony_provider.is_available() if self.telephony_provider else False
             },
-            "configuration": {
-                "database_type": self.config_manager.get("database", "type"),
-                "stt_engine": self.config_manager.get("speech_recognition", "engine"),
-                "tts_engine": self.config_manager.get("text_to_speech", "engine"),
-                "telephony_enabled": self.config_manager.get("asterisk", "enabled", False),
-                "asterisk_host": self.config_manager.get("asterisk", "host", "localhost")
-            }
+            "configuration": self._status_config
         }
     
     async def start(self):
@@ -655,32 +859,146 @@ class AICallingAgent:
         await self.initialize()
         self.is_running = True
         
+        if self.turn_buffer:
+            self._turn_flush_task = asyncio.create_task(self.turn_buffer.run())
+        
+        self._dnc_refresh_task = asyncio.create_task(self._refresh_do_not_call_list())
+        
+        if self.trainer:
+            self._training_queue = asyncio.Queue()
+            self._training_task = asyncio.create_task(self._training_worker())
+        
         logger.info("AI Cold Calling Agent started")
         
-        # Setup signal handlers for graceful shutdown
-        loop = asyncio.get_event_loop()
-        for sig in [signal.SIGTERM, signal.SIGINT]:
-            loop.add_signal_handler(sig, lambda: asyncio.create_task(self.stop()))
+        # Signals only flag the shutdown; whoever awaits wait_for_shutdown() runs stop() once
+        self._shutdown_requested = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in SHUTDOWN_SIGNALS:
+            try:
+                loop.add_signal_handler(sig, self._shutdown_requested.set)
+            except (NotImplementedError, RuntimeError):
+                # Windows loops and loops outside the main thread (embedded hosts) cannot
+                # take signal handlers; the host is then responsible for calling stop()
+                logger.debug(f"Cannot install handler for {sig.name} on this event loop")
+    
+    async def wait_for_shutdown(self):
+        """Wait until a shutdown signal is received or stop() is called"""
+        await self._shutdown_requested.wait()
+    
+    def _stop_log_listener(self):
+        """Drain queued log records, then let the handlers receive records directly again"""
+        if self._log_listener is None:
+            return
+        
+        listener, self._log_listener = self._log_listener, None
+        listener.stop()
+        root_logger = logging.getLogger()
+        for handler in root_logger.handlers[:]:
+            if isinstance(handler, QueueHandler):
+                root_logger.removeHandler(handler)
+        for handler in listener.handlers:
+            root_logger.addHandler(handler)
     
     async def stop(self):
         """Stop the application"""
+        if self._stopping:
+            return
         if not self.is_running:
+            # Startup may have failed; its records still need to reach the log
+            self._stop_log_listener()
             return
+        self._stopping = True
+        
+        try:
+            await self._shutdown()
+        finally:
+            self.is_running = False
+            self._stopping = False
+            
+            logger.info("AI Cold Calling Agent stopped")
+            
+            # Drain queued log records last
+            self._stop_log_listener()
+    
+    @contextlib.contextmanager
+    def _shutdown_step(self, description: str):
+        """Log a failed shutdown step and carry on with the next one"""
+        try:
+            yield
+        except Exception as e:
+            logger.error(f"Error while {description} during shutdown: {e}")
+    
+    async def _shutdown(self):
+        """Release all components; every step runs even if an earlier one failed"""
+        # Wake anything sleeping in wait_for_shutdown()
+        self._shutdown_requested.set()
         
         logger.info("Stopping AI Cold Calling Agent...")
         
         # End all active calls
         for call_id in list(self.active_calls.keys()):
-            await self._end_call(call_id, "system_shutdown")
+            with self._shutdown_step(f"ending call {call_id}"):
+                await self._end_call(call_id, "system_shutdown")
+        
+        if self._speech_init_task and not self._speech_init_task.done():
+            self._speech_init_task.cancel()
+        self._speech_init_task = None
+        
+        if self._warmup_task:
+            self._warmup_task.cancel()
+            self._warmup_task = None
+        
+        if self._dnc_refresh_task:
+            self._dnc_refresh_task.cancel()
+            self._dnc_refresh_task = None
+        
+        # Let the training worker finish the calls ended above
+        if self._training_task:
+            with self._shutdown_step("finishing queued training work"):
+                await self._training_queue.join()
+            self._training_task.cancel()
+            self._training_task = None
+            self._training_queue = None
+        
+        # Write any turns still held in the buffer
+        if self._turn_flush_task:
+            self._turn_flush_task.cancel()
+            self._turn_flush_task = None
+        if self.turn_buffer:
+            with self._shutdown_step("flushing conversation turns"):
+                await self.db_manager.run(self.turn_buffer.flush)
+        
+        if self.db_manager:
+            with self._shutdown_step("closing the database"):
+                self.db_manager.close()
+        
+        if self._stt_batcher:
+            with self._shutdown_step("closing the STT batcher"):
+                await self._stt_batcher.close()
+            self._stt_batcher = None
+        
+        # Release the speech worker threads
+        for pool in (self._stt_pool, self._tts_pool):
+            if pool:
+                pool.shutdown(wait=False)
+        self._stt_pool = self._tts_pool = None
+        
+        if self.stt_engine:
+            with self._shutdown_step("closing the STT engine"):
+                self.stt_engine.close()
         
         # Clean up telephony resources
         if self.telephony_provider:
-            await self.telephony_provider.cleanup()
-        
-        # Clean up resources
-        self.is_running = False
+            with self._shutdown_step("cleaning up telephony"):
+                await self.telephony_provider.cleanup()
         
-        logger.info("AI Cold Calling Agent stopped")
+        # Hand the signals back to their default handlers
+        loop = asyncio.get_running_loop()
+        for sig in SHUTDOWN_SIGNALS:
+            try:
+                loop.remove_signal_handler(sig)
+            except (NotImplementedError, RuntimeError):
+                pass
 
 
 async def main():
@@ -690,9 +1008,8 @@ async def main():
         agent = AICallingAgent()
         await agent.start()
         
-        # Keep running until stopped
-        while agent.is_running:
-            await asyncio.sleep(1)
+        # Sleep until a shutdown signal arrives
+        await agent.wait_for_shutdown()
             
     except KeyboardInterrupt:
         logger.info("Received interrupt signal")
@@ -704,5 +1021,12 @@ async def main():
             await agent.stop()
 
 
+def install_event_loop_policy():
+    """Use uvloop for the asyncio event loop when it is installed"""
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
 if __name__ == "__main__":
+    install_event_loop_policy()
     asyncio.run(main())
\ No newline at end of file
@@ -1,13 +1,17 @@
 """
 Speech processing module for the AI Cold Calling Agent
+
+Torch, Whisper and Coqui are imported when an engine is constructed, so
+importing this package (e.g. for AudioProcessor) stays cheap.
 """
-from .base import BaseSTTEngine, BaseTTSEngine
+from .base import BaseSTTEngine, BaseTTSEngine, Segment
 from .stt import WhisperSTT, AudioProcessor, create_stt_engine
+from .batching import STTBatcher
 from .tts import CoquiTTS, Mimic3TTS, TTSEngine, create_tts_engine, AudioPostProcessor
 
 __all__ = [
-    'BaseSTTEngine', 'BaseTTSEngine',
-    'WhisperSTT', 'AudioProcessor', 'create_stt_engine',
+    'BaseSTTEngine', 'BaseTTSEngine', 'Segment',
+    'WhisperSTT', 'AudioProcessor', 'create_stt_engine', 'STTBatcher',
     'CoquiTTS', 'Mimic3TTS', 'TTSEngine', 'create_tts_engine', 
     'AudioPostProcessor'
 ]
\ No newline at end of file
@@ -2,12 +2,57 @@
 Base classes for Speech-to-Text and Text-to-Speech engines
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, Union
+from concurrent.futures import Executor
+from typing import AsyncIterator, Dict, Any, List, NamedTuple, Optional, Tuple, Union
+import asyncio
+import functools
+import io
+import os
+import re
 import numpy as np
+import soundfile as sf
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Sentence boundaries used to split text for streamed synthesis
+_SENTENCE_END = re.compile(r'(?<=[.!?;:])\s+')
+
+# Requests transcribe_files keeps in flight at once, to respect API rate limits
+DEFAULT_FILE_CONCURRENCY = 16
+
+
+class Segment(NamedTuple):
+    """One timed piece of a transcription: a Whisper segment or a cloud engine's word"""
+    text: str
+    start: float
+    end: float
+    confidence: float
+
+
+# Settings that do not change synthesized audio and must not end up in cache keys
+_CACHE_IGNORED_SETTINGS = frozenset({
+    "api_key", "credentials_path", "url", "cache_size", "cache_redis_url", "cache_ttl", "max_concurrency"
+})
+
+# Output directories already created by this process
+_KNOWN_DIRS = set()
+
+
+def ensure_parent_dir(file_path: str):
+    """
+    Create the directory a file will be written to, once per process
+    
+    Repeated saves into the same directory skip the makedirs syscalls.
+    
+    Args:
+        file_path: Path of the file about to be written
+    """
+    directory = os.path.dirname(file_path)
+    if directory and directory not in _KNOWN_DIRS:
+        os.makedirs(directory, exist_ok=True)
+        _KNOWN_DIRS.add(directory)
+
 
 class BaseSTTEngine(ABC):
     """Abstract base class for Speech-to-Text engines"""
@@ -37,7 +82,7 @@ class BaseSTTEngine(ABC):
                 "text": str,
                 "language": str,
                 "confidence": float,
-                "segments": list (optional)
+                "segments": List[Segment] (optional)
             }
         """
         pass
@@ -58,6 +103,63 @@ class BaseSTTEngine(ABC):
         """
         pass
     
+    @staticmethod
+    def _calculate_average_confidence(segments: List[Segment]) -> float:
+        """Average the confidences of transcription segments"""
+        confidences = np.fromiter((segment.confidence for segment in segments), dtype=np.float64, count=len(segments))
+        return float(confidences.mean()) if confidences.size else 0.0
+    
+    def transcribe_batch(self, audio_batch: List[np.ndarray], 
+                         sample_rate: int = 16000, **kwargs) -> List[Dict[str, Any]]:
+        """
+        Transcribe several audio clips in one call
+        
+        Engines that can run one forward pass over many clips override this;
+        the default transcribes the clips one after another.
+        
+        Args:
+            audio_batch: Audio clips as numpy arrays
+            sample_rate: Sample rate shared by all clips
+            **kwargs: Additional engine-specific options
+            
+        Returns:
+            Transcription results in the same order as audio_batch
+        """
+        return [self.transcribe_audio_data(audio, sample_rate, **kwargs) for audio in audio_batch]
+    
+    async def transcribe_files(self, audio_file_paths: List[str], executor: Optional[Executor] = None,
+                               max_concurrency: int = DEFAULT_FILE_CONCURRENCY,
+                               **kwargs) -> List[Dict[str, Any]]:
+        """
+        Transcribe several audio files concurrently
+        
+        Cloud engines spend most of a request waiting on the network, so
+        overlapping requests makes a batch take about as long as its slowest file.
+        
+        Args:
+            audio_file_paths: Paths to audio files
+            executor: Executor running the blocking transcribe_file calls (None for the loop default)
+            max_concurrency: Maximum number of requests in flight
+            **kwargs: Additional engine-specific options
+            
+        Returns:
+            Transcription results in the same order as audio_file_paths
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def transcribe(path: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await loop.run_in_executor(
+                    executor, functools.partial(self.transcribe_file, path, **kwargs)
+                )
+        
+        return list(await asyncio.gather(*(transcribe(path) for path in audio_file_paths)))
+    
+    def close(self):
+        """Release long-lived connections or streams held by the engine"""
+        pass
+    
     @abstractmethod
     def is_available(self) -> bool:
         """
@@ -96,6 +198,14 @@ class BaseTTSEngine(ABC):
         self.config = config
         self.language = config.get("language", "de")
         self.voice = config.get("voice")
+        self.sample_rate = config.get("sample_rate", 22050)
+        self.cache = None
+        self._cache_identity = None
+        
+        cache_size = config.get("cache_size", 0)
+        if cache_size:
+            from .tts_cache import TTSCache
+            self.cache = TTSCache(cache_size, config.get("cache_redis_url"), config.get("cache_ttl", 86400))
     
     @abstractmethod
     def synthesize(self, text: str, output_path: Optional[str] = None, 
@@ -113,6 +223,126 @@ class BaseTTSEngine(ABC):
         """
         pass
     
+    def synthesize_to_array(self, text: str, **kwargs) -> Tuple[np.ndarray, int]:
+        """
+        Synthesize speech into an in-memory PCM buffer
+        
+        Args:
+            text: Text to synthesize
+            **kwargs: Additional engine-specific options
+            
+        Returns:
+            Tuple of float32 samples and their sample rate
+        """
+        if self.cache is None:
+            return self._synthesize_to_array(text, **kwargs)
+        
+        # Repeated phrases ("Einen Moment bitte") skip the model or network round trip
+        key = self.cache.make_key(self._get_cache_identity(), text, kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        samples, sample_rate = self._synthesize_to_array(text, **kwargs)
+        return self.cache.set(key, samples, sample_rate)
+    
+    def _synthesize_to_array(self, text: str, **kwargs) -> Tuple[np.ndarray, int]:
+        """Run the engine and decode its output to float32 samples"""
+        return self._decode_audio(self.synthesize(text, None, **kwargs))
+    
+    def _decode_audio(self, audio: Union[np.ndarray, bytes]) -> Tuple[np.ndarray, int]:
+        """Convert engine output to float32 samples and their sample rate"""
+        if isinstance(audio, np.ndarray):
+            return audio.astype(np.float32, copy=False), self.sample_rate
+        
+        # Encoded audio (WAV, MP3) returned by cloud engines
+        samples, sample_rate = sf.read(io.BytesIO(audio), dtype="float32")
+        return samples, sample_rate
+    
+    async def synthesize_many(self, texts: List[str], executor: Optional[Executor] = None,
+                              max_concurrency: Optional[int] = None,
+                              **kwargs) -> List[Tuple[np.ndarray, int]]:
+        """
+        Synthesize several texts concurrently
+        
+        Cloud engines mostly wait on the network, so overlapping requests
+        turns N round trips into roughly one; cached phrases return at once.
+        
+        Args:
+            texts: Texts to synthesize
+            executor: Executor running the blocking synthesis (None for the loop default)
+            max_concurrency: Maximum requests in flight (default: max_concurrency setting, 8)
+            **kwargs: Additional engine-specific options
+            
+        Returns:
+            Tuples of float32 samples and their sample rate, in the order of texts
+        """
+        loop = asyncio.get_running_loop()
+        limit = max_concurrency or self.config.get("max_concurrency", 8)
+        semaphore = asyncio.Semaphore(max(1, limit))
+        
+        async def synthesize(text: str) -> Tuple[np.ndarray, int]:
+            async with semaphore:
+                return await loop.run_in_executor(
+                    executor, functools.partial(self.synthesize_to_array, text, **kwargs)
+                )
+        
+        return list(await asyncio.gather(*(synthesize(text) for text in texts)))
+    
+    def _get_cache_identity(self) -> str:
+        """Engine class and settings the synthesized audio depends on, minus credentials"""
+        if self._cache_identity is None:
+            settings = sorted(
+                f"{name}={value!r}" for name, value in self.config.items()
+                if name not in _CACHE_IGNORED_SETTINGS
+            )
+            self._cache_identity = "|".join([type(self).__name__, *settings])
+        return self._cache_identity
+    
+    async def synthesize_stream(self, text: str, executor: Optional[Executor] = None,
+                                **kwargs) -> AsyncIterator[Tuple[np.ndarray, int]]:
+        """
+        Synthesize speech sentence by sentence, yielding audio as it is ready
+        
+        Sentences are synthesized in the executor one ahead of the consumer,
+        so playback of one sentence overlaps synthesis of the next.
+        
+        Args:
+            text: Text to synthesize
+            executor: Executor running the blocking synthesis (None for the loop default)
+            **kwargs: Additional engine-specific options
+            
+        Yields:
+            Tuples of float32 samples and their sample rate, in text order
+        """
+        loop = asyncio.get_running_loop()
+        sentences = [part for part in _SENTENCE_END.split(text.strip()) if part]
+        chunks: asyncio.Queue = asyncio.Queue(maxsize=1)
+        
+        async def produce():
+            try:
+                for sentence in sentences:
+                    chunk = await loop.run_in_executor(
+                        executor, functools.partial(self.synthesize_to_array, sentence, **kwargs)
+                    )
+                    await chunks.put(chunk)
+            except Exception as e:
+                await chunks.put(e)
+            else:
+                await chunks.put(None)
+        
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            producer.cancel()
+    
     @abstractmethod
     def is_available(self) -> bool:
         """
@@ -0,0 +1,131 @@
+"""
+Micro-batching of speech recognition requests across concurrent calls
+"""
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .base import BaseSTTEngine
+
+logger = logging.getLogger(__name__)
+
+
+class STTBatcher:
+    """Collects concurrent transcription requests and serves them with one engine call"""
+
+    def __init__(self, engine: BaseSTTEngine, executor: Optional[Executor] = None,
+                 max_batch_size: int = 8, max_wait_ms: float = 10.0):
+        """
+        Initialize the batcher
+
+        Args:
+            engine: STT engine whose transcribe_batch serves each batch
+            executor: Executor running the blocking engine call (None for the loop default)
+            max_batch_size: Maximum number of clips per engine call
+            max_wait_ms: How long the first clip waits for peers before the batch runs
+        """
+        self.engine = engine
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the batching worker on the running event loop"""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def submit(self, audio: np.ndarray, sample_rate: int = 16000) -> Dict[str, Any]:
+        """
+        Queue one clip for transcription and wait for its result
+
+        Args:
+            audio: Audio samples
+            sample_rate: Sample rate of the samples
+
+        Returns:
+            Transcription result from the engine
+        """
+        if self._worker is None:
+            raise RuntimeError("STTBatcher is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((audio, sample_rate, future))
+        return await future
+
+    async def close(self):
+        """Stop the worker and fail any requests still waiting"""
+        if self._worker is None:
+            return
+
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        leftover = []
+        while not self._queue.empty():
+            leftover.append(self._queue.get_nowait())
+        self._fail(leftover, RuntimeError("STTBatcher closed"))
+
+    def _drain(self, batch: List[Tuple[np.ndarray, int, asyncio.Future]]):
+        """Move already queued requests into the batch without waiting"""
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+    async def _run(self):
+        """Gather batches and dispatch them to the engine"""
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                await self._serve(batch)
+            except asyncio.CancelledError:
+                self._fail(batch, RuntimeError("STTBatcher closed"))
+                raise
+
+    async def _serve(self, batch: List[Tuple[np.ndarray, int, asyncio.Future]]):
+        """Fill up one batch and resolve its futures"""
+        self._drain(batch)
+
+        # Give requests from other calls a short window to join
+        if len(batch) < self.max_batch_size and self.max_wait:
+            await asyncio.sleep(self.max_wait)
+            self._drain(batch)
+
+        # One engine call per sample rate; in practice all calls share one.
+        # Callers that gave up no longer need a slot in the forward pass.
+        by_rate: Dict[int, List[Tuple[np.ndarray, int, asyncio.Future]]] = {}
+        for item in batch:
+            if not item[2].done():
+                by_rate.setdefault(item[1], []).append(item)
+
+        loop = asyncio.get_running_loop()
+        for sample_rate, items in by_rate.items():
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, self.engine.transcribe_batch,
+                    [audio for audio, _, _ in items], sample_rate
+                )
+            except Exception as e:
+                logger.error(f"Error transcribing batch of {len(items)} clips: {e}")
+                self._fail(items, e)
+                continue
+
+            for (_, _, future), result in zip(items, results):
+                if not future.done():
+                    future.set_result(result)
+
+    @staticmethod
+    def _fail(items: List[Tuple[np.ndarray, int, asyncio.Future]], error: Exception):
+        """Propagate an error to every unresolved request"""
+        for _, _, future in items:
+            if not future.done():
+                future.set_exception(error)
@@ -1,18 +1,29 @@
 """
 Speech-to-Text module using OpenAI Whisper for local speech recognition
 """
+import io
 import os
+import math
+import struct
 import logging
+import threading
 import numpy as np
-import torch
-import whisper
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, List, Tuple, Union
 import soundfile as sf
 from pathlib import Path
-from .base import BaseSTTEngine
+from .base import BaseSTTEngine, Segment, ensure_parent_dir
 
 logger = logging.getLogger(__name__)
 
+# Sample rate Whisper models are trained on
+WHISPER_SAMPLE_RATE = 16000
+
+# Scale from 16-bit PCM to [-1, 1) float samples
+PCM16_SCALE = np.float32(1.0 / 32768.0)
+
+# Frames decoded per block when loading audio files
+AUDIO_FILE_BLOCK_SIZE = 1 << 16
+
 
 class WhisperSTT(BaseSTTEngine):
     """Speech-to-Text using OpenAI Whisper"""
@@ -43,23 +54,60 @@ class WhisperSTT(BaseSTTEngine):
         
         # Auto-detect device if needed
         if device == "auto":
+            import torch
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
         else:
             self.device = device
         
         self.model = None
+        self.fp16 = False
+        self._staging = threading.local()
         self._load_model()
     
     def _load_model(self):
         """Load the Whisper model"""
         try:
+            import torch
+            import whisper
+            
             logger.info(f"Loading Whisper model '{self.model_size}' on device '{self.device}'")
             self.model = whisper.load_model(self.model_size, device=self.device)
-            logger.info("Whisper model loaded successfully")
+            
+            # Store the weights in half precision once on GPUs with Tensor Cores (Volta+);
+            # otherwise fp16 decoding casts every layer's weights on each forward pass
+            if self.device.startswith("cuda") and torch.cuda.get_device_capability(self.device)[0] >= 7:
+                self.model = self.model.half()
+                self.fp16 = True
+            
+            if self.config.get("compile", False) and self.device.startswith("cuda"):
+                self._compile_model(torch)
+            
+            logger.info(f"Whisper model loaded successfully ({'fp16' if self.fp16 else 'fp32'} weights)")
         except Exception as e:
             logger.error(f"Error loading Whisper model: {e}")
             raise
     
+    def _compile_model(self, torch):
+        """
+        Compile the encoder and decoder with torch.compile and pay the compile cost now
+        
+        The encoder always sees fixed 30 s mel windows, so CUDA graphs
+        (reduce-overhead) fit it; the decoder's token length grows every step,
+        so it is compiled with dynamic shapes instead of one graph per length.
+        """
+        if not hasattr(torch, "compile"):
+            logger.warning("torch.compile requires PyTorch 2.0+, running Whisper eagerly")
+            return
+        
+        logger.info("Compiling Whisper encoder and decoder")
+        self.model.encoder = torch.compile(self.model.encoder, mode="reduce-overhead")
+        self.model.decoder = torch.compile(self.model.decoder, dynamic=True)
+        
+        # One throwaway pass triggers compilation before the first real request
+        self.model.transcribe(np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32),
+                              language=self.language, fp16=self.fp16)
+        logger.info("Whisper compiled")
+    
     def transcribe_file(self, audio_file_path: str, **kwargs) -> Dict[str, Any]:
         """
         Transcribe audio file to text
@@ -81,18 +129,20 @@ class WhisperSTT(BaseSTTEngine):
             # Set default options
             options = {
                 "language": self.language,
-                "fp16": False if self.device == "cpu" else True,
+                "fp16": self.fp16,
                 **kwargs
             }
             
             logger.debug(f"Transcribing audio file: {audio_file_path}")
             result = self.model.transcribe(audio_file_path, **options)
             
+            segments = self._to_segments(result.get("segments", []))
+            
             return {
                 "text": result["text"].strip(),
                 "language": result.get("language", self.language),
-                "segments": result.get("segments", []),
-                "confidence": self._calculate_average_confidence(result.get("segments", []))
+                "segments": segments,
+                "confidence": self._calculate_average_confidence(segments)
             }
             
         except Exception as e:
@@ -116,48 +166,164 @@ class WhisperSTT(BaseSTTEngine):
             raise RuntimeError("Whisper model not loaded")
         
         try:
-            # Ensure audio is in the right format for Whisper
-            if audio_data.dtype != np.float32:
-                audio_data = audio_data.astype(np.float32)
-            
-            # Normalize audio if needed
-            if np.abs(audio_data).max() > 1.0:
-                audio_data = audio_data / np.abs(audio_data).max()
+            audio_data = self._prepare_audio(audio_data, sample_rate)
             
             # Set default options
             options = {
                 "language": self.language,
-                "fp16": False if self.device == "cpu" else True,
+                "fp16": self.fp16,
                 **kwargs
             }
             
             logger.debug("Transcribing audio data")
-            result = self.model.transcribe(audio_data, **options)
+            result = self.model.transcribe(self._to_model_device(audio_data), **options)
+            
+            segments = self._to_segments(result.get("segments", []))
             
             return {
                 "text": result["text"].strip(),
                 "language": result.get("language", self.language),
-                "segments": result.get("segments", []),
-                "confidence": self._calculate_average_confidence(result.get("segments", []))
+                "segments": segments,
+                "confidence": self._calculate_average_confidence(segments)
             }
             
         except Exception as e:
             logger.error(f"Error transcribing audio data: {e}")
             raise
     
-    def _calculate_average_confidence(self, segments: list) -> float:
-        """Calculate average confidence from segments"""
-        if not segments:
-            return 0.0
+    def transcribe_batch(self, audio_batch: List[np.ndarray], 
+                         sample_rate: int = 16000, **kwargs) -> List[Dict[str, Any]]:
+        """
+        Transcribe several clips with one batched decoder pass
+        
+        Clips up to Whisper's 30 s window are stacked into one mel batch;
+        longer clips go through the regular sliding-window transcription.
         
-        confidences = []
-        for segment in segments:
-            if "avg_logprob" in segment:
-                # Convert log probability to confidence (rough approximation)
-                confidence = np.exp(segment["avg_logprob"])
-                confidences.append(confidence)
+        Args:
+            audio_batch: Audio clips as numpy arrays
+            sample_rate: Sample rate shared by all clips
+            **kwargs: Additional Whisper decoding options
+            
+        Returns:
+            Transcription results in the same order as audio_batch
+        """
+        if not self.model:
+            raise RuntimeError("Whisper model not loaded")
         
-        return np.mean(confidences) if confidences else 0.0
+        import torch
+        import whisper
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(audio_batch)
+        short_indices = []
+        mels = []
+        
+        for i, audio in enumerate(audio_batch):
+            audio = self._prepare_audio(audio, sample_rate)
+            if len(audio) > whisper.audio.N_SAMPLES:
+                results[i] = self.transcribe_audio_data(audio, WHISPER_SAMPLE_RATE, **kwargs)
+                continue
+            audio = whisper.pad_or_trim(self._to_model_device(audio))
+            mels.append(whisper.log_mel_spectrogram(audio, self.model.dims.n_mels))
+            short_indices.append(i)
+        
+        if mels:
+            options = whisper.DecodingOptions(
+                language=self.language,
+                fp16=self.fp16,
+                without_timestamps=True,
+                **kwargs
+            )
+            mel_batch = torch.stack(mels).to(self.model.device)
+            
+            logger.debug(f"Transcribing batch of {len(mels)} clips")
+            for i, decoded in zip(short_indices, whisper.decode(self.model, mel_batch, options)):
+                results[i] = {
+                    "text": decoded.text.strip(),
+                    "language": decoded.language or self.language,
+                    "segments": [],
+                    "confidence": float(np.exp(decoded.avg_logprob))
+                }
+        
+        return results
+    
+    def _prepare_audio(self, audio_data: Union[np.ndarray, bytes], sample_rate: int) -> np.ndarray:
+        """Convert input audio to normalized 16 kHz float32 samples"""
+        # Arrays created here may be scaled in place; caller arrays are left untouched
+        owned = False
+        
+        # Raw bytes are 16-bit PCM, optionally wrapped in a WAV header
+        if isinstance(audio_data, (bytes, bytearray, memoryview)):
+            audio_data, sample_rate = AudioProcessor.decode_pcm_bytes(audio_data, sample_rate)
+            owned = True
+        
+        # Ensure audio is in the right format for Whisper
+        if audio_data.dtype != np.float32:
+            audio_data = audio_data.astype(np.float32)
+            owned = True
+        
+        # Whisper models expect 16 kHz input
+        if sample_rate != WHISPER_SAMPLE_RATE:
+            audio_data = AudioProcessor.resample_audio(audio_data, sample_rate, WHISPER_SAMPLE_RATE)
+            owned = True
+        
+        # Normalize audio if needed
+        peak = AudioProcessor.peak_amplitude(audio_data)
+        if peak > 1.0:
+            audio_data = AudioProcessor.normalize_audio(audio_data, in_place=owned, peak=peak)
+        
+        return audio_data
+    
+    def _to_model_device(self, audio_data: np.ndarray):
+        """
+        Hand samples to Whisper on the model's device
+        
+        Whisper computes the log-mel spectrogram wherever the samples live,
+        so moving them to the GPU first keeps the STFT off the CPU. Samples
+        are staged in a per-thread pinned buffer and copied on a side stream,
+        so the upload is a true async DMA rather than a pageable sync copy.
+        """
+        if not self.device.startswith("cuda"):
+            return audio_data
+        
+        import torch
+        
+        staging = self._staging
+        n = len(audio_data)
+        if getattr(staging, "stream", None) is None:
+            staging.stream = torch.cuda.Stream(device=self.model.device)
+            staging.copied = torch.cuda.Event()
+            staging.buffer = None
+        
+        # The previous upload from this buffer must finish before it is overwritten
+        staging.copied.synchronize()
+        if staging.buffer is None or staging.buffer.numel() < n:
+            # Sized for Whisper's 30 s window; longer clips grow it once
+            size = max(n, WHISPER_SAMPLE_RATE * 30)
+            staging.buffer = torch.empty(size, dtype=torch.float32, pin_memory=True)
+        
+        host = staging.buffer[:n]
+        host.copy_(torch.from_numpy(audio_data))
+        with torch.cuda.stream(staging.stream):
+            audio = host.to(self.model.device, non_blocking=True)
+            staging.copied.record()
+        
+        # Work queued on the current stream waits for the copy, not the host
+        current = torch.cuda.current_stream(self.model.device)
+        current.wait_stream(staging.stream)
+        audio.record_stream(current)
+        return audio
+    
+    def _to_segments(self, whisper_segments: list) -> List[Segment]:
+        """Convert Whisper's segment dicts, turning all log probabilities into confidences with one exp"""
+        # Log probability to confidence is a rough approximation
+        confidences = np.exp(np.fromiter(
+            (segment["avg_logprob"] for segment in whisper_segments),
+            dtype=np.float64, count=len(whisper_segments)
+        ))
+        return [
+            Segment(segment["text"], segment["start"], segment["end"], float(confidence))
+            for segment, confidence in zip(whisper_segments, confidences)
+        ]
     
     def is_available(self) -> bool:
         """Check if the STT system is available"""
@@ -176,21 +342,136 @@ class AudioProcessor:
             file_path: Path to audio file
             
         Returns:
-            Tuple of (audio_data, sample_rate)
+            Tuple of (mono float32 audio_data, sample_rate)
         """
         try:
-            audio_data, sample_rate = sf.read(file_path)
+            with sf.SoundFile(file_path) as f:
+                sample_rate = f.samplerate
+                
+                # Decode block by block and mix each block down to mono in place,
+                # so a stereo file never exists in memory as a whole
+                audio_data = np.empty(max(f.frames, 0), dtype=np.float32)
+                pos = 0
+                for block in f.blocks(blocksize=AUDIO_FILE_BLOCK_SIZE, dtype='float32', always_2d=True):
+                    n = block.shape[0]
+                    if pos + n > len(audio_data):
+                        # Frame count in the header was short; grow geometrically
+                        audio_data = np.resize(audio_data, max(pos + n, 2 * len(audio_data)))
+                    np.mean(block, axis=1, out=audio_data[pos:pos + n])
+                    pos += n
             
-            # Convert to mono if stereo
-            if len(audio_data.shape) > 1:
-                audio_data = np.mean(audio_data, axis=1)
-            
-            return audio_data, sample_rate
+            return audio_data[:pos], sample_rate
             
         except Exception as e:
             logger.error(f"Error loading audio file {file_path}: {e}")
             raise
     
+    @staticmethod
+    def decode_pcm_bytes(audio_bytes: bytes, sample_rate: int = 16000,
+                         out: Optional[np.ndarray] = None) -> tuple[np.ndarray, int]:
+        """
+        Decode 16-bit PCM bytes, with or without a WAV header, into float32 samples
+        
+        Args:
+            audio_bytes: Raw little-endian int16 PCM or a complete WAV file
+            sample_rate: Sample rate of raw PCM input (WAV input carries its own)
+            out: Optional float32 buffer to decode into; used when large enough
+            
+        Returns:
+            Tuple of (mono float32 audio in [-1, 1], sample_rate)
+        """
+        channels = 1
+        pcm = memoryview(audio_bytes)
+        
+        if pcm[:4] == b'RIFF' and pcm[8:12] == b'WAVE':
+            offset = 12
+            pcm = None
+            while offset + 8 <= len(audio_bytes):
+                chunk_id, chunk_size = struct.unpack_from('<4sI', audio_bytes, offset)
+                offset += 8
+                if chunk_id == b'fmt ':
+                    audio_format, channels, sample_rate, _, _, bits = struct.unpack_from(
+                        '<HHIIHH', audio_bytes, offset
+                    )
+                    if audio_format != 1 or bits != 16:
+                        # Not 16-bit PCM; let libsndfile handle the encoding
+                        audio_data, sample_rate = sf.read(io.BytesIO(audio_bytes), dtype='float32')
+                        if audio_data.ndim > 1:
+                            audio_data = audio_data.mean(axis=1)
+                        return audio_data, sample_rate
+                elif chunk_id == b'data':
+                    pcm = memoryview(audio_bytes)[offset:offset + chunk_size]
+                    break
+                offset += chunk_size + (chunk_size & 1)
+            if pcm is None:
+                raise ValueError("WAV data chunk not found")
+        
+        count = len(pcm) // 2
+        samples = np.frombuffer(pcm, dtype='<i2', count=count)
+        if out is not None and len(out) < count:
+            out = None
+        # One fused pass: int16 is cast inside the ufunc, with no float temporary
+        audio_data = np.multiply(
+            samples, PCM16_SCALE, dtype=np.float32, out=out[:count] if out is not None else None
+        )
+        if channels > 1:
+            audio_data = audio_data[:len(audio_data) - len(audio_data) % channels]
+            audio_data = audio_data.reshape(-1, channels).mean(axis=1)
+        return audio_data, sample_rate
+    
+    @staticmethod
+    def encode_pcm16(audio_data: Union[np.ndarray, bytes], sample_rate: int = 16000) -> Tuple[bytes, int]:
+        """
+        Produce headerless mono 16-bit PCM for engines that accept raw audio
+        
+        Raw PCM bytes pass through untouched; WAV bytes are unwrapped and
+        float arrays are scaled and clipped to int16 without a container.
+        
+        Args:
+            audio_data: Audio as numpy array, raw PCM16 bytes or WAV bytes
+            sample_rate: Sample rate of array or raw PCM input
+            
+        Returns:
+            Tuple of (little-endian int16 PCM bytes, sample_rate)
+        """
+        if isinstance(audio_data, (bytes, bytearray, memoryview)):
+            if bytes(audio_data[:4]) != b'RIFF':
+                return bytes(audio_data), sample_rate
+            audio_data, sample_rate = AudioProcessor.decode_pcm_bytes(audio_data, sample_rate)
+        
+        if audio_data.dtype == np.int16:
+            if audio_data.ndim > 1:
+                audio_data = audio_data.mean(axis=1).astype(np.int16)
+            return audio_data.astype('<i2', copy=False).tobytes(), sample_rate
+        
+        if audio_data.ndim > 1:
+            audio_data = audio_data.mean(axis=1)
+        
+        scaled = np.multiply(audio_data, 32768.0, dtype=np.float32)
+        np.clip(scaled, -32768.0, 32767.0, out=scaled)
+        return scaled.astype('<i2').tobytes(), sample_rate
+    
+    @staticmethod
+    def wav_header(data_size: int, sample_rate: int, channels: int = 1) -> bytes:
+        """
+        Build the 44-byte RIFF header for a 16-bit PCM payload
+        
+        Args:
+            data_size: Size of the PCM payload in bytes
+            sample_rate: Sample rate of the payload
+            channels: Number of interleaved channels
+            
+        Returns:
+            Header bytes to prepend to the payload
+        """
+        block_align = channels * 2
+        return struct.pack(
+            '<4sI4s4sIHHIIHH4sI',
+            b'RIFF', 36 + data_size, b'WAVE',
+            b'fmt ', 16, 1, channels, sample_rate, sample_rate * block_align, block_align, 16,
+            b'data', data_size
+        )
+    
     @staticmethod
     def save_audio_file(audio_data: np.ndarray, file_path: str, sample_rate: int = 16000):
         """
@@ -203,7 +484,7 @@ class AudioProcessor:
         """
         try:
             # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            ensure_parent_dir(file_path)
             
             sf.write(file_path, audio_data, sample_rate)
             logger.debug(f"Audio saved to: {file_path}")
@@ -213,20 +494,44 @@ class AudioProcessor:
             raise
     
     @staticmethod
-    def normalize_audio(audio_data: np.ndarray) -> np.ndarray:
+    def peak_amplitude(audio_data: np.ndarray) -> float:
+        """
+        Largest absolute sample value, without allocating an np.abs temporary
+        
+        Args:
+            audio_data: Input audio data
+            
+        Returns:
+            Peak amplitude (0.0 for empty input)
+        """
+        if not audio_data.size:
+            return 0.0
+        # float() first: negating the int16 minimum would overflow
+        return max(float(audio_data.max()), -float(audio_data.min()))
+    
+    @staticmethod
+    def normalize_audio(audio_data: np.ndarray, in_place: bool = False,
+                        peak: Optional[float] = None) -> np.ndarray:
         """
         Normalize audio data to [-1, 1] range
         
         Args:
             audio_data: Input audio data
+            in_place: Scale a writeable floating-point input in place instead of copying
+            peak: Precomputed peak amplitude (optional)
             
         Returns:
             Normalized audio data
         """
-        max_val = np.abs(audio_data).max()
-        if max_val > 0:
-            return audio_data / max_val
-        return audio_data
+        max_val = AudioProcessor.peak_amplitude(audio_data) if peak is None else peak
+        if max_val <= 0:
+            return audio_data
+        
+        # Multiplying by the reciprocal is one cheap pass instead of a division
+        scale = 1.0 / max_val
+        if in_place and audio_data.flags.writeable and np.issubdtype(audio_data.dtype, np.floating):
+            return np.multiply(audio_data, scale, out=audio_data)
+        return audio_data * scale
     
     @staticmethod
     def resample_audio(audio_data: np.ndarray, original_rate: int, target_rate: int) -> np.ndarray:
@@ -241,12 +546,25 @@ class AudioProcessor:
         Returns:
             Resampled audio data
         """
-        try:
-            import librosa
-            return librosa.resample(audio_data, orig_sr=original_rate, target_sr=target_rate)
-        except ImportError:
-            logger.warning("librosa not available for resampling, returning original audio")
+        if original_rate == target_rate:
             return audio_data
+        
+        try:
+            # soxr is librosa's resampling backend; calling it directly skips librosa's import cost
+            try:
+                import soxr
+                return soxr.resample(audio_data, original_rate, target_rate, quality='HQ')
+            except ImportError:
+                pass
+            
+            try:
+                from scipy.signal import resample_poly
+            except ImportError:
+                logger.warning("soxr/scipy not available for resampling, returning original audio")
+                return audio_data
+            
+            g = math.gcd(original_rate, target_rate)
+            return resample_poly(audio_data, target_rate // g, original_rate // g).astype(audio_data.dtype, copy=False)
         except Exception as e:
             logger.error(f"Error resampling audio: {e}")
             return audio_data
@@ -266,6 +584,12 @@ def create_stt_engine(config: Dict[str, Any]):
     
     if engine_type == "whisper":
         return WhisperSTT(config)
+    elif engine_type == "faster-whisper":
+        from .stt_faster_whisper import FasterWhisperSTT
+        return FasterWhisperSTT(config)
+    elif engine_type == "onnx-whisper":
+        from .stt_onnx_whisper import OnnxWhisperSTT
+        return OnnxWhisperSTT(config)
     elif engine_type == "deepgram":
         from .stt_deepgram import DeepgramSTT
         return DeepgramSTT(config)
@@ -3,13 +3,35 @@ Speech-to-Text using Azure Speech Services
 """
 import os
 import logging
+import threading
 from typing import Dict, Any, Union, Optional
 import numpy as np
 from pathlib import Path
 from .base import BaseSTTEngine
+from .stt import AudioProcessor
 
 logger = logging.getLogger(__name__)
 
+# Format of the long-lived push streams; other rates are resampled to it
+STREAM_SAMPLE_RATE = 16000
+
+# Azure reports offsets and durations in 100 ns ticks
+TICKS_PER_SECOND = 10_000_000
+
+# Silence appended to each clip so recognize_once sees the utterance end
+TRAILING_SILENCE = np.zeros(STREAM_SAMPLE_RATE, dtype='<i2').tobytes()
+
+
+class _RecognizerSession:
+    """Push stream and recognizer kept alive across requests on one thread"""
+    
+    __slots__ = ("push_stream", "recognizer", "written_ticks")
+    
+    def __init__(self, push_stream, recognizer):
+        self.push_stream = push_stream
+        self.recognizer = recognizer
+        self.written_ticks = 0
+
 
 class AzureSTT(BaseSTTEngine):
     """Speech-to-Text using Azure Speech Services"""
@@ -29,6 +51,11 @@ class AzureSTT(BaseSTTEngine):
         self.region = config.get("region") or os.getenv("AZURE_SPEECH_REGION", "westeurope")
         self.speech_config = None
         
+        # Recognizers are not thread-safe; each executor thread gets its own
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+        
         # Azure uses de-DE format instead of just de
         if self.language == "de":
             self.language = "de-DE"
@@ -123,7 +150,7 @@ class AzureSTT(BaseSTTEngine):
         Transcribe audio data to text using Azure
         
         Args:
-            audio_data: Audio data as numpy array or bytes
+            audio_data: Audio data as numpy array, 16-bit PCM or WAV bytes
             sample_rate: Sample rate of audio data
             **kwargs: Additional Azure options
             
@@ -136,34 +163,29 @@ class AzureSTT(BaseSTTEngine):
         try:
             logger.debug("Transcribing audio data with Azure")
             
-            # Convert numpy array to bytes if needed
-            if isinstance(audio_data, np.ndarray):
-                import soundfile as sf
-                import io
-                
-                buffer = io.BytesIO()
-                sf.write(buffer, audio_data, sample_rate, format='WAV')
-                buffer.seek(0)
-                audio_bytes = buffer.read()
-            else:
-                audio_bytes = audio_data
+            # The push stream takes headerless PCM, so skip the WAV container
+            pcm, sample_rate = AudioProcessor.encode_pcm16(audio_data, sample_rate)
+            if sample_rate != STREAM_SAMPLE_RATE:
+                audio, _ = AudioProcessor.decode_pcm_bytes(pcm, sample_rate)
+                audio = AudioProcessor.resample_audio(audio, sample_rate, STREAM_SAMPLE_RATE)
+                pcm, _ = AudioProcessor.encode_pcm16(audio, STREAM_SAMPLE_RATE)
             
-            # Create push stream
-            push_stream = self.speechsdk.audio.PushAudioInputStream()
-            audio_config = self.speechsdk.audio.AudioConfig(stream=push_stream)
+            session = self._get_session()
+            speech_end = session.written_ticks + len(pcm) // 2 * TICKS_PER_SECOND // STREAM_SAMPLE_RATE
             
-            # Create speech recognizer
-            speech_recognizer = self.speechsdk.SpeechRecognizer(
-                speech_config=self.speech_config,
-                audio_config=audio_config
-            )
-            
-            # Write audio data to stream
-            push_stream.write(audio_bytes)
-            push_stream.close()
+            # Write the clip plus enough silence to close the utterance
+            session.push_stream.write(pcm)
+            session.push_stream.write(TRAILING_SILENCE)
+            session.written_ticks = speech_end + len(TRAILING_SILENCE) // 2 * TICKS_PER_SECOND // STREAM_SAMPLE_RATE
             
             # Perform recognition
-            result = speech_recognizer.recognize_once()
+            result = session.recognizer.recognize_once()
+            
+            # recognize_once stops after the first utterance; if the clip held more
+            # speech, it would leak into the next request, so start a fresh session
+            if (result.reason != self.speechsdk.ResultReason.RecognizedSpeech
+                    or result.offset + result.duration < speech_end - TICKS_PER_SECOND):
+                self._discard_session(session)
             
             if result.reason == self.speechsdk.ResultReason.RecognizedSpeech:
                 return {
@@ -185,8 +207,46 @@ class AzureSTT(BaseSTTEngine):
             
         except Exception as e:
             logger.error(f"Error transcribing audio data with Azure: {e}")
+            session = getattr(self._local, "session", None)
+            if session is not None:
+                self._discard_session(session)
             raise
     
+    def _get_session(self) -> _RecognizerSession:
+        """Return this thread's recognizer session, creating it on first use"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            stream_format = self.speechsdk.audio.AudioStreamFormat(
+                samples_per_second=STREAM_SAMPLE_RATE, bits_per_sample=16, channels=1
+            )
+            push_stream = self.speechsdk.audio.PushAudioInputStream(stream_format=stream_format)
+            recognizer = self.speechsdk.SpeechRecognizer(
+                speech_config=self.speech_config,
+                audio_config=self.speechsdk.audio.AudioConfig(stream=push_stream)
+            )
+            session = _RecognizerSession(push_stream, recognizer)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+    
+    def _discard_session(self, session: _RecognizerSession):
+        """Close a session so the next request on this thread builds a new one"""
+        if getattr(self._local, "session", None) is session:
+            self._local.session = None
+        with self._sessions_lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+        session.push_stream.close()
+    
+    def close(self):
+        """Close the push streams of all recognizer sessions"""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.push_stream.close()
+        self._local = threading.local()
+    
     def _get_confidence(self, result) -> float:
         """Extract confidence score from Azure result"""
         try:
@@ -2,14 +2,21 @@
 Speech-to-Text using Deepgram API
 """
 import os
+import asyncio
 import logging
-from typing import Dict, Any, Union, Optional
+from concurrent.futures import Executor
+from operator import attrgetter
+from typing import Dict, Any, List, Union, Optional
 import numpy as np
 from pathlib import Path
-from .base import BaseSTTEngine
+from .base import BaseSTTEngine, DEFAULT_FILE_CONCURRENCY, Segment
+from .stt import AudioProcessor
 
 logger = logging.getLogger(__name__)
 
+# Fields copied from each Deepgram word into a Segment, fetched in one call
+_WORD_FIELDS = attrgetter("word", "start", "end", "confidence")
+
 
 class DeepgramSTT(BaseSTTEngine):
     """Speech-to-Text using Deepgram API"""
@@ -43,6 +50,15 @@ class DeepgramSTT(BaseSTTEngine):
             self.PrerecordedOptions = PrerecordedOptions
             self.FileSource = FileSource
             
+            # Options are built once; calls with extra kwargs merge them into a copy
+            self._option_defaults = {
+                "model": self.model,
+                "language": self.language,
+                "smart_format": True,
+                "punctuate": True
+            }
+            self._default_options = PrerecordedOptions(**self._option_defaults)
+            
             logger.info("Deepgram client initialized successfully")
             
         except ImportError:
@@ -66,41 +82,22 @@ class DeepgramSTT(BaseSTTEngine):
         if not self.client:
             raise RuntimeError("Deepgram client not initialized")
         
-        if not os.path.exists(audio_file_path):
-            raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
-        
         try:
             logger.debug(f"Transcribing audio file with Deepgram: {audio_file_path}")
             
-            # Read audio file
-            with open(audio_file_path, 'rb') as audio:
-                buffer_data = audio.read()
-            
-            payload = self.FileSource(buffer_data)
+            # The SDK posts the buffer as an httpx body, which must be real bytes
+            # (an mmap would be iterated byte by byte). read_bytes() sizes the
+            # buffer from fstat, so the file is read in one allocation.
+            payload = self.FileSource(Path(audio_file_path).read_bytes())
             
-            # Configure options
-            options = self.PrerecordedOptions(
-                model=self.model,
-                language=self.language,
-                smart_format=True,
-                punctuate=True,
-                **kwargs
-            )
+            options = self._build_options(kwargs)
             
             # Transcribe
             response = self.client.listen.prerecorded.v("1").transcribe_file(
                 payload, options
             )
             
-            # Extract results
-            transcript = response.results.channels[0].alternatives[0]
-            
-            return {
-                "text": transcript.transcript.strip(),
-                "language": self.language,
-                "confidence": transcript.confidence,
-                "segments": self._extract_segments(response)
-            }
+            return self._build_result(response)
             
         except Exception as e:
             logger.error(f"Error transcribing with Deepgram: {e}")
@@ -112,7 +109,7 @@ class DeepgramSTT(BaseSTTEngine):
         Transcribe audio data to text using Deepgram
         
         Args:
-            audio_data: Audio data as numpy array or bytes
+            audio_data: Audio data as numpy array, 16-bit PCM or WAV bytes
             sample_rate: Sample rate of audio data
             **kwargs: Additional Deepgram options
             
@@ -125,63 +122,86 @@ class DeepgramSTT(BaseSTTEngine):
         try:
             logger.debug("Transcribing audio data with Deepgram")
             
-            # Convert numpy array to bytes if needed
-            if isinstance(audio_data, np.ndarray):
-                import soundfile as sf
-                import io
-                
-                buffer = io.BytesIO()
-                sf.write(buffer, audio_data, sample_rate, format='WAV')
-                buffer.seek(0)
-                audio_bytes = buffer.read()
-            else:
-                audio_bytes = audio_data
+            # A 44-byte header tells Deepgram the format; no need to re-encode through soundfile
+            pcm, sample_rate = AudioProcessor.encode_pcm16(audio_data, sample_rate)
+            audio_bytes = AudioProcessor.wav_header(len(pcm), sample_rate) + pcm
             
             payload = self.FileSource(audio_bytes)
             
-            # Configure options
-            options = self.PrerecordedOptions(
-                model=self.model,
-                language=self.language,
-                smart_format=True,
-                punctuate=True,
-                **kwargs
-            )
+            options = self._build_options(kwargs)
             
             # Transcribe
             response = self.client.listen.prerecorded.v("1").transcribe_file(
                 payload, options
             )
             
-            # Extract results
-            transcript = response.results.channels[0].alternatives[0]
-            
-            return {
-                "text": transcript.transcript.strip(),
-                "language": self.language,
-                "confidence": transcript.confidence,
-                "segments": self._extract_segments(response)
-            }
+            return self._build_result(response)
             
         except Exception as e:
             logger.error(f"Error transcribing audio data with Deepgram: {e}")
             raise
     
-    def _extract_segments(self, response) -> list:
+    async def transcribe_files(self, audio_file_paths: List[str], executor: Optional[Executor] = None,
+                               max_concurrency: int = DEFAULT_FILE_CONCURRENCY,
+                               **kwargs) -> List[Dict[str, Any]]:
+        """
+        Transcribe several audio files concurrently with the async Deepgram client
+        
+        Args:
+            audio_file_paths: Paths to audio files
+            executor: Executor used for reading the files (None for the loop default)
+            max_concurrency: Maximum number of requests in flight
+            **kwargs: Additional Deepgram options
+            
+        Returns:
+            Transcription results in the same order as audio_file_paths
+        """
+        if not self.client:
+            raise RuntimeError("Deepgram client not initialized")
+        
+        # SDK 3.4 renamed asyncprerecorded to asyncrest
+        listen = self.client.listen
+        prerecorded = (getattr(listen, "asyncrest", None) or listen.asyncprerecorded).v("1")
+        options = self._build_options(kwargs)
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def transcribe(path: str) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    data = await loop.run_in_executor(executor, Path(path).read_bytes)
+                    response = await prerecorded.transcribe_file(self.FileSource(data), options)
+                except Exception as e:
+                    logger.error(f"Error transcribing {path} with Deepgram: {e}")
+                    raise
+                return self._build_result(response)
+        
+        logger.debug(f"Transcribing {len(audio_file_paths)} files with Deepgram")
+        return list(await asyncio.gather(*(transcribe(path) for path in audio_file_paths)))
+    
+    def _build_result(self, response) -> Dict[str, Any]:
+        """Extract the transcription result from a Deepgram response"""
+        transcript = response.results.channels[0].alternatives[0]
+        
+        return {
+            "text": transcript.transcript.strip(),
+            "language": self.language,
+            "confidence": transcript.confidence,
+            "segments": self._extract_segments(response)
+        }
+    
+    def _build_options(self, overrides: Dict[str, Any]):
+        """Return the prebuilt options, or a merged copy when a call overrides them"""
+        if not overrides:
+            return self._default_options
+        return self.PrerecordedOptions(**{**self._option_defaults, **overrides})
+    
+    def _extract_segments(self, response) -> List[Segment]:
         """Extract word-level segments from Deepgram response"""
         try:
             words = response.results.channels[0].alternatives[0].words
-            segments = []
-            
-            for word in words:
-                segments.append({
-                    "text": word.word,
-                    "start": word.start,
-                    "end": word.end,
-                    "confidence": word.confidence
-                })
             
-            return segments
+            return [Segment._make(fields) for fields in map(_WORD_FIELDS, words)]
         except Exception as e:
             logger.debug(f"Could not extract segments: {e}")
             return []
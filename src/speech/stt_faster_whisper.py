@@ -0,0 +1,280 @@
+"""
+Speech-to-Text using faster-whisper (CTranslate2) with quantized weights
+"""
+import os
+import bisect
+import logging
+from typing import Dict, Any, List, Optional, Union
+import numpy as np
+from .base import BaseSTTEngine, Segment
+from .stt import AudioProcessor, WHISPER_SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# CTranslate2 compute types accepted for the 'precision' setting
+PRECISIONS = ("int8", "int8_float16", "float16", "float32")
+
+# Preferred compute types per device for precision 'auto', fastest first
+AUTO_PRECISIONS = {
+    "cuda": ("int8_float16", "float16", "float32"),
+    "cpu": ("int8", "float32"),
+}
+
+# Longest clip BatchedInferencePipeline decodes as a single batch row
+BATCH_WINDOW_SECONDS = 30
+
+
+class FasterWhisperSTT(BaseSTTEngine):
+    """Speech-to-Text using faster-whisper with int8/fp16 inference"""
+    
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initialize faster-whisper STT
+        
+        Args:
+            config: Configuration dictionary with:
+                - model_size: Whisper model size (default: base)
+                - device: cpu, cuda or auto (default: auto)
+                - precision: auto, int8, int8_float16, float16 or float32 (default: auto)
+                - cpu_threads: Threads per transcription on CPU (default: 0, library default)
+                - beam_size: Decoder beam width (default: 1, greedy)
+                - vad_filter: Skip silent stretches with Silero VAD (default: true)
+                - language: Language code (default: de)
+        """
+        super().__init__(config)
+        self.model_size = config.get("model_size", "base")
+        self.device = config.get("device", "auto")
+        self.precision = config.get("precision", "auto")
+        self.cpu_threads = config.get("cpu_threads", 0)
+        self.beam_size = config.get("beam_size", 1)
+        self.vad_filter = config.get("vad_filter", True)
+        self.model = None
+        self.batched_model = None
+        
+        if self.precision not in PRECISIONS and self.precision != "auto":
+            logger.warning(f"Unknown precision '{self.precision}', choosing one automatically")
+            self.precision = "auto"
+        
+        self._load_model()
+    
+    def _load_model(self):
+        """Load the quantized Whisper model"""
+        try:
+            import ctranslate2
+            from faster_whisper import WhisperModel
+            
+            if self.device == "auto":
+                self.device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+            if self.precision == "auto":
+                self.precision = self._pick_compute_type(
+                    ctranslate2.get_supported_compute_types(self.device)
+                )
+            
+            logger.info(
+                f"Loading faster-whisper model '{self.model_size}' on device '{self.device}' "
+                f"with {self.precision} weights"
+            )
+            self.model = WhisperModel(
+                self.model_size,
+                device=self.device,
+                compute_type=self.precision,
+                cpu_threads=self.cpu_threads
+            )
+            logger.info("faster-whisper model loaded successfully")
+            
+            try:
+                from faster_whisper import BatchedInferencePipeline
+                self.batched_model = BatchedInferencePipeline(model=self.model)
+            except ImportError:
+                logger.info("faster-whisper has no BatchedInferencePipeline; batches run sequentially")
+        
+        except ImportError:
+            logger.error("faster-whisper not installed. Install with: pip install faster-whisper")
+            self.model = None
+        except Exception as e:
+            logger.error(f"Error loading faster-whisper model: {e}")
+            self.model = None
+    
+    def _pick_compute_type(self, supported) -> str:
+        """
+        Choose the fastest compute type the device supports
+        
+        int8 weights with float16 activations need Tensor Cores; older GPUs
+        fall back to float16, and CPUs use int8 when the ISA has it.
+        """
+        for compute_type in AUTO_PRECISIONS.get(self.device, AUTO_PRECISIONS["cpu"]):
+            if compute_type in supported:
+                return compute_type
+        return "float32"
+    
+    def transcribe_file(self, audio_file_path: str, **kwargs) -> Dict[str, Any]:
+        """
+        Transcribe audio file to text
+        
+        Args:
+            audio_file_path: Path to audio file
+            **kwargs: Additional faster-whisper options
+        
+        Returns:
+            Dictionary with transcription results
+        """
+        if not os.path.exists(audio_file_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
+        
+        logger.debug(f"Transcribing audio file with faster-whisper: {audio_file_path}")
+        return self._transcribe(audio_file_path, **kwargs)
+    
+    def transcribe_audio_data(self, audio_data: Union[np.ndarray, bytes],
+                             sample_rate: int = 16000, **kwargs) -> Dict[str, Any]:
+        """
+        Transcribe audio data to text
+        
+        Args:
+            audio_data: Audio data as numpy array or 16-bit PCM bytes
+            sample_rate: Sample rate of audio data
+            **kwargs: Additional faster-whisper options
+        
+        Returns:
+            Dictionary with transcription results
+        """
+        logger.debug("Transcribing audio data with faster-whisper")
+        return self._transcribe(self._prepare_audio(audio_data, sample_rate), **kwargs)
+    
+    def transcribe_batch(self, audio_batch: List[np.ndarray], 
+                         sample_rate: int = 16000, **kwargs) -> List[Dict[str, Any]]:
+        """
+        Transcribe several clips with one batched decoder pass
+        
+        Clips are laid end to end and handed to BatchedInferencePipeline with
+        one clip_timestamps window per clip, so each clip is its own batch row.
+        Clips longer than the 30 s window are transcribed on their own.
+        
+        Args:
+            audio_batch: Audio clips as numpy arrays
+            sample_rate: Sample rate shared by all clips
+            **kwargs: Additional faster-whisper options
+            
+        Returns:
+            Transcription results in the same order as audio_batch
+        """
+        if not self.model:
+            raise RuntimeError("faster-whisper model not loaded")
+        if self.batched_model is None or len(audio_batch) < 2:
+            return super().transcribe_batch(audio_batch, sample_rate, **kwargs)
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(audio_batch)
+        batch_indices = []
+        clips = []
+        
+        for i, audio in enumerate(audio_batch):
+            audio = self._prepare_audio(audio, sample_rate)
+            if len(audio) > BATCH_WINDOW_SECONDS * WHISPER_SAMPLE_RATE:
+                results[i] = self._transcribe(audio, **kwargs)
+            elif len(audio) == 0:
+                results[i] = self._build_result([], None)
+            else:
+                batch_indices.append(i)
+                clips.append(audio)
+        
+        if not clips:
+            return results
+        
+        # The pipeline takes clip bounds as sample indices; segment times come back in seconds
+        starts = []
+        clip_timestamps = []
+        begin = 0
+        for clip in clips:
+            starts.append(begin / WHISPER_SAMPLE_RATE)
+            clip_timestamps.append({"start": begin, "end": begin + len(clip)})
+            begin += len(clip)
+        
+        try:
+            options = {
+                "language": self.language,
+                "beam_size": self.beam_size,
+                "batch_size": len(clips),
+                "clip_timestamps": clip_timestamps,
+                "without_timestamps": True,
+                **kwargs
+            }
+            segments, info = self.batched_model.transcribe(np.concatenate(clips), **options)
+            
+            # Segment times refer to the concatenated audio; map each back to its clip
+            per_clip = [[] for _ in clips]
+            for segment in self._to_segments(segments):
+                midpoint = (segment.start + segment.end) / 2
+                clip_index = max(0, bisect.bisect_right(starts, midpoint) - 1)
+                offset = starts[clip_index]
+                per_clip[clip_index].append(
+                    segment._replace(start=segment.start - offset, end=segment.end - offset)
+                )
+        
+        except Exception as e:
+            logger.error(f"Error transcribing batch with faster-whisper: {e}")
+            raise
+        
+        logger.debug(f"Transcribed batch of {len(clips)} clips with faster-whisper")
+        for i, segment_list in zip(batch_indices, per_clip):
+            results[i] = self._build_result(segment_list, info.language)
+        return results
+    
+    def _prepare_audio(self, audio_data: Union[np.ndarray, bytes], sample_rate: int) -> np.ndarray:
+        """Convert input audio to 16 kHz float32 samples"""
+        if isinstance(audio_data, (bytes, bytearray, memoryview)):
+            audio_data, sample_rate = AudioProcessor.decode_pcm_bytes(audio_data, sample_rate)
+        
+        if audio_data.dtype != np.float32:
+            audio_data = audio_data.astype(np.float32)
+        
+        if sample_rate != WHISPER_SAMPLE_RATE:
+            audio_data = AudioProcessor.resample_audio(audio_data, sample_rate, WHISPER_SAMPLE_RATE)
+        
+        return audio_data
+    
+    def _transcribe(self, audio: Union[str, np.ndarray], **kwargs) -> Dict[str, Any]:
+        """Run the model and collect its segments"""
+        if not self.model:
+            raise RuntimeError("faster-whisper model not loaded")
+        
+        try:
+            options = {
+                "language": self.language,
+                "beam_size": self.beam_size,
+                "vad_filter": self.vad_filter,
+                **kwargs
+            }
+            segments, info = self.model.transcribe(audio, **options)
+            
+            return self._build_result(self._to_segments(segments), info.language)
+        
+        except Exception as e:
+            logger.error(f"Error transcribing with faster-whisper: {e}")
+            raise
+    
+    def _to_segments(self, segments) -> List[Segment]:
+        """
+        Collect faster-whisper segments, converting log probabilities with one exp
+        
+        Segments are decoded lazily; consuming the generator runs the model.
+        """
+        segments = list(segments)
+        confidences = np.exp(np.fromiter(
+            (segment.avg_logprob for segment in segments), dtype=np.float64, count=len(segments)
+        ))
+        return [
+            Segment(segment.text, segment.start, segment.end, float(confidence))
+            for segment, confidence in zip(segments, confidences)
+        ]
+    
+    def _build_result(self, segment_list: List[Segment], language: Optional[str]) -> Dict[str, Any]:
+        """Assemble the common result dictionary from collected segments"""
+        return {
+            "text": "".join(segment.text for segment in segment_list).strip(),
+            "language": language or self.language,
+            "segments": segment_list,
+            "confidence": self._calculate_average_confidence(segment_list)
+        }
+    
+    def is_available(self) -> bool:
+        """Check if faster-whisper is available"""
+        return self.model is not None
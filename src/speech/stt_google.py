@@ -2,14 +2,30 @@
 Speech-to-Text using Google Cloud Speech-to-Text
 """
 import os
+import uuid
 import logging
-from typing import Dict, Any, Union, Optional
+from typing import Callable, Dict, Any, Iterable, Union, Optional
 import numpy as np
+import soundfile as sf
 from pathlib import Path
-from .base import BaseSTTEngine
+from .base import BaseSTTEngine, Segment
+from .stt import AudioProcessor
 
 logger = logging.getLogger(__name__)
 
+# Longest audio sent through one streaming_recognize call (Google caps streams at ~305 s)
+STREAMING_LIMIT_SECONDS = 290
+
+# Keepalive pings stop idle connections between calls from being dropped and re-established
+CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+]
+
+# Seconds startup waits for the gRPC connection before leaving it to the first request
+CHANNEL_READY_TIMEOUT = 10
+
 
 class GoogleSTT(BaseSTTEngine):
     """Speech-to-Text using Google Cloud Speech-to-Text"""
@@ -23,10 +39,18 @@ class GoogleSTT(BaseSTTEngine):
                 - credentials_path: Path to Google Cloud credentials JSON
                 - language: Language code (default: de-DE)
                 - model: Model to use (default: latest_long)
+                - stream_chunk_ms: Audio per streaming request when transcribing files (default: 100)
+                - gcs_bucket: Cloud Storage bucket for staging files too long to stream (optional)
+                - long_running_timeout: Seconds to wait for a long-running recognition (default: 3600)
+                - api_endpoint: Regional endpoint, e.g. eu-speech.googleapis.com (default: global)
         """
         super().__init__(config)
         self.credentials_path = config.get("credentials_path") or os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
         self.model = config.get("model", "latest_long")
+        self.stream_chunk_ms = config.get("stream_chunk_ms", 100)
+        self.gcs_bucket = config.get("gcs_bucket")
+        self.long_running_timeout = config.get("long_running_timeout", 3600)
+        self.api_endpoint = config.get("api_endpoint") or "speech.googleapis.com"
         self.client = None
         
         # Google uses de-DE format instead of just de
@@ -41,16 +65,29 @@ class GoogleSTT(BaseSTTEngine):
     def _initialize_client(self):
         """Initialize Google Cloud Speech client"""
         try:
+            import google.auth
+            from google.auth.transport.requests import Request
             from google.cloud import speech
+            from google.cloud.speech_v1.services.speech.transports import SpeechGrpcTransport
             
             # Set credentials environment variable if not already set
             if self.credentials_path and not os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
                 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = self.credentials_path
             
-            self.client = speech.SpeechClient()
+            # Fetch the OAuth token now; the channel reuses and refreshes it
+            credentials, _ = google.auth.default(scopes=SpeechGrpcTransport.AUTH_SCOPES)
+            credentials.refresh(Request())
+            
+            channel = SpeechGrpcTransport.create_channel(
+                self.api_endpoint, credentials=credentials, options=CHANNEL_OPTIONS
+            )
+            self.client = speech.SpeechClient(
+                transport=SpeechGrpcTransport(host=self.api_endpoint, channel=channel)
+            )
             self.speech = speech
+            self._connect(channel)
             
-            logger.info("Google Cloud Speech client initialized successfully")
+            logger.info(f"Google Cloud Speech client initialized successfully ({self.api_endpoint})")
             
         except ImportError:
             logger.error("Google Cloud Speech not installed. Install with: pip install google-cloud-speech")
@@ -59,6 +96,14 @@ class GoogleSTT(BaseSTTEngine):
             logger.error(f"Error initializing Google Cloud Speech client: {e}")
             self.client = None
     
+    def _connect(self, channel):
+        """Open the gRPC connection at startup so the first request skips the TLS handshake"""
+        try:
+            import grpc
+            grpc.channel_ready_future(channel).result(timeout=CHANNEL_READY_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Google Cloud Speech channel not ready yet, connecting on first request: {e}")
+    
     def transcribe_file(self, audio_file_path: str, **kwargs) -> Dict[str, Any]:
         """
         Transcribe audio file to text using Google Cloud
@@ -73,64 +118,33 @@ class GoogleSTT(BaseSTTEngine):
         if not self.client:
             raise RuntimeError("Google Cloud Speech client not initialized")
         
+        # sf.info reports a missing file as a LibsndfileError; keep the engine contract
         if not os.path.exists(audio_file_path):
             raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
         
         try:
             logger.debug(f"Transcribing audio file with Google Cloud: {audio_file_path}")
             
-            # Read audio file
-            with open(audio_file_path, 'rb') as audio_file:
-                content = audio_file.read()
-            
-            audio = self.speech.RecognitionAudio(content=content)
+            # Streams are capped at about five minutes; longer recordings go
+            # through Cloud Storage and a long-running operation
+            if sf.info(audio_file_path).duration > STREAMING_LIMIT_SECONDS:
+                if self.gcs_bucket:
+                    return self._transcribe_long_file(audio_file_path, **kwargs)
+                logger.warning(
+                    f"{audio_file_path} is longer than {STREAMING_LIMIT_SECONDS} s and no gcs_bucket "
+                    f"is configured; streaming will stop at Google's stream limit"
+                )
             
-            config = self.speech.RecognitionConfig(
-                encoding=self.speech.RecognitionConfig.AudioEncoding.LINEAR16,
-                language_code=self.language,
-                model=self.model,
-                enable_automatic_punctuation=True,
-                **kwargs
-            )
-            
-            # Perform transcription
-            response = self.client.recognize(config=config, audio=audio)
-            
-            if not response.results:
-                return {
-                    "text": "",
-                    "language": self.language,
-                    "confidence": 0.0,
-                    "segments": []
-                }
-            
-            # Extract results
-            transcript = ""
-            total_confidence = 0.0
-            segments = []
-            
-            for result in response.results:
-                alternative = result.alternatives[0]
-                transcript += alternative.transcript + " "
-                total_confidence += alternative.confidence
-                
-                if hasattr(alternative, 'words'):
-                    for word_info in alternative.words:
-                        segments.append({
-                            "text": word_info.word,
-                            "start": word_info.start_time.total_seconds(),
-                            "end": word_info.end_time.total_seconds(),
-                            "confidence": alternative.confidence
-                        })
-            
-            avg_confidence = total_confidence / len(response.results) if response.results else 0.0
-            
-            return {
-                "text": transcript.strip(),
-                "language": self.language,
-                "confidence": avg_confidence,
-                "segments": segments
-            }
+            # Stream the decoded file instead of uploading it whole: results arrive
+            # while audio is still being sent, and the ~60 s sync limit does not apply
+            with sf.SoundFile(audio_file_path) as audio_file:
+                sample_rate = audio_file.samplerate
+                chunk_frames = sample_rate * self.stream_chunk_ms // 1000
+                chunks = (
+                    AudioProcessor.encode_pcm16(block, sample_rate)[0]
+                    for block in audio_file.blocks(blocksize=chunk_frames, dtype='int16', always_2d=True)
+                )
+                return self.transcribe_stream(chunks, sample_rate, **kwargs)
             
         except Exception as e:
             logger.error(f"Error transcribing with Google Cloud: {e}")
@@ -142,7 +156,7 @@ class GoogleSTT(BaseSTTEngine):
         Transcribe audio data to text using Google Cloud
         
         Args:
-            audio_data: Audio data as numpy array or bytes
+            audio_data: Audio data as numpy array, 16-bit PCM or WAV bytes
             sample_rate: Sample rate of audio data
             **kwargs: Additional Google Cloud options
             
@@ -155,17 +169,8 @@ class GoogleSTT(BaseSTTEngine):
         try:
             logger.debug("Transcribing audio data with Google Cloud")
             
-            # Convert numpy array to bytes if needed
-            if isinstance(audio_data, np.ndarray):
-                import soundfile as sf
-                import io
-                
-                buffer = io.BytesIO()
-                sf.write(buffer, audio_data, sample_rate, format='WAV')
-                buffer.seek(0)
-                audio_bytes = buffer.read()
-            else:
-                audio_bytes = audio_data
+            # LINEAR16 takes headerless PCM directly
+            audio_bytes, sample_rate = AudioProcessor.encode_pcm16(audio_data, sample_rate)
             
             audio = self.speech.RecognitionAudio(content=audio_bytes)
             
@@ -181,45 +186,135 @@ class GoogleSTT(BaseSTTEngine):
             # Perform transcription
             response = self.client.recognize(config=config, audio=audio)
             
-            if not response.results:
-                return {
-                    "text": "",
-                    "language": self.language,
-                    "confidence": 0.0,
-                    "segments": []
-                }
-            
-            # Extract results
-            transcript = ""
-            total_confidence = 0.0
-            segments = []
-            
-            for result in response.results:
-                alternative = result.alternatives[0]
-                transcript += alternative.transcript + " "
-                total_confidence += alternative.confidence
-                
-                if hasattr(alternative, 'words'):
-                    for word_info in alternative.words:
-                        segments.append({
-                            "text": word_info.word,
-                            "start": word_info.start_time.total_seconds(),
-                            "end": word_info.end_time.total_seconds(),
-                            "confidence": alternative.confidence
-                        })
-            
-            avg_confidence = total_confidence / len(response.results) if response.results else 0.0
+            return self._build_result(response.results)
+            
+        except Exception as e:
+            logger.error(f"Error transcribing audio data with Google Cloud: {e}")
+            raise
+    
+    def transcribe_stream(self, audio_chunks: Iterable[bytes], sample_rate: int = 16000,
+                          on_partial: Optional[Callable[[str], None]] = None,
+                          **kwargs) -> Dict[str, Any]:
+        """
+        Transcribe 16-bit PCM chunks with bidirectional streaming recognition
+        
+        Chunks are sent as they are produced; final results are collected into
+        the usual result dictionary, interim ones are passed to on_partial.
+        A single stream is limited to about five minutes of audio.
+        
+        Args:
+            audio_chunks: Iterable of headerless mono 16-bit PCM chunks (100-450 ms each works best)
+            sample_rate: Sample rate of the PCM
+            on_partial: Optional callback receiving interim transcripts
+            **kwargs: Additional Google Cloud RecognitionConfig options
+            
+        Returns:
+            Dictionary with transcription results
+        """
+        if not self.client:
+            raise RuntimeError("Google Cloud Speech client not initialized")
+        
+        try:
+            config = self.speech.RecognitionConfig(
+                encoding=self.speech.RecognitionConfig.AudioEncoding.LINEAR16,
+                sample_rate_hertz=sample_rate,
+                language_code=self.language,
+                model=self.model,
+                enable_automatic_punctuation=True,
+                **kwargs
+            )
+            streaming_config = self.speech.StreamingRecognitionConfig(
+                config=config,
+                interim_results=on_partial is not None,
+                single_utterance=False
+            )
+            requests = (
+                self.speech.StreamingRecognizeRequest(audio_content=chunk)
+                for chunk in audio_chunks if chunk
+            )
+            
+            final_results = []
+            for response in self.client.streaming_recognize(streaming_config, requests):
+                for result in response.results:
+                    if result.is_final:
+                        final_results.append(result)
+                    elif on_partial and result.alternatives:
+                        on_partial(result.alternatives[0].transcript)
+            
+            return self._build_result(final_results)
             
+        except Exception as e:
+            logger.error(f"Error streaming audio to Google Cloud: {e}")
+            raise
+    
+    def _transcribe_long_file(self, audio_file_path: str, **kwargs) -> Dict[str, Any]:
+        """
+        Transcribe a long recording with long_running_recognize via Cloud Storage
+        
+        The file is uploaded to the configured bucket, recognized from its
+        gs:// URI and removed again. WAV and FLAC headers supply the encoding.
+        """
+        from google.cloud import storage
+        
+        blob_name = f"aiagent-stt/{uuid.uuid4().hex}{Path(audio_file_path).suffix}"
+        blob = storage.Client().bucket(self.gcs_bucket).blob(blob_name)
+        
+        logger.debug(f"Uploading {audio_file_path} to gs://{self.gcs_bucket}/{blob_name}")
+        blob.upload_from_filename(audio_file_path)
+        
+        try:
+            config = self.speech.RecognitionConfig(
+                language_code=self.language,
+                model=self.model,
+                enable_automatic_punctuation=True,
+                **kwargs
+            )
+            audio = self.speech.RecognitionAudio(uri=f"gs://{self.gcs_bucket}/{blob_name}")
+            
+            operation = self.client.long_running_recognize(config=config, audio=audio)
+            response = operation.result(timeout=self.long_running_timeout)
+            return self._build_result(response.results)
+        finally:
+            try:
+                blob.delete()
+            except Exception as e:
+                logger.warning(f"Could not delete staged audio gs://{self.gcs_bucket}/{blob_name}: {e}")
+    
+    def _build_result(self, results) -> Dict[str, Any]:
+        """Collect recognition results into the common result dictionary"""
+        if not results:
             return {
-                "text": transcript.strip(),
+                "text": "",
                 "language": self.language,
-                "confidence": avg_confidence,
-                "segments": segments
+                "confidence": 0.0,
+                "segments": []
             }
+        
+        # Extract results
+        transcript = ""
+        total_confidence = 0.0
+        segments = []
+        
+        for result in results:
+            alternative = result.alternatives[0]
+            transcript += alternative.transcript + " "
+            total_confidence += alternative.confidence
             
-        except Exception as e:
-            logger.error(f"Error transcribing audio data with Google Cloud: {e}")
-            raise
+            if hasattr(alternative, 'words'):
+                for word_info in alternative.words:
+                    segments.append(Segment(
+                        word_info.word,
+                        word_info.start_time.total_seconds(),
+                        word_info.end_time.total_seconds(),
+                        alternative.confidence
+                    ))
+        
+        return {
+            "text": transcript.strip(),
+            "language": self.language,
+            "confidence": total_confidence / len(results),
+            "segments": segments
+        }
     
     def is_available(self) -> bool:
         """Check if Google Cloud Speech is available"""
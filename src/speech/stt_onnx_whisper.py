@@ -0,0 +1,263 @@
+"""
+Speech-to-Text using a Whisper model exported to ONNX Runtime
+"""
+import os
+import logging
+from typing import Dict, Any, List, Optional, Tuple, Union
+import numpy as np
+from .base import BaseSTTEngine
+from .stt import AudioProcessor, WHISPER_SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# Samples in one Whisper input window (30 s)
+WINDOW_SAMPLES = 30 * WHISPER_SAMPLE_RATE
+
+
+class OnnxWhisperSTT(BaseSTTEngine):
+    """
+    Speech-to-Text using an ONNX Runtime Whisper model with built-in beam search
+    
+    The model is produced once at install time by ONNX Runtime's exporter,
+    whose optimizer fuses attention into MultiHeadAttention kernels:
+    
+        python -m onnxruntime.transformers.models.whisper.convert_to_onnx \\
+            -m openai/whisper-base --output models/whisper-onnx \\
+            --optimize_onnx --precision fp16 --use_gpu
+    """
+    
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initialize ONNX Whisper STT
+        
+        Args:
+            config: Configuration dictionary with:
+                - onnx_model_path: Exported Whisper beam search model (.onnx)
+                - model_size: Whisper model size the export came from (default: base)
+                - processor: Hugging Face feature extractor/tokenizer (default: openai/whisper-<model_size>)
+                - device: cpu, cuda or auto (default: auto)
+                - beam_size: Beam width (default: 1, greedy)
+                - max_length: Maximum generated tokens per 30 s window (default: 128)
+                - language: Language code (default: de)
+        """
+        super().__init__(config)
+        self.model_path = config.get("onnx_model_path")
+        self.model_size = config.get("model_size", "base")
+        self.processor_name = config.get("processor", f"openai/whisper-{self.model_size}")
+        self.device = config.get("device", "auto")
+        self.beam_size = config.get("beam_size", 1)
+        self.max_length = config.get("max_length", 128)
+        self.session = None
+        self.processor = None
+        self._ort = None
+        self._feature_dtype = np.float32
+        self._prompt_ids = None
+        
+        if not self.model_path:
+            logger.warning("ONNX Whisper model path not provided")
+        else:
+            self._load_model()
+    
+    def _load_model(self):
+        """Create the inference session, reusing the optimized graph from earlier runs"""
+        try:
+            import onnxruntime as ort
+            from transformers import WhisperProcessor
+            
+            self._ort = ort
+            if self.device == "auto":
+                self.device = "cuda" if "CUDAExecutionProvider" in ort.get_available_providers() else "cpu"
+            
+            options = ort.SessionOptions()
+            # Let ORT allocate from the process-wide arena shared by all sessions
+            options.add_session_config_entry("session.use_env_allocators", "1")
+            
+            # Graph optimization runs once; later starts load the saved result
+            cached_path = f"{os.path.splitext(self.model_path)[0]}.{self.device}.optimized.onnx"
+            if os.path.exists(cached_path):
+                model_path = cached_path
+                options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+            else:
+                model_path = self.model_path
+                options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                options.optimized_model_filepath = cached_path
+            
+            if self.device.startswith("cuda"):
+                providers = ["CUDAExecutionProvider", "CPUExecutionProvider"]
+            else:
+                providers = ["CPUExecutionProvider"]
+            
+            logger.info(f"Loading ONNX Whisper model '{model_path}' on device '{self.device}'")
+            self.session = ort.InferenceSession(model_path, sess_options=options, providers=providers)
+            
+            features = next(i for i in self.session.get_inputs() if i.name == "input_features")
+            if features.type == "tensor(float16)":
+                self._feature_dtype = np.float16
+            
+            self.processor = WhisperProcessor.from_pretrained(self.processor_name)
+            tokenizer = self.processor.tokenizer
+            self._prompt_ids = [tokenizer.convert_tokens_to_ids("<|startoftranscript|>")] + [
+                token for _, token in self.processor.get_decoder_prompt_ids(
+                    language=self.language, task="transcribe"
+                )
+            ]
+            logger.info("ONNX Whisper model loaded successfully")
+        
+        except ImportError:
+            logger.error("onnxruntime/transformers not installed. Install with: pip install onnxruntime-gpu transformers")
+            self.session = None
+        except Exception as e:
+            logger.error(f"Error loading ONNX Whisper model: {e}")
+            self.session = None
+    
+    def transcribe_file(self, audio_file_path: str, **kwargs) -> Dict[str, Any]:
+        """
+        Transcribe audio file to text
+        
+        Args:
+            audio_file_path: Path to audio file
+            **kwargs: Additional decoding options (beam_size, max_length)
+        
+        Returns:
+            Dictionary with transcription results
+        """
+        if not os.path.exists(audio_file_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
+        
+        logger.debug(f"Transcribing audio file with ONNX Whisper: {audio_file_path}")
+        audio_data, sample_rate = AudioProcessor.load_audio_file(audio_file_path)
+        return self.transcribe_audio_data(audio_data, sample_rate, **kwargs)
+    
+    def transcribe_audio_data(self, audio_data: Union[np.ndarray, bytes],
+                             sample_rate: int = 16000, **kwargs) -> Dict[str, Any]:
+        """
+        Transcribe audio data to text
+        
+        Args:
+            audio_data: Audio data as numpy array or 16-bit PCM bytes
+            sample_rate: Sample rate of audio data
+            **kwargs: Additional decoding options (beam_size, max_length)
+        
+        Returns:
+            Dictionary with transcription results
+        """
+        audio = self._prepare_audio(audio_data, sample_rate)
+        
+        # Long audio is cut into 30 s windows, all decoded in one batch
+        windows = [audio[start:start + WINDOW_SAMPLES] for start in range(0, max(len(audio), 1), WINDOW_SAMPLES)]
+        decoded = self._generate(windows, **kwargs)
+        confidences = [confidence for text, confidence in decoded if text and confidence is not None]
+        
+        return {
+            "text": " ".join(text for text, _ in decoded if text),
+            "language": self.language,
+            "segments": [],
+            "confidence": float(np.mean(confidences)) if confidences else None
+        }
+    
+    def transcribe_batch(self, audio_batch: List[np.ndarray],
+                         sample_rate: int = 16000, **kwargs) -> List[Dict[str, Any]]:
+        """
+        Transcribe several clips with one session run
+        
+        Args:
+            audio_batch: Audio clips as numpy arrays
+            sample_rate: Sample rate shared by all clips
+            **kwargs: Additional decoding options (beam_size, max_length)
+        
+        Returns:
+            Transcription results in the same order as audio_batch
+        """
+        clips = [self._prepare_audio(audio, sample_rate) for audio in audio_batch]
+        if any(len(clip) > WINDOW_SAMPLES for clip in clips):
+            return [self.transcribe_audio_data(clip, WHISPER_SAMPLE_RATE, **kwargs) for clip in clips]
+        
+        return [
+            {
+                "text": text,
+                "language": self.language,
+                "segments": [],
+                "confidence": confidence if text else None
+            }
+            for text, confidence in self._generate(clips, **kwargs)
+        ]
+    
+    def _prepare_audio(self, audio_data: Union[np.ndarray, bytes], sample_rate: int) -> np.ndarray:
+        """Convert input audio to 16 kHz float32 samples"""
+        if isinstance(audio_data, (bytes, bytearray, memoryview)):
+            audio_data, sample_rate = AudioProcessor.decode_pcm_bytes(audio_data, sample_rate)
+        
+        if audio_data.dtype != np.float32:
+            audio_data = audio_data.astype(np.float32)
+        
+        if sample_rate != WHISPER_SAMPLE_RATE:
+            audio_data = AudioProcessor.resample_audio(audio_data, sample_rate, WHISPER_SAMPLE_RATE)
+        
+        return audio_data
+    
+    def _generate(self, clips: List[np.ndarray], beam_size: int = None,
+                  max_length: int = None) -> List[Tuple[str, Optional[float]]]:
+        """
+        Run beam search over up to 30 s clips and decode the token sequences
+        
+        Returns:
+            (text, confidence) per clip. The confidence is exp of the beam's
+            length-normalized log probability, comparable to Whisper's
+            exp(avg_logprob); None when the export has no sequences_scores output.
+        """
+        if not self.session:
+            raise RuntimeError("ONNX Whisper model not loaded")
+        
+        try:
+            features = self.processor.feature_extractor(
+                clips, sampling_rate=WHISPER_SAMPLE_RATE, return_tensors="np"
+            ).input_features.astype(self._feature_dtype)
+            batch = features.shape[0]
+            
+            inputs = {
+                "max_length": np.array([max_length or self.max_length], dtype=np.int32),
+                "min_length": np.array([1], dtype=np.int32),
+                "num_beams": np.array([beam_size or self.beam_size], dtype=np.int32),
+                "num_return_sequences": np.array([1], dtype=np.int32),
+                "length_penalty": np.array([1.0], dtype=np.float32),
+                "repetition_penalty": np.array([1.0], dtype=np.float32),
+                "decoder_input_ids": np.tile(np.array(self._prompt_ids, dtype=np.int32), (batch, 1)),
+            }
+            
+            # IO binding places the mel features on the GPU once and keeps ORT
+            # from staging every input through its own host copy
+            binding = self.session.io_binding()
+            if self.device.startswith("cuda"):
+                binding.bind_ortvalue_input(
+                    "input_features", self._ort.OrtValue.ortvalue_from_numpy(features, "cuda", 0)
+                )
+            else:
+                binding.bind_cpu_input("input_features", features)
+            
+            # Exports differ in which optional inputs they keep
+            for model_input in self.session.get_inputs():
+                if model_input.name in inputs:
+                    binding.bind_cpu_input(model_input.name, inputs[model_input.name])
+            binding.bind_output("sequences")
+            has_scores = any(output.name == "sequences_scores" for output in self.session.get_outputs())
+            if has_scores:
+                binding.bind_output("sequences_scores")
+            
+            self.session.run_with_iobinding(binding)
+            outputs = binding.copy_outputs_to_cpu()
+            
+            # sequences is (batch, num_return_sequences, length), scores (batch, num_return_sequences)
+            texts = self.processor.batch_decode(outputs[0][:, 0, :], skip_special_tokens=True)
+            if has_scores:
+                confidences = np.exp(outputs[1][:, 0].astype(np.float64)).tolist()
+            else:
+                confidences = [None] * len(texts)
+            return [(text.strip(), confidence) for text, confidence in zip(texts, confidences)]
+        
+        except Exception as e:
+            logger.error(f"Error transcribing with ONNX Whisper: {e}")
+            raise
+    
+    def is_available(self) -> bool:
+        """Check if the ONNX Whisper session is ready"""
+        return self.session is not None
@@ -1,16 +1,32 @@
 """
 Text-to-Speech module supporting Coqui TTS and Mimic3
 """
-import os
+import asyncio
+import contextlib
+import math
 import logging
+import threading
 import numpy as np
-from typing import Optional, Dict, Any, Union
+from concurrent.futures import Executor
+from typing import AsyncIterator, Optional, Dict, Any, List, Tuple, Union
 from pathlib import Path
 import soundfile as sf
-from .base import BaseTTSEngine
+from .base import BaseTTSEngine, ensure_parent_dir
+from .stt import AudioProcessor
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for a Mimic3 synthesis (connecting gets MIMIC3_CONNECT_TIMEOUT)
+MIMIC3_TIMEOUT = 30.0
+MIMIC3_CONNECT_TIMEOUT = 5.0
+
+# STFT size and hop for speed/pitch changes, the same as librosa's defaults
+STRETCH_N_FFT = 2048
+STRETCH_HOP_LENGTH = 512
+
+# Half precision settings for Coqui on CUDA, mapped to torch dtype names
+COQUI_PRECISIONS = {"fp16": "float16", "bf16": "bfloat16"}
+
 
 class CoquiTTS(BaseTTSEngine):
     """Text-to-Speech using Coqui TTS"""
@@ -24,7 +40,10 @@ class CoquiTTS(BaseTTSEngine):
             config: Configuration dictionary (new style)
             model_name: TTS model name - legacy
             vocoder: Vocoder model name (optional) - legacy
-            device: Device to use (cpu, cuda) - legacy
+            device: Device to use (cpu, cuda, auto) - legacy
+            
+        The config may set precision to fp32 (default), fp16 or bf16; half
+        precision only applies on CUDA.
         """
         # Support both new config dict and legacy parameters
         if config is None:
@@ -40,14 +59,23 @@ class CoquiTTS(BaseTTSEngine):
         self.model_name = config.get("model_name", "tts_models/de/thorsten/tacotron2-DDC")
         self.vocoder = config.get("vocoder")
         self.device = config.get("device", "cpu")
+        self.precision = config.get("precision", "fp32")
         self.tts = None
+        self._torch = None
+        self._autocast_dtype = None
+        self._streams = threading.local()
         self._load_model()
     
     def _load_model(self):
         """Load the TTS model"""
         try:
+            import torch
             from TTS.api import TTS
             
+            self._torch = torch
+            if self.device == "auto":
+                self.device = "cuda" if torch.cuda.is_available() else "cpu"
+            
             logger.info(f"Loading Coqui TTS model: {self.model_name}")
             
             if self.vocoder:
@@ -55,6 +83,13 @@ class CoquiTTS(BaseTTSEngine):
             else:
                 self.tts = TTS(model_name=self.model_name).to(self.device)
             
+            synthesizer = getattr(self.tts, "synthesizer", None)
+            if synthesizer is not None and getattr(synthesizer, "output_sample_rate", None):
+                self.sample_rate = synthesizer.output_sample_rate
+            
+            if self.device.startswith("cuda") and self.precision in COQUI_PRECISIONS:
+                self._apply_precision(synthesizer)
+            
             logger.info("Coqui TTS model loaded successfully")
             
         except ImportError:
@@ -64,6 +99,31 @@ class CoquiTTS(BaseTTSEngine):
             logger.error(f"Error loading Coqui TTS model: {e}")
             raise
     
+    def _apply_precision(self, synthesizer):
+        """
+        Store the acoustic model and vocoder weights in half precision
+        
+        Each model is converted on its own; one that cannot run in half
+        precision stays in fp32, and autocast handles the mixed dtypes.
+        """
+        dtype = getattr(self._torch, COQUI_PRECISIONS[self.precision])
+        
+        converted = []
+        for name in ("tts_model", "vocoder_model"):
+            model = getattr(synthesizer, name, None) if synthesizer is not None else None
+            if model is None:
+                continue
+            try:
+                model.to(dtype)
+                converted.append(name)
+            except Exception as e:
+                logger.warning(f"Keeping Coqui {name} in fp32: {e}")
+                model.float()
+        
+        if converted:
+            self._autocast_dtype = dtype
+            logger.info(f"Coqui TTS running {', '.join(converted)} in {self.precision}")
+    
     def synthesize(self, text: str, output_path: Optional[str] = None, 
                    speaker: Optional[str] = None, **kwargs) -> Union[str, np.ndarray]:
         """
@@ -95,19 +155,50 @@ class CoquiTTS(BaseTTSEngine):
             
             if output_path:
                 # Synthesize to file
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                self.tts.tts_to_file(text=text, file_path=output_path, **tts_kwargs)
+                ensure_parent_dir(output_path)
+                with self._inference_context():
+                    self.tts.tts_to_file(text=text, file_path=output_path, **tts_kwargs)
                 logger.debug(f"Audio synthesized to: {output_path}")
                 return output_path
             else:
                 # Synthesize to numpy array
-                audio_data = self.tts.tts(text=text, **tts_kwargs)
-                return np.array(audio_data)
+                with self._inference_context():
+                    audio_data = self.tts.tts(text=text, **tts_kwargs)
+                
+                # Newer Coqui releases can hand back the tensor itself;
+                # read it straight out instead of going through a list
+                if isinstance(audio_data, self._torch.Tensor):
+                    audio_data = audio_data.detach().to("cpu", self._torch.float32).numpy()
+                return np.asarray(audio_data, dtype=np.float32)
                 
         except Exception as e:
             logger.error(f"Error synthesizing speech: {e}")
             raise
     
+    def _inference_context(self):
+        """
+        Context for one synthesis on the calling thread
+        
+        Autograd is off, and on CUDA each TTS worker thread gets its own stream
+        so syntheses for concurrent calls overlap on the GPU instead of
+        serializing on the default stream. Half precision models run under
+        autocast so activations use Tensor Cores.
+        """
+        torch = self._torch
+        if not self.device.startswith("cuda"):
+            return torch.no_grad()
+        
+        stream = getattr(self._streams, "stream", None)
+        if stream is None:
+            stream = self._streams.stream = torch.cuda.Stream(device=self.device)
+        
+        context = contextlib.ExitStack()
+        context.enter_context(torch.no_grad())
+        context.enter_context(torch.cuda.stream(stream))
+        if self._autocast_dtype is not None:
+            context.enter_context(torch.autocast(device_type="cuda", dtype=self._autocast_dtype))
+        return context
+    
     def get_speakers(self) -> list:
         """Get available speakers for the current model"""
         if not self.tts:
@@ -149,13 +240,30 @@ class Mimic3TTS(BaseTTSEngine):
         self.voice = config.get("voice", "de_DE/thorsten_low")
         self.url = config.get("url", "http://localhost:59125")
         self.session = None
+        self._async_session = None
+        self._httpx = None
         self._initialize_session()
     
+    def _client_options(self) -> Dict[str, Any]:
+        """Pool and timeout settings shared by the sync and async clients"""
+        pool_size = self.config.get("max_concurrency", 8)
+        return {
+            "limits": self._httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            "timeout": self._httpx.Timeout(MIMIC3_TIMEOUT, connect=MIMIC3_CONNECT_TIMEOUT),
+        }
+    
     def _initialize_session(self):
-        """Initialize HTTP session for Mimic3"""
+        """Initialize pooled HTTP client for Mimic3"""
         try:
-            import requests
-            self.session = requests.Session()
+            import httpx
+            self._httpx = httpx
+            
+            # HTTP/2 multiplexes requests when the server is reached over TLS
+            # and h2 is installed; plain http keeps pooled HTTP/1.1 connections
+            try:
+                self.session = httpx.Client(http2=True, **self._client_options())
+            except ImportError:
+                self.session = httpx.Client(**self._client_options())
             
             # Test connection
             response = self.session.get(f"{self.url}/api/voices")
@@ -165,7 +273,7 @@ class Mimic3TTS(BaseTTSEngine):
                 logger.warning(f"Mimic3 server returned status: {response.status_code}")
                 
         except ImportError:
-            logger.error("requests library not installed")
+            logger.error("httpx not installed. Install with: pip install httpx")
             raise
         except Exception as e:
             logger.warning(f"Could not connect to Mimic3 server: {e}")
@@ -192,25 +300,14 @@ class Mimic3TTS(BaseTTSEngine):
         try:
             logger.debug(f"Synthesizing text with Mimic3: {text[:50]}...")
             
-            # Prepare request parameters
-            params = {
-                "voice": self.voice,
-                **kwargs
-            }
-            
             # Make synthesis request
-            response = self.session.post(
-                f"{self.url}/api/tts",
-                data={"text": text},
-                params=params,
-                headers={"Accept": "audio/wav"}
-            )
+            response = self.session.post(**self._request_args(text, kwargs))
             
             if response.status_code == 200:
                 audio_data = response.content
                 
                 if output_path:
-                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                    ensure_parent_dir(output_path)
                     with open(output_path, 'wb') as f:
                         f.write(audio_data)
                     logger.debug(f"Audio synthesized to: {output_path}")
@@ -224,6 +321,87 @@ class Mimic3TTS(BaseTTSEngine):
             logger.error(f"Error synthesizing with Mimic3: {e}")
             raise
     
+    def _request_args(self, text: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the synthesis request; Mimic3 reads the text as the raw request body"""
+        return {
+            "url": f"{self.url}/api/tts",
+            "content": text.encode("utf-8"),
+            "params": {"voice": self.voice, **options},
+            "headers": {"Accept": "audio/wav"}
+        }
+    
+    async def synthesize_async(self, text: str, **kwargs) -> bytes:
+        """
+        Synthesize speech without blocking the event loop
+        
+        Args:
+            text: Text to synthesize
+            **kwargs: Additional synthesis options
+            
+        Returns:
+            WAV audio data
+        """
+        if not self.session:
+            raise RuntimeError("Mimic3 session not initialized")
+        
+        if not text.strip():
+            raise ValueError("Text cannot be empty")
+        
+        if self._async_session is None:
+            try:
+                self._async_session = self._httpx.AsyncClient(http2=True, **self._client_options())
+            except ImportError:
+                self._async_session = self._httpx.AsyncClient(**self._client_options())
+        
+        try:
+            response = await self._async_session.post(**self._request_args(text, kwargs))
+        except Exception as e:
+            logger.error(f"Error synthesizing with Mimic3: {e}")
+            raise
+        
+        if response.status_code != 200:
+            raise RuntimeError(f"Mimic3 synthesis failed: {response.status_code}")
+        return response.content
+    
+    async def synthesize_many(self, texts: List[str], executor: Optional[Executor] = None,
+                              max_concurrency: Optional[int] = None,
+                              **kwargs) -> List[Tuple[np.ndarray, int]]:
+        """
+        Synthesize several texts concurrently on the async HTTP client
+        
+        Requests share the client's connection pool instead of occupying
+        one executor thread each.
+        
+        Args:
+            texts: Texts to synthesize
+            executor: Unused, kept for interface compatibility
+            max_concurrency: Maximum requests in flight (default: max_concurrency setting, 8)
+            **kwargs: Additional synthesis options
+            
+        Returns:
+            Tuples of float32 samples and their sample rate, in the order of texts
+        """
+        limit = max_concurrency or self.config.get("max_concurrency", 8)
+        semaphore = asyncio.Semaphore(max(1, limit))
+        
+        async def synthesize(text: str) -> Tuple[np.ndarray, int]:
+            key = None
+            if self.cache is not None:
+                key = self.cache.make_key(self._get_cache_identity(), text, kwargs)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return cached
+            
+            async with semaphore:
+                audio = await self.synthesize_async(text, **kwargs)
+            
+            samples, sample_rate = self._decode_audio(audio)
+            if key is None:
+                return samples, sample_rate
+            return self.cache.set(key, samples, sample_rate)
+        
+        return list(await asyncio.gather(*(synthesize(text) for text in texts)))
+    
     def get_voices(self) -> list:
         """Get available voices from Mimic3 server"""
         if not self.session:
@@ -299,6 +477,58 @@ class TTSEngine:
         
         return self.engine.synthesize(text, output_path, **kwargs)
     
+    def synthesize_to_array(self, text: str, **kwargs) -> Tuple[np.ndarray, int]:
+        """
+        Synthesize speech into memory for direct playback
+        
+        Args:
+            text: Text to synthesize
+            **kwargs: Additional options
+            
+        Returns:
+            Tuple of float32 samples and their sample rate
+        """
+        if not self.engine:
+            raise RuntimeError("TTS engine not initialized")
+        
+        return self.engine.synthesize_to_array(text, **kwargs)
+    
+    def synthesize_stream(self, text: str, executor: Optional[Executor] = None,
+                          **kwargs) -> AsyncIterator[Tuple[np.ndarray, int]]:
+        """
+        Synthesize speech sentence by sentence for streamed playback
+        
+        Args:
+            text: Text to synthesize
+            executor: Executor running the blocking synthesis
+            **kwargs: Additional options
+            
+        Returns:
+            Async iterator of float32 samples and their sample rate
+        """
+        if not self.engine:
+            raise RuntimeError("TTS engine not initialized")
+        
+        return self.engine.synthesize_stream(text, executor, **kwargs)
+    
+    async def synthesize_many(self, texts: List[str], executor: Optional[Executor] = None,
+                              **kwargs) -> List[Tuple[np.ndarray, int]]:
+        """
+        Synthesize several texts concurrently
+        
+        Args:
+            texts: Texts to synthesize
+            executor: Executor running the blocking synthesis
+            **kwargs: Additional options
+            
+        Returns:
+            Tuples of float32 samples and their sample rate, in the order of texts
+        """
+        if not self.engine:
+            raise RuntimeError("TTS engine not initialized")
+        
+        return await self.engine.synthesize_many(texts, executor, **kwargs)
+    
     def is_available(self) -> bool:
         """Check if TTS engine is available"""
         return self.engine and self.engine.is_available()
@@ -336,6 +566,7 @@ def create_tts_engine(config: Dict[str, Any]) -> TTSEngine:
             "model_name": config.get("model_name", "tts_models/de/thorsten/tacotron2-DDC"),
             "vocoder": config.get("vocoder"),
             "device": config.get("device", "cpu"),
+            "precision": config.get("precision", "fp32"),
             "language": config.get("language", "de")
         }
     elif engine_type == "mimic3":
@@ -367,12 +598,40 @@ def create_tts_engine(config: Dict[str, Any]) -> TTSEngine:
     else:
         raise ValueError(f"Unsupported TTS engine: {engine_type}")
     
+    # Phrase cache shared by every engine
+    engine_config["cache_size"] = config.get("cache_size", 256)
+    engine_config["cache_redis_url"] = config.get("cache_redis_url")
+    engine_config["cache_ttl"] = config.get("cache_ttl", 86400)
+    engine_config["max_concurrency"] = config.get("max_concurrency", 8)
+    
     return TTSEngine(engine_type, **engine_config)
 
 
 class AudioPostProcessor:
     """Post-processing utilities for synthesized audio"""
     
+    @staticmethod
+    def _phase_vocoder_stretch(audio_data: np.ndarray, rate: float) -> np.ndarray:
+        """
+        Time-stretch with torchaudio's phase vocoder (native code, unlike librosa's NumPy loop)
+        
+        Uses the same STFT size and hop as librosa.effects.time_stretch.
+        Raises ImportError when torch/torchaudio are missing.
+        """
+        import torch
+        import torchaudio
+        
+        audio = torch.from_numpy(np.ascontiguousarray(audio_data, dtype=np.float32))
+        window = torch.hann_window(STRETCH_N_FFT)
+        spectrum = torch.stft(audio, STRETCH_N_FFT, hop_length=STRETCH_HOP_LENGTH,
+                              window=window, return_complex=True)
+        phase_advance = torch.linspace(
+            0, math.pi * STRETCH_HOP_LENGTH, STRETCH_N_FFT // 2 + 1
+        ).unsqueeze(-1)
+        stretched = torchaudio.functional.phase_vocoder(spectrum, rate, phase_advance)
+        return torch.istft(stretched, STRETCH_N_FFT, hop_length=STRETCH_HOP_LENGTH, window=window,
+                           length=int(round(audio.shape[-1] / rate))).numpy()
+    
     @staticmethod
     def adjust_speed(audio_data: np.ndarray, speed_factor: float) -> np.ndarray:
         """
@@ -385,11 +644,19 @@ class AudioPostProcessor:
         Returns:
             Speed-adjusted audio data
         """
+        try:
+            return AudioPostProcessor._phase_vocoder_stretch(audio_data, speed_factor)
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.error(f"Error adjusting audio speed: {e}")
+            return audio_data
+        
         try:
             import librosa
             return librosa.effects.time_stretch(audio_data, rate=speed_factor)
         except ImportError:
-            logger.warning("librosa not available for speed adjustment")
+            logger.warning("torchaudio/librosa not available for speed adjustment")
             return audio_data
         except Exception as e:
             logger.error(f"Error adjusting audio speed: {e}")
@@ -400,6 +667,10 @@ class AudioPostProcessor:
         """
         Adjust audio pitch
         
+        Follows librosa's pitch_shift: stretch by the pitch ratio, then
+        resample back to the original duration. The resampling uses soxr,
+        which accepts the fractional source rate exactly.
+        
         Args:
             audio_data: Input audio data
             sample_rate: Audio sample rate
@@ -408,33 +679,53 @@ class AudioPostProcessor:
         Returns:
             Pitch-adjusted audio data
         """
+        try:
+            import soxr
+            
+            rate = 2.0 ** (-pitch_shift / 12.0)
+            stretched = AudioPostProcessor._phase_vocoder_stretch(audio_data, rate)
+            shifted = soxr.resample(stretched, sample_rate / rate, sample_rate, quality='HQ')
+            
+            # Rounding in both steps can leave the result a sample or two off
+            if len(shifted) >= len(audio_data):
+                return shifted[:len(audio_data)]
+            return np.pad(shifted, (0, len(audio_data) - len(shifted)))
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.error(f"Error adjusting audio pitch: {e}")
+            return audio_data
+        
         try:
             import librosa
             return librosa.effects.pitch_shift(audio_data, sr=sample_rate, n_steps=pitch_shift)
         except ImportError:
-            logger.warning("librosa not available for pitch adjustment")
+            logger.warning("torchaudio/soxr/librosa not available for pitch adjustment")
             return audio_data
         except Exception as e:
             logger.error(f"Error adjusting audio pitch: {e}")
             return audio_data
     
     @staticmethod
-    def apply_volume(audio_data: np.ndarray, volume_factor: float) -> np.ndarray:
+    def apply_volume(audio_data: np.ndarray, volume_factor: float,
+                     out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Apply volume adjustment
         
+        The clipping check uses the input's peak, so the gain and the
+        anti-clipping rescale are folded into a single multiply.
+        
         Args:
             audio_data: Input audio data
             volume_factor: Volume multiplier
+            out: Optional output array (may be audio_data to scale in place)
             
         Returns:
             Volume-adjusted audio data
         """
-        adjusted = audio_data * volume_factor
-        
-        # Prevent clipping
-        max_val = np.abs(adjusted).max()
-        if max_val > 1.0:
-            adjusted = adjusted / max_val
+        # Prevent clipping: scale the loudest sample to exactly 1.0 instead
+        peak = AudioProcessor.peak_amplitude(audio_data) * abs(volume_factor)
+        if peak > 1.0:
+            volume_factor = volume_factor / peak
         
-        return adjusted
\ No newline at end of file
+        return np.multiply(audio_data, volume_factor, out=out)
\ No newline at end of file
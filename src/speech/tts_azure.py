@@ -2,14 +2,28 @@
 Text-to-Speech using Azure Speech Services
 """
 import os
+import asyncio
 import logging
-from typing import Dict, Any, Union, Optional
+import threading
+from concurrent.futures import Executor
+from typing import AsyncIterator, Dict, Any, Iterator, Tuple, Union, Optional
 import numpy as np
 from pathlib import Path
-from .base import BaseTTSEngine
+from xml.sax.saxutils import escape
+from .base import BaseTTSEngine, ensure_parent_dir
+from .stt import AudioProcessor
 
 logger = logging.getLogger(__name__)
 
+# Extra entities needed when a value goes inside a double-quoted attribute
+_ATTRIBUTE_ENTITIES = {'"': "&quot;"}
+
+# Streamed synthesis returns headerless 16-bit mono PCM at this rate
+STREAM_SAMPLE_RATE = 24000
+
+# Bytes read from the SDK per streamed chunk (100 ms of audio)
+STREAM_CHUNK_BYTES = STREAM_SAMPLE_RATE * 2 // 10
+
 
 class AzureTTS(BaseTTSEngine):
     """Text-to-Speech using Azure Speech Services"""
@@ -30,11 +44,21 @@ class AzureTTS(BaseTTSEngine):
         self.region = config.get("region") or os.getenv("AZURE_SPEECH_REGION", "westeurope")
         self.voice = config.get("voice", "de-DE-KatjaNeural")  # German female voice
         self.speech_config = None
+        self._local = threading.local()
+        self._voices_cache = None
         
         # Azure uses de-DE format instead of just de
         if self.language == "de":
             self.language = "de-DE"
         
+        # The SSML envelope only varies in voice and prosody, so it is built once
+        self._ssml_head = (
+            f'<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" '
+            f'xml:lang="{escape(self.language, _ATTRIBUTE_ENTITIES)}">'
+            '<voice name="{voice}"><prosody rate="{rate}" pitch="{pitch}">'
+        )
+        self._ssml_tail = "</prosody></voice></speak>"
+        
         if not self.api_key:
             logger.warning("Azure Speech API key not provided")
         else:
@@ -52,6 +76,16 @@ class AzureTTS(BaseTTSEngine):
             )
             self.speech_config.speech_synthesis_voice_name = self.voice
             
+            # Streaming gets its own config so chunks arrive as raw PCM without a RIFF header
+            self._stream_config = speechsdk.SpeechConfig(
+                subscription=self.api_key,
+                region=self.region
+            )
+            self._stream_config.speech_synthesis_voice_name = self.voice
+            self._stream_config.set_speech_synthesis_output_format(
+                speechsdk.SpeechSynthesisOutputFormat.Raw24Khz16BitMonoPcm
+            )
+            
             logger.info("Azure TTS initialized successfully")
             
         except ImportError:
@@ -97,7 +131,7 @@ class AzureTTS(BaseTTSEngine):
             
             if output_path:
                 # Synthesize to file
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                ensure_parent_dir(output_path)
                 audio_config = self.speechsdk.audio.AudioOutputConfig(filename=output_path)
                 
                 synthesizer = self.speechsdk.SpeechSynthesizer(
@@ -116,11 +150,8 @@ class AzureTTS(BaseTTSEngine):
                 else:
                     raise RuntimeError(f"Azure TTS failed: {result.reason}")
             else:
-                # Synthesize to memory
-                synthesizer = self.speechsdk.SpeechSynthesizer(
-                    speech_config=self.speech_config,
-                    audio_config=None
-                )
+                # Synthesize to memory with this thread's long-lived synthesizer
+                synthesizer = self._get_synthesizer()
                 
                 if ssml_text:
                     result = synthesizer.speak_ssml_async(ssml_text).get()
@@ -136,34 +167,143 @@ class AzureTTS(BaseTTSEngine):
             logger.error(f"Error synthesizing with Azure: {e}")
             raise
     
-    def _create_ssml(self, text: str, voice: str, **kwargs) -> str:
-        """Create SSML markup for advanced synthesis options"""
-        rate = kwargs.get("rate", "0%")
-        pitch = kwargs.get("pitch", "0%")
-        
-        ssml = f"""
-        <speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="{self.language}">
-            <voice name="{voice}">
-                <prosody rate="{rate}" pitch="{pitch}">
-                    {text}
-                </prosody>
-            </voice>
-        </speak>
+    def stream_audio(self, text: str, stop: Optional[threading.Event] = None,
+                     **kwargs) -> Iterator[bytes]:
+        """
+        Synthesize speech, yielding PCM chunks while Azure is still producing them
+        
+        Args:
+            text: Text to synthesize
+            stop: Optional event that ends synthesis early when set
+            **kwargs: Additional Azure options (voice, rate, pitch)
+            
+        Yields:
+            Headerless 16-bit mono PCM at STREAM_SAMPLE_RATE
         """
-        return ssml.strip()
-    
-    def get_voices(self) -> list:
-        """Get available voices from Azure"""
         if not self.speech_config:
-            return []
+            raise RuntimeError("Azure TTS not initialized")
         
+        if not text.strip():
+            raise ValueError("Text cannot be empty")
+        
+        logger.debug(f"Streaming text with Azure: {text[:50]}...")
+        synthesizer = self._get_synthesizer(streaming=True)
+        
+        # start_speaking returns once the first audio is ready, not when synthesis ends
+        if kwargs.get("rate") or kwargs.get("pitch"):
+            ssml_text = self._create_ssml(text, kwargs.get("voice", self.voice), **kwargs)
+            result = synthesizer.start_speaking_ssml_async(ssml_text).get()
+        else:
+            result = synthesizer.start_speaking_text_async(text).get()
+        
+        stream = self.speechsdk.AudioDataStream(result)
+        buffer = bytes(STREAM_CHUNK_BYTES)
+        while True:
+            if stop is not None and stop.is_set():
+                synthesizer.stop_speaking_async().get()
+                return
+            
+            filled = stream.read_data(buffer)
+            if not filled:
+                break
+            yield buffer[:filled]
+        
+        if stream.status == self.speechsdk.StreamStatus.Canceled:
+            raise RuntimeError(f"Azure TTS failed: {stream.cancellation_details.reason}")
+    
+    async def synthesize_stream(self, text: str, executor: Optional[Executor] = None,
+                                **kwargs) -> AsyncIterator[Tuple[np.ndarray, int]]:
+        """
+        Synthesize speech, yielding audio chunks as Azure streams them
+        
+        Playback can start after the first chunk instead of after the whole
+        reply. The SDK stream is read on a single executor thread.
+        
+        Args:
+            text: Text to synthesize
+            executor: Executor reading the blocking SDK stream (None for the loop default)
+            **kwargs: Additional Azure options (voice, rate, pitch)
+            
+        Yields:
+            Tuples of float32 samples and their sample rate
+        """
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(self._get_cache_identity(), text, kwargs)
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+        
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        
+        def pump():
+            try:
+                for pcm in self.stream_audio(text, stop, **kwargs):
+                    loop.call_soon_threadsafe(chunks.put_nowait, pcm)
+            except Exception as e:
+                loop.call_soon_threadsafe(chunks.put_nowait, e)
+            else:
+                loop.call_soon_threadsafe(chunks.put_nowait, None)
+        
+        loop.run_in_executor(executor, pump)
+        parts = []
         try:
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+                samples, _ = AudioProcessor.decode_pcm_bytes(chunk, STREAM_SAMPLE_RATE)
+                parts.append(samples)
+                yield samples, STREAM_SAMPLE_RATE
+        finally:
+            stop.set()
+        
+        # Only complete replies are cached
+        if key is not None and parts:
+            self.cache.set(key, np.concatenate(parts), STREAM_SAMPLE_RATE)
+    
+    def _get_synthesizer(self, streaming: bool = False):
+        """
+        Return this thread's in-memory synthesizer, creating it on first use
+        
+        The SDK synthesizer keeps its service connection open between calls
+        but must not be shared between threads, so each worker gets its own.
+        Streaming uses a second synthesizer configured for raw PCM output.
+        """
+        name = "stream_synthesizer" if streaming else "synthesizer"
+        synthesizer = getattr(self._local, name, None)
+        if synthesizer is None:
             synthesizer = self.speechsdk.SpeechSynthesizer(
-                speech_config=self.speech_config,
+                speech_config=self._stream_config if streaming else self.speech_config,
                 audio_config=None
             )
-            
-            result = synthesizer.get_voices_async().get()
+            setattr(self._local, name, synthesizer)
+        return synthesizer
+    
+    def _create_ssml(self, text: str, voice: str, **kwargs) -> str:
+        """Create SSML markup for advanced synthesis options, escaping the text"""
+        head = self._ssml_head.format(
+            voice=escape(voice, _ATTRIBUTE_ENTITIES),
+            rate=escape(str(kwargs.get("rate") or "0%"), _ATTRIBUTE_ENTITIES),
+            pitch=escape(str(kwargs.get("pitch") or "0%"), _ATTRIBUTE_ENTITIES)
+        )
+        return head + escape(text) + self._ssml_tail
+    
+    def get_voices(self) -> list:
+        """Get available voices from Azure, fetched once and then cached"""
+        if not self.speech_config:
+            return []
+        
+        if self._voices_cache is not None:
+            return list(self._voices_cache)
+        
+        try:
+            result = self._get_synthesizer().get_voices_async().get()
             
             voices = []
             for voice in result.voices:
@@ -175,7 +315,8 @@ class AzureTTS(BaseTTSEngine):
                         "voice_type": voice.voice_type.name
                     })
             
-            return voices
+            self._voices_cache = voices
+            return list(voices)
             
         except Exception as e:
             logger.error(f"Error getting Azure voices: {e}")
@@ -0,0 +1,117 @@
+"""
+Cache of synthesized audio for phrases the agent says again and again
+"""
+import hashlib
+import logging
+import struct
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Redis values are the sample rate followed by the raw float32 samples
+_RATE_HEADER = struct.Struct('<I')
+
+
+class TTSCache:
+    """Content-addressed LRU of synthesized audio, optionally backed by Redis"""
+    
+    def __init__(self, maxsize: int = 256, redis_url: Optional[str] = None, ttl: int = 86400):
+        """
+        Initialize the cache
+        
+        Args:
+            maxsize: Number of phrases kept in process memory
+            redis_url: Optional Redis URL for a tier shared between processes
+            ttl: Seconds a phrase is kept in Redis
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        
+        if redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(redis_url)
+                logger.info("TTS cache shared through Redis")
+            except ImportError:
+                logger.warning("redis not installed, TTS cache stays in memory. Install with: pip install redis")
+    
+    @staticmethod
+    def make_key(identity: str, text: str, options: dict) -> str:
+        """
+        Build the cache key for one synthesis
+        
+        Args:
+            identity: Engine, model and voice the audio depends on
+            text: Text being synthesized
+            options: Per-call synthesis options (rate, pitch, speaker, ...)
+        
+        Returns:
+            Hex digest identifying the audio
+        """
+        parts = [identity, text, *(f"{name}={options[name]!r}" for name in sorted(options))]
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, int]]:
+        """Return cached (samples, sample_rate) for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        
+        if self._redis is None:
+            return None
+        
+        try:
+            payload = self._redis.get(key)
+        except Exception as e:
+            logger.debug(f"TTS cache Redis lookup failed: {e}")
+            return None
+        if payload is None:
+            return None
+        
+        (sample_rate,) = _RATE_HEADER.unpack_from(payload)
+        samples = np.frombuffer(payload, dtype=np.float32, offset=_RATE_HEADER.size)
+        self._remember(key, samples, sample_rate)
+        return samples, sample_rate
+    
+    def set(self, key: str, samples: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, int]:
+        """
+        Store synthesized audio under key
+        
+        The samples are made read-only, since every later hit shares them.
+        
+        Returns:
+            The stored (samples, sample_rate)
+        """
+        samples = np.ascontiguousarray(samples, dtype=np.float32)
+        samples.flags.writeable = False
+        self._remember(key, samples, sample_rate)
+        
+        if self._redis is not None:
+            try:
+                self._redis.set(key, _RATE_HEADER.pack(sample_rate) + samples.tobytes(), ex=self.ttl)
+            except Exception as e:
+                logger.debug(f"TTS cache Redis store failed: {e}")
+        
+        return samples, sample_rate
+    
+    def clear(self):
+        """Drop the in-memory entries"""
+        with self._lock:
+            self._entries.clear()
+    
+    def _remember(self, key: str, samples: np.ndarray, sample_rate: int):
+        """Insert into the in-memory LRU, evicting the least recently used phrase"""
+        with self._lock:
+            self._entries[key] = (samples, sample_rate)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
@@ -6,7 +6,7 @@ import logging
 from typing import Dict, Any, Union, Optional
 import numpy as np
 from pathlib import Path
-from .base import BaseTTSEngine
+from .base import BaseTTSEngine, ensure_parent_dir
 
 logger = logging.getLogger(__name__)
 
@@ -105,7 +105,7 @@ class ElevenLabsTTS(BaseTTSEngine):
             audio_data = b''.join(audio_chunks)
             
             if output_path:
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                ensure_parent_dir(output_path)
                 with open(output_path, 'wb') as f:
                     f.write(audio_data)
                 logger.debug(f"Audio synthesized to: {output_path}")
@@ -4,7 +4,7 @@ Training module for continuous improvement of the AI agent
 import logging
 import json
 import numpy as np
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Mapping, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
 from ..database.operations import TrainingRepository, ConversationRepository
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -184,14 +184,15 @@ class TrainingDataGenerator:
         self.training_repo = training_repo
     
     def generate_training_data_from_conversation(self, conversation_id: int, 
-                                               conversation_turns: List[Dict[str, Any]],
+                                               conversation_turns: Sequence[Mapping[str, Any]],
                                                outcome: str) -> List[Dict[str, Any]]:
         """
         Generate training data from a conversation
         
         Args:
             conversation_id: Conversation ID
-            conversation_turns: List of conversation turns
+            conversation_turns: Conversation turns in order, as dicts or the row
+                mappings returned by ConversationRepository
             outcome: Conversation outcome
             
         Returns:
@@ -221,7 +222,7 @@ class TrainingDataGenerator:
         return training_data
     
     def _generate_positive_examples(self, conversation_id: int, 
-                                  conversation_turns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+                                  conversation_turns: Sequence[Mapping[str, Any]]) -> List[Dict[str, Any]]:
         """Generate positive training examples from successful conversations"""
         positive_examples = []
         
@@ -249,7 +250,7 @@ class TrainingDataGenerator:
         return positive_examples
     
     def _generate_negative_examples(self, conversation_id: int,
-                                  conversation_turns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+                                  conversation_turns: Sequence[Mapping[str, Any]]) -> List[Dict[str, Any]]:
         """Generate negative training examples from failed conversations"""
         negative_examples = []
         
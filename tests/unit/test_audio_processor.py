@@ -0,0 +1,95 @@
+"""
+Unit tests for in-memory PCM decoding
+"""
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from speech.stt import AudioProcessor
+
+
+def pcm_bytes(samples):
+    return np.asarray(samples, dtype='<i2').tobytes()
+
+
+def wav_bytes(samples, sample_rate, channels=1):
+    buffer = io.BytesIO()
+    data = np.asarray(samples, dtype=np.int16)
+    if channels > 1:
+        data = data.reshape(-1, channels)
+    sf.write(buffer, data, sample_rate, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+def test_raw_pcm_is_scaled_to_unit_range():
+    audio, sample_rate = AudioProcessor.decode_pcm_bytes(pcm_bytes([0, 16384, -32768]), 8000)
+
+    assert sample_rate == 8000
+    assert audio.dtype == np.float32
+    np.testing.assert_allclose(audio, [0.0, 0.5, -1.0])
+
+
+def test_odd_trailing_byte_is_ignored():
+    audio, _ = AudioProcessor.decode_pcm_bytes(pcm_bytes([16384, 16384]) + b"\x01")
+
+    assert len(audio) == 2
+
+
+def test_wav_header_supplies_the_sample_rate():
+    audio, sample_rate = AudioProcessor.decode_pcm_bytes(wav_bytes([0, 16384, -16384], 22050), 8000)
+
+    assert sample_rate == 22050
+    np.testing.assert_allclose(audio, [0.0, 0.5, -0.5])
+
+
+def test_multichannel_wav_is_downmixed():
+    # Interleaved stereo frames: (0.5, 0.0), (-0.5, -0.5)
+    stereo = wav_bytes([16384, 0, -16384, -16384], 16000, channels=2)
+
+    audio, _ = AudioProcessor.decode_pcm_bytes(stereo)
+
+    np.testing.assert_allclose(audio, [0.25, -0.5])
+
+
+def test_non_pcm16_wav_falls_back_to_libsndfile():
+    buffer = io.BytesIO()
+    sf.write(buffer, np.array([0.25, -0.25], dtype=np.float32), 16000, format="WAV", subtype="FLOAT")
+
+    audio, sample_rate = AudioProcessor.decode_pcm_bytes(buffer.getvalue())
+
+    assert sample_rate == 16000
+    np.testing.assert_allclose(audio, [0.25, -0.25])
+
+
+def test_wav_without_data_chunk_is_rejected():
+    header = wav_bytes([0], 16000)[:36]
+
+    with pytest.raises(ValueError):
+        AudioProcessor.decode_pcm_bytes(header)
+
+
+def test_large_enough_out_buffer_is_reused():
+    out = np.full(8, 7.0, dtype=np.float32)
+
+    audio, _ = AudioProcessor.decode_pcm_bytes(pcm_bytes([16384, -16384]), out=out)
+
+    assert np.shares_memory(audio, out)
+    np.testing.assert_allclose(audio, [0.5, -0.5])
+    # Only the decoded prefix is written
+    np.testing.assert_allclose(out[2:], 7.0)
+
+
+def test_small_out_buffer_is_not_used():
+    out = np.zeros(1, dtype=np.float32)
+
+    audio, _ = AudioProcessor.decode_pcm_bytes(pcm_bytes([16384, -16384]), out=out)
+
+    assert not np.shares_memory(audio, out)
+    np.testing.assert_allclose(audio, [0.5, -0.5])
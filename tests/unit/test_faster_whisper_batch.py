@@ -0,0 +1,91 @@
+"""
+Unit tests for batched transcription with faster-whisper
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from speech.stt_faster_whisper import FasterWhisperSTT, WHISPER_SAMPLE_RATE
+
+
+class StubPipeline:
+    """
+    Stand-in for BatchedInferencePipeline
+
+    Like the real pipeline it reads clip bounds as sample indices and
+    reports segment times in seconds on the concatenated audio.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **options):
+        self.calls.append((len(audio), options))
+        segments = []
+        for row, clip in enumerate(options["clip_timestamps"]):
+            samples = audio[clip["start"]:clip["end"]]
+            segments.append(SimpleNamespace(
+                text=f" clip{row}:{len(samples)}",
+                start=clip["start"] / WHISPER_SAMPLE_RATE,
+                end=clip["end"] / WHISPER_SAMPLE_RATE,
+                avg_logprob=0.0
+            ))
+        return iter(segments), SimpleNamespace(language="de")
+
+
+def make_engine():
+    engine = FasterWhisperSTT({"language": "de"})
+    # Bypass model loading; only the batched pipeline is exercised
+    engine.model = object()
+    engine.batched_model = StubPipeline()
+    return engine
+
+
+def test_clip_bounds_are_sample_offsets():
+    engine = make_engine()
+    clips = [np.zeros(1600, dtype=np.float32), np.zeros(4000, dtype=np.float32)]
+
+    engine.transcribe_batch(clips)
+
+    (total, options), = engine.batched_model.calls
+    assert total == 5600
+    assert options["clip_timestamps"] == [
+        {"start": 0, "end": 1600},
+        {"start": 1600, "end": 5600},
+    ]
+    assert options["batch_size"] == 2
+
+
+def test_segments_are_mapped_back_to_their_clip():
+    engine = make_engine()
+    clips = [np.zeros(n, dtype=np.float32) for n in (1600, 4000, 800)]
+
+    results = engine.transcribe_batch(clips)
+
+    assert [result["text"] for result in results] == ["clip0:1600", "clip1:4000", "clip2:800"]
+    second = results[1]["segments"][0]
+    assert second.start == 0.0
+    assert second.end == pytest.approx(4000 / WHISPER_SAMPLE_RATE)
+    assert results[1]["confidence"] == 1.0
+
+
+def test_empty_clips_skip_the_pipeline():
+    engine = make_engine()
+    clips = [np.zeros(1600, dtype=np.float32), np.zeros(0, dtype=np.float32),
+             np.zeros(800, dtype=np.float32)]
+
+    results = engine.transcribe_batch(clips)
+
+    assert results[1]["text"] == ""
+    (_, options), = engine.batched_model.calls
+    assert options["clip_timestamps"] == [
+        {"start": 0, "end": 1600},
+        {"start": 1600, "end": 2400},
+    ]
+    assert [result["text"] for result in (results[0], results[2])] == ["clip0:1600", "clip1:800"]
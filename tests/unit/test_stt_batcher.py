@@ -0,0 +1,143 @@
+"""
+Unit tests for micro-batching of concurrent transcriptions
+"""
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from speech.batching import STTBatcher
+
+
+class RecordingEngine:
+    """Engine double that records each transcribe_batch call"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def transcribe_batch(self, audio_batch, sample_rate=16000):
+        self.calls.append((len(audio_batch), sample_rate))
+        if self.fail:
+            raise RuntimeError("model crashed")
+        return [{"text": f"{len(audio)}@{sample_rate}"} for audio in audio_batch]
+
+
+def clip(length):
+    return np.zeros(length, dtype=np.float32)
+
+
+def test_concurrent_requests_share_one_engine_call():
+    engine = RecordingEngine()
+
+    async def scenario():
+        batcher = STTBatcher(engine, max_batch_size=8, max_wait_ms=20)
+        batcher.start()
+        results = await asyncio.gather(*(batcher.submit(clip(n)) for n in (1, 2, 3)))
+        await batcher.close()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert engine.calls == [(3, 16000)]
+    assert [result["text"] for result in results] == ["1@16000", "2@16000", "3@16000"]
+
+
+def test_batches_are_capped_at_max_batch_size():
+    engine = RecordingEngine()
+
+    async def scenario():
+        batcher = STTBatcher(engine, max_batch_size=2, max_wait_ms=20)
+        batcher.start()
+        await asyncio.gather(*(batcher.submit(clip(1)) for _ in range(5)))
+        await batcher.close()
+
+    asyncio.run(scenario())
+
+    assert [size for size, _ in engine.calls] == [2, 2, 1]
+
+
+def test_sample_rates_are_batched_separately():
+    engine = RecordingEngine()
+
+    async def scenario():
+        batcher = STTBatcher(engine, max_wait_ms=20)
+        batcher.start()
+        results = await asyncio.gather(
+            batcher.submit(clip(1), 16000),
+            batcher.submit(clip(2), 8000),
+            batcher.submit(clip(3), 16000)
+        )
+        await batcher.close()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert sorted(engine.calls) == [(1, 8000), (2, 16000)]
+    assert [result["text"] for result in results] == ["1@16000", "2@8000", "3@16000"]
+
+
+def test_lone_request_runs_after_max_wait():
+    engine = RecordingEngine()
+
+    async def scenario():
+        batcher = STTBatcher(engine, max_wait_ms=10)
+        batcher.start()
+        result = await asyncio.wait_for(batcher.submit(clip(4)), timeout=2)
+        await batcher.close()
+        return result
+
+    assert asyncio.run(scenario())["text"] == "4@16000"
+    assert engine.calls == [(1, 16000)]
+
+
+def test_engine_errors_reach_every_caller_in_the_batch():
+    engine = RecordingEngine(fail=True)
+
+    async def scenario():
+        batcher = STTBatcher(engine, max_wait_ms=20)
+        batcher.start()
+        results = await asyncio.gather(
+            batcher.submit(clip(1)), batcher.submit(clip(2)), return_exceptions=True
+        )
+        await batcher.close()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert len(results) == 2
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_submit_requires_a_running_batcher():
+    batcher = STTBatcher(RecordingEngine())
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(batcher.submit(clip(1)))
+
+
+def test_close_fails_requests_still_in_flight():
+    release = threading.Event()
+
+    class BlockingEngine(RecordingEngine):
+        def transcribe_batch(self, audio_batch, sample_rate=16000):
+            release.wait(5)
+            return super().transcribe_batch(audio_batch, sample_rate)
+
+    async def scenario():
+        batcher = STTBatcher(BlockingEngine(), max_wait_ms=0)
+        batcher.start()
+        pending = asyncio.ensure_future(batcher.submit(clip(1)))
+        await asyncio.sleep(0.05)
+        await batcher.close()
+        release.set()
+        with pytest.raises(RuntimeError, match="closed"):
+            await pending
+
+    asyncio.run(scenario())
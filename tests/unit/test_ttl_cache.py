@@ -0,0 +1,86 @@
+"""
+Unit tests for the in-process TTL cache used by the repositories
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from database import operations
+from database.operations import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable stand-in for time.monotonic"""
+    now = [1000.0]
+    monkeypatch.setattr(operations.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_get_returns_stored_value(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+
+
+def test_missing_key_returns_default(clock):
+    cache = TTLCache()
+
+    assert cache.get("missing") is operations._MISSING
+    assert cache.get("missing", None) is None
+
+
+def test_none_is_a_cacheable_value(clock):
+    cache = TTLCache()
+    cache.set("a", None)
+
+    assert cache.get("a", "default") is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+
+    clock[0] += 9.9
+    assert cache.get("a") == 1
+
+    clock[0] += 0.1
+    assert cache.get("a", None) is None
+    assert "a" not in cache._entries
+
+
+def test_setting_again_restarts_the_ttl(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+    clock[0] += 8
+    cache.set("a", 2)
+    clock[0] += 8
+
+    assert cache.get("a") == 2
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    # Reading "a" makes "b" the least recently used
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b", None) is None
+    assert cache.get("c") == 3
+
+
+def test_clear_drops_everything(clock):
+    cache = TTLCache()
+    cache.set("a", 1)
+    cache.clear()
+
+    assert cache.get("a", None) is None
@@ -0,0 +1,106 @@
+"""
+Unit tests for the synthesized audio cache
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from speech.tts_cache import TTSCache
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the redis client"""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+def audio(*values):
+    return np.array(values, dtype=np.float32)
+
+
+def test_set_then_get_returns_the_audio():
+    cache = TTSCache()
+    cache.set("k", audio(0.1, 0.2), 8000)
+
+    samples, sample_rate = cache.get("k")
+
+    assert sample_rate == 8000
+    np.testing.assert_allclose(samples, [0.1, 0.2])
+
+
+def test_missing_key_returns_none():
+    assert TTSCache().get("missing") is None
+
+
+def test_cached_samples_are_read_only():
+    cache = TTSCache()
+    stored, _ = cache.set("k", np.array([0.5, 0.5]), 8000)
+    hit, _ = cache.get("k")
+
+    assert stored.dtype == np.float32
+    assert not hit.flags.writeable
+    with pytest.raises(ValueError):
+        hit[0] = 0.0
+
+
+def test_least_recently_used_phrase_is_evicted():
+    cache = TTSCache(maxsize=2)
+    cache.set("a", audio(1), 8000)
+    cache.set("b", audio(2), 8000)
+
+    # Reading "a" makes "b" the least recently used
+    cache.get("a")
+    cache.set("c", audio(3), 8000)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_key_ignores_option_order():
+    first = TTSCache.make_key("coqui:thorsten", "Hallo", {"rate": 1.0, "pitch": 0})
+    second = TTSCache.make_key("coqui:thorsten", "Hallo", {"pitch": 0, "rate": 1.0})
+
+    assert first == second
+
+
+def test_key_changes_with_identity_text_and_options():
+    base = TTSCache.make_key("coqui:thorsten", "Hallo", {"rate": 1.0})
+
+    assert TTSCache.make_key("piper:thorsten", "Hallo", {"rate": 1.0}) != base
+    assert TTSCache.make_key("coqui:thorsten", "Hallo!", {"rate": 1.0}) != base
+    assert TTSCache.make_key("coqui:thorsten", "Hallo", {"rate": 1.1}) != base
+
+
+def test_clear_drops_in_memory_entries():
+    cache = TTSCache()
+    cache.set("k", audio(1), 8000)
+    cache.clear()
+
+    assert cache.get("k") is None
+
+
+def test_redis_tier_refills_memory():
+    cache = TTSCache()
+    cache._redis = FakeRedis()
+    cache.set("k", audio(0.25, -0.25), 22050)
+    cache.clear()
+
+    samples, sample_rate = cache.get("k")
+
+    assert sample_rate == 22050
+    np.testing.assert_allclose(samples, [0.25, -0.25])
+    assert not samples.flags.writeable
+    assert "k" in cache._entries
@@ -0,0 +1,96 @@
+"""
+Unit tests for sentence-by-sentence TTS streaming
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from speech.base import BaseTTSEngine
+
+
+class SentenceEngine(BaseTTSEngine):
+    """Engine double that encodes each sentence's length as its audio"""
+
+    def __init__(self, config=None, fail_on=None):
+        super().__init__(config or {"sample_rate": 8000})
+        self.fail_on = fail_on
+        self.sentences = []
+
+    def synthesize(self, text, output_path=None, **kwargs):
+        if text == self.fail_on:
+            raise RuntimeError(f"cannot say {text!r}")
+        self.sentences.append(text)
+        return np.full(len(text), 0.1, dtype=np.float32)
+
+    def is_available(self):
+        return True
+
+
+async def collect(engine, text, **kwargs):
+    return [chunk async for chunk in engine.synthesize_stream(text, **kwargs)]
+
+
+def test_text_is_synthesized_sentence_by_sentence():
+    engine = SentenceEngine()
+
+    chunks = asyncio.run(collect(engine, "Guten Tag. Wie geht es Ihnen? Gut!"))
+
+    assert engine.sentences == ["Guten Tag.", "Wie geht es Ihnen?", "Gut!"]
+    assert [len(samples) for samples, _ in chunks] == [10, 18, 4]
+    assert all(sample_rate == 8000 for _, sample_rate in chunks)
+
+
+def test_text_without_sentence_end_is_one_chunk():
+    engine = SentenceEngine()
+
+    chunks = asyncio.run(collect(engine, "  Einen Moment bitte  "))
+
+    assert engine.sentences == ["Einen Moment bitte"]
+    assert len(chunks) == 1
+
+
+def test_abbreviation_like_dots_without_space_do_not_split():
+    engine = SentenceEngine()
+
+    asyncio.run(collect(engine, "Version 1.5 ist da."))
+
+    assert engine.sentences == ["Version 1.5 ist da."]
+
+
+def test_error_is_raised_after_earlier_chunks():
+    engine = SentenceEngine(fail_on="Kaputt.")
+
+    async def scenario():
+        received = []
+        with pytest.raises(RuntimeError, match="Kaputt"):
+            async for chunk in engine.synthesize_stream("Hallo. Kaputt. Tschüss."):
+                received.append(chunk)
+        return received
+
+    received = asyncio.run(scenario())
+
+    assert len(received) == 1
+    assert "Tschüss." not in engine.sentences
+
+
+def test_stopping_early_cancels_the_producer():
+    engine = SentenceEngine()
+
+    async def scenario():
+        stream = engine.synthesize_stream("Eins. Zwei. Drei. Vier.")
+        first = await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0.05)
+        return first
+
+    first = asyncio.run(scenario())
+
+    assert len(first[0]) == len("Eins.")
+    # At most one sentence is synthesized ahead of the consumer
+    assert len(engine.sentences) <= 3
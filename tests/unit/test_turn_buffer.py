@@ -0,0 +1,185 @@
+"""
+Unit tests for the batched conversation turn writer
+"""
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from database.operations import ConversationTurnBuffer
+
+
+class FakeDatabaseManager:
+    """Runs offloaded calls inline and records that they went through run()"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def run(self, func, *args, **kwargs):
+        self.calls += 1
+        return func(*args, **kwargs)
+
+
+class FakeConversationRepository:
+    """In-memory stand-in for ConversationRepository's turn methods"""
+
+    def __init__(self, turn_seqs=None):
+        self.db_manager = FakeDatabaseManager()
+        self.turn_seqs = dict(turn_seqs or {})
+        self.written = []
+        self.batches = []
+        self.poisoned = set()
+        self.fail_with = None
+
+    def get_turn_seq(self, conversation_id):
+        return self.turn_seqs.get(conversation_id, 0)
+
+    def flush_turns(self, rows):
+        if self.fail_with is not None:
+            raise self.fail_with
+        if any(row["text_content"] in self.poisoned for row in rows):
+            raise IntegrityError("INSERT INTO conversation_turns", {}, Exception("duplicate key"))
+        self.batches.append(len(rows))
+        self.written.extend(rows)
+
+
+def test_turns_are_written_in_one_batch():
+    repo = FakeConversationRepository()
+    buffer = ConversationTurnBuffer(repo, max_batch_size=10)
+
+    for i in range(3):
+        buffer.add_turn(1, "agent", f"turn {i}")
+    assert repo.written == []
+
+    assert buffer.flush() == 3
+    assert repo.batches == [3]
+    assert [row["turn_number"] for row in repo.written] == [1, 2, 3]
+
+
+def test_full_batch_flushes_immediately():
+    repo = FakeConversationRepository()
+    buffer = ConversationTurnBuffer(repo, max_batch_size=2)
+
+    buffer.add_turn(1, "agent", "one")
+    buffer.add_turn(1, "customer", "two")
+
+    assert repo.batches == [2]
+
+
+def test_turn_numbers_continue_after_stored_turns():
+    repo = FakeConversationRepository(turn_seqs={7: 4})
+    buffer = ConversationTurnBuffer(repo)
+
+    assert buffer.add_turn(7, "agent", "hello") == 5
+    assert buffer.add_turn(7, "customer", "hi") == 6
+    assert buffer.add_turn(8, "agent", "hello") == 1
+
+
+def test_audio_file_path_is_kept():
+    repo = FakeConversationRepository()
+    buffer = ConversationTurnBuffer(repo)
+
+    buffer.add_turn(1, "customer", "hallo", audio_file_path="/tmp/turn.wav")
+    buffer.flush()
+
+    assert repo.written[0]["audio_file_path"] == "/tmp/turn.wav"
+
+
+def test_rejected_row_is_dropped_and_the_rest_written():
+    repo = FakeConversationRepository()
+    repo.poisoned.add("bad")
+    buffer = ConversationTurnBuffer(repo)
+
+    buffer.add_turn(1, "agent", "good")
+    buffer.add_turn(1, "agent", "bad")
+    buffer.add_turn(1, "agent", "also good")
+
+    assert buffer.flush() == 2
+    assert [row["text_content"] for row in repo.written] == ["good", "also good"]
+    assert buffer.dropped_turns == 1
+
+    # The poisoned turn does not block later flushes
+    buffer.add_turn(1, "agent", "later")
+    assert buffer.flush() == 1
+
+
+def test_transient_failure_requeues_then_gives_up():
+    repo = FakeConversationRepository()
+    repo.fail_with = OperationalError("INSERT", {}, Exception("connection refused"))
+    buffer = ConversationTurnBuffer(repo, max_attempts=2)
+
+    buffer.add_turn(1, "agent", "hello")
+    with pytest.raises(OperationalError):
+        buffer.flush()
+    assert len(buffer._pending) == 1
+
+    with pytest.raises(OperationalError):
+        buffer.flush()
+    assert buffer._pending == []
+    assert buffer.dropped_turns == 1
+
+
+def test_requeued_turns_keep_their_order():
+    repo = FakeConversationRepository()
+    repo.fail_with = OperationalError("INSERT", {}, Exception("connection refused"))
+    buffer = ConversationTurnBuffer(repo)
+
+    buffer.add_turn(1, "agent", "first")
+    with pytest.raises(OperationalError):
+        buffer.flush()
+    buffer.add_turn(1, "agent", "second")
+
+    repo.fail_with = None
+    assert buffer.flush() == 2
+    assert [row["text_content"] for row in repo.written] == ["first", "second"]
+
+
+def test_flush_waits_for_a_flush_in_progress():
+    repo = FakeConversationRepository()
+    buffer = ConversationTurnBuffer(repo)
+    started = threading.Event()
+    release = threading.Event()
+    original = repo.flush_turns
+
+    def slow_flush_turns(rows):
+        started.set()
+        release.wait(5)
+        original(rows)
+
+    repo.flush_turns = slow_flush_turns
+    buffer.add_turn(1, "agent", "hello")
+    background = threading.Thread(target=buffer.flush)
+    background.start()
+    started.wait(5)
+
+    finished = threading.Event()
+    waiter = threading.Thread(target=lambda: (buffer.flush(), finished.set()))
+    waiter.start()
+    assert not finished.wait(0.1)
+
+    release.set()
+    background.join(5)
+    waiter.join(5)
+    assert finished.is_set()
+    assert len(repo.written) == 1
+
+
+def test_run_flushes_through_the_database_executor():
+    repo = FakeConversationRepository()
+    buffer = ConversationTurnBuffer(repo, flush_interval_ms=1)
+    buffer.add_turn(1, "agent", "hello")
+
+    async def run_briefly():
+        task = asyncio.create_task(buffer.run())
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(run_briefly())
+    assert repo.db_manager.calls > 0
+    assert len(repo.written) == 1